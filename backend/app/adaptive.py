@@ -0,0 +1,94 @@
+"""Adaptive sampling of frames over a time range.
+
+A range is first sampled every ``MAX_GAP`` and each gap is then bisected on
+the underlying grid while the frame at its midpoint differs from the linear
+interpolation of its ends by more than the tolerance in any planet and
+component.  Slowly changing stretches end up with few frames; fast Moon
+motion and the steps at hora and day/night edges are sampled down to the
+grid interval.  Points that only served to locate an edge are then dropped
+when the chord between their neighbours already reproduces them.
+
+The error is only checked at the midpoint of every kept gap, so a feature
+that is narrower than a gap and symmetric about its midpoint can be missed.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+DEFAULT_TOLERANCE = 2.0
+MAX_GAP = timedelta(hours=6)
+
+
+def _values(frames: list[dict]) -> np.ndarray:
+    """Return ``(time, planet, component)`` values of ``frames``."""
+    return np.array([[list(metrics.values()) for metrics in f.values()] for f in frames])
+
+
+def adaptive_indices(
+    func,
+    timestamps: list[datetime],
+    args: tuple = (),
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_gap: timedelta = MAX_GAP,
+) -> tuple[list[int], list[dict]]:
+    """Select frames of ``timestamps`` within ``tolerance`` of linear interpolation.
+
+    ``func(timestamps, *args)`` computes frames (``row_batch`` or
+    ``shadbala_batch``); it is called once per refinement level.  Returns
+    the sorted indices of the selected timestamps and their frames.
+    """
+    n = len(timestamps)
+    if n == 0:
+        return [], []
+    if n > 1:
+        stride = max(1, int(max_gap / (timestamps[1] - timestamps[0])))
+    else:
+        stride = 1
+    initial = sorted(set(range(0, n, stride)) | {n - 1})
+    frames = dict(zip(initial, func([timestamps[i] for i in initial], *args)))
+    values = dict(zip(initial, _values([frames[i] for i in initial])))
+
+    gaps = [(a, b) for a, b in zip(initial, initial[1:]) if b - a > 1]
+    while gaps:
+        mids = [(a + b) // 2 for a, b in gaps]
+        computed = func([timestamps[m] for m in mids], *args)
+        for m, frame, value in zip(mids, computed, _values(computed)):
+            frames[m] = frame
+            values[m] = value
+        refined = []
+        for (a, b), m in zip(gaps, mids):
+            expected = values[a] + (values[b] - values[a]) * ((m - a) / (b - a))
+            if np.max(np.abs(values[m] - expected)) > tolerance:
+                refined += [g for g in ((a, m), (m, b)) if g[1] - g[0] > 1]
+        gaps = refined
+
+    indices = _prune(sorted(frames), values, tolerance)
+    return indices, [frames[i] for i in indices]
+
+
+def _prune(indices: list[int], values: dict[int, np.ndarray], tolerance: float) -> list[int]:
+    """Drop bisection points that the chord between their neighbours reproduces.
+
+    Walks forward from each kept point and extends the chord as far as every
+    skipped point stays within ``tolerance``.
+    """
+    kept = [indices[0]]
+    a = 0
+    while a < len(indices) - 1:
+        b = a + 1
+        while b + 1 < len(indices) and _within(indices, values, a, b + 1, tolerance):
+            b += 1
+        kept.append(indices[b])
+        a = b
+    return kept
+
+
+def _within(indices, values, a: int, b: int, tolerance: float) -> bool:
+    ia, ib = indices[a], indices[b]
+    for k in range(a + 1, b):
+        ik = indices[k]
+        expected = values[ia] + (values[ib] - values[ia]) * ((ik - ia) / (ib - ia))
+        if np.max(np.abs(values[ik] - expected)) > tolerance:
+            return False
+    return True
@@ -0,0 +1,425 @@
+"""Vectorised evaluation of :func:`shadbala.row` and
+:func:`shadbala.compute_shadbala` over many timestamps.
+
+Ephemeris results are collected into ``(time, planet)`` arrays and every
+location-independent component is computed with NumPy array operations.
+The location-dependent parts (houses and the solar-day based kāla terms) are
+evaluated once per frame and shared by all planets and sub-balas.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from . import shadbala
+    from .ephemeris import ephemeris_arrays
+    from .series import ShadbalaSeries
+except ImportError:  # pragma: no cover - allow running file directly
+    import shadbala
+    from ephemeris import ephemeris_arrays
+    from series import ShadbalaSeries
+
+PLANET_NAMES = [name for name, _ in shadbala.PLANETS]
+COMPONENTS = ("uccha", "dig", "kala", "cheshta", "naisargika", "drik")
+SHADBALA_COMPONENTS = ("sthāna", "dig", "kāla", "cheshta", "naisargika", "drik", "total")
+
+# Bodies that may cast an aspect, in the order ``row`` adds them to positions
+ASPECTING = PLANET_NAMES + ["Rahu", "Ketu"]
+
+_EXALTATION = np.array([shadbala.EXALTATION_DEGREES[p] for p in PLANET_NAMES], dtype=float)
+_MAX_SPEED = np.array([shadbala.MAX_SPEED.get(p, 1.0) for p in PLANET_NAMES])
+_NAISARGIKA = np.array([shadbala.NAISARGIKA_BALA[p] for p in PLANET_NAMES])
+_DIRECTIONAL = np.array([shadbala.DIRECTIONAL_HOUSE[p] for p in PLANET_NAMES])
+
+_PLANET_INDEX = {name: i for i, name in enumerate(PLANET_NAMES)}
+_PLANET_IDS = np.arange(len(PLANET_NAMES))
+_SIGN_RULER = np.array([_PLANET_INDEX[r] for r in shadbala._SIGN_RULER])
+_EXALTATION_SIGN = (_EXALTATION // 30).astype(int)
+_VARGAS = (1, 2, 3, 9, 12, 30)
+_MASCULINE = np.array([p in shadbala._MASCULINE_PLANETS for p in PLANET_NAMES])
+_DIURNAL = np.array([p in shadbala._DIURNAL_PLANETS for p in PLANET_NAMES])
+# Kendrādi strength indexed by house number (index 0 is unused)
+_KENDRADI = np.array([15.0] + [60.0, 30.0, 15.0] * 4)
+_WEEKDAY_LORD = np.array([_PLANET_INDEX[shadbala.WEEKDAY_LORD[d]] for d in range(7)])
+# [hora lord, planet] and [is_day, planet] strength tables
+_HORA_STRENGTH = np.array(
+    [[shadbala._hora_strength(lord, p) for p in PLANET_NAMES] for lord in PLANET_NAMES]
+)
+_NATHONNATHA = np.array(
+    [[shadbala._nathonnatha_strength(is_day, p) for p in PLANET_NAMES] for is_day in (False, True)]
+)
+_SUN = _PLANET_INDEX["Sun"]
+_MOON = _PLANET_INDEX["Moon"]
+_SATURN = _PLANET_INDEX["Saturn"]
+
+# Sign dignity tables have one row per arc minute of longitude
+ARC_MINUTES = 21600
+_BOUNDARY_EPS = 1e-6
+
+
+def uccha_kernel(lons):
+    """Vectorised :func:`shadbala._uccha_bala`."""
+    diff = (lons - _EXALTATION) % 360.0
+    diff = np.where(diff > 180, 360 - diff, diff)
+    return 60.0 * (180.0 - diff) / 180.0
+
+
+def cheshta_kernel(speeds):
+    """Vectorised :func:`shadbala._cheshta_bala` without overshoot."""
+    ratio = np.minimum(np.abs(speeds) / _MAX_SPEED, 1.0)
+    return ratio * 60.0
+
+
+def aspect_kernel(lons, rahu):
+    """Vectorised :func:`shadbala.aspect_matrix`.
+
+    Returns a ``(time, aspected, aspecting)`` array over ``ASPECTING``, the
+    seven planets followed by Rahu and Ketu.
+    """
+    ketu = (rahu + 180.0) % 360.0
+    bodies = np.concatenate([lons, rahu[:, None], ketu[:, None]], axis=1)
+    matrix = np.zeros(bodies.shape + (len(ASPECTING),))
+    for k, name in enumerate(ASPECTING):
+        if name in shadbala.BENEFIC_PLANETS:
+            sign = 1.0
+        elif name in shadbala.MALEFIC_PLANETS:
+            sign = -1.0
+        else:
+            continue  # the Sun is treated as neutral
+        diff = (bodies[:, k : k + 1] - bodies + 360.0) % 360.0
+        matched = np.zeros(bodies.shape, dtype=bool)
+        strength = np.zeros_like(bodies)
+        aspects = shadbala.DRIK_ASPECTS.get(name, shadbala.DRIK_DEFAULT_ASPECT)
+        for angle, weight in aspects.items():
+            hit = (np.abs(diff - angle) <= shadbala.DRIK_TOL) & ~matched
+            strength[hit] = sign * (shadbala.DRIK_FULL * weight)
+            matched |= hit
+        strength[:, k] = 0.0  # a body does not aspect itself
+        matrix[:, :, k] = strength
+    return matrix
+
+
+def drik_kernel(lons, rahu, aspects=None):
+    """Vectorised :func:`shadbala._drik_bala` for all seven planets.
+
+    Row sums of :func:`aspect_kernel` (passed as ``aspects`` if already
+    computed), accumulated in the same order as ``row`` so the floating
+    point sums are identical.
+    """
+    if aspects is None:
+        aspects = aspect_kernel(lons, rahu)
+    total = np.zeros_like(lons)
+    for k in range(len(ASPECTING)):
+        total += aspects[:, : len(PLANET_NAMES), k]
+    return total
+
+
+def aspect_batch(
+    timestamps: list[datetime], use_true_node: bool = False, ephemeris: str = "exact"
+) -> list[list[list[float]]]:
+    """Return the :func:`aspect_kernel` matrix of every timestamp as nested lists."""
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    jds = [shadbala._julian_day(ts) for ts in timestamps]
+    lons, _, rahu = ephemeris_arrays(jds, use_true_node, ephemeris)
+    return aspect_kernel(lons, rahu).tolist()
+
+
+def dig_kernel(houses):
+    """Vectorised :func:`shadbala._dig_bala` from an array of house numbers."""
+    diff = np.abs(houses - _DIRECTIONAL)
+    diff = np.where(diff > 6, 12 - diff, diff)
+    return np.where(diff > 6, 0.0, 60.0 * (6 - diff) / 6)
+
+
+def _saptavargaja_direct(lons):
+    total = np.zeros_like(lons)
+    for varga, weight in zip(_VARGAS, shadbala.VARGA_WT.values()):
+        sign = np.floor(lons * varga / 30.0).astype(int) % 12
+        hit = (_SIGN_RULER[sign] == _PLANET_IDS) | (sign == _EXALTATION_SIGN)
+        total += np.where(hit, weight, 0.0)
+    return total
+
+
+def _ojayugmadi_direct(lons):
+    odd = (lons // 30).astype(int) % 2 == 0
+    return np.where(odd & _MASCULINE, 15.0, 0.0)
+
+
+def _drekkana_direct(lons):
+    sign = (lons // 30).astype(int)
+    part = np.minimum((lons % 30) // 10, 2).astype(int)
+    ruler = _SIGN_RULER[(sign + 4 * part) % 12]
+    return np.where(ruler == _PLANET_IDS, 15.0, 0.0)
+
+
+# Sign based sthāna parts, in the order of the last axis of dignity tables
+DIGNITIES = ("saptavargaja", "ojayugmadi", "drekkana")
+_DIGNITY_DIRECT = (_saptavargaja_direct, _ojayugmadi_direct, _drekkana_direct)
+
+
+def _dignity_direct(lons):
+    return np.stack([f(lons) for f in _DIGNITY_DIRECT], axis=-1)
+
+
+@lru_cache(maxsize=1)
+def dignity_table() -> np.ndarray:
+    """Return the ``(ARC_MINUTES, planet, DIGNITIES)`` sign dignity table.
+
+    Every varga, drekkana and sign boundary is a whole number of arc minutes,
+    so each row holds the values over one arc minute of longitude.  Rows are
+    evaluated at the middle of their arc minute.  Built on first use.
+    """
+    middles = (np.arange(ARC_MINUTES) + 0.5) / 60.0
+    table = _dignity_direct(np.repeat(middles[:, None], len(PLANET_NAMES), axis=1))
+    table.setflags(write=False)
+    return table
+
+
+def dignity_kernel(lons):
+    """Return ``DIGNITIES`` for a ``(time, planet)`` array of longitudes.
+
+    The result has a trailing axis in ``DIGNITIES`` order.  Frames with a
+    longitude within ``_BOUNDARY_EPS`` arc minutes of a boundary are
+    evaluated directly, where rounding decides which side the scalar
+    functions pick, so the result always equals theirs.
+    """
+    minutes = lons * 60.0
+    whole = np.floor(minutes)
+    values = dignity_table()[whole.astype(int) % ARC_MINUTES, _PLANET_IDS]
+    fraction = minutes - whole
+    near = ((fraction < _BOUNDARY_EPS) | (fraction > 1.0 - _BOUNDARY_EPS)).any(axis=1)
+    if near.any():
+        values[near] = _dignity_direct(lons[near])
+    return values
+
+
+def saptavargaja_kernel(lons):
+    """Vectorised :func:`shadbala._saptavargaja_bala`."""
+    return dignity_kernel(lons)[..., 0]
+
+
+def ojayugmadi_kernel(lons):
+    """Vectorised :func:`shadbala._ojayugmadi_bala`."""
+    return dignity_kernel(lons)[..., 1]
+
+
+def drekkana_kernel(lons):
+    """Vectorised :func:`shadbala._drekkana_bala`."""
+    return dignity_kernel(lons)[..., 2]
+
+
+def paksha_kernel(lons):
+    """:func:`shadbala._paksha_bala` in the Moon column, zero elsewhere."""
+    diff = (lons[:, _MOON] - lons[:, _SUN]) % 360.0
+    diff = np.where(diff > 180, 360 - diff, diff)
+    paksha = np.zeros_like(lons)
+    paksha[:, _MOON] = 60.0 * diff / 180.0
+    return paksha
+
+
+def ayana_kernel(lons):
+    """Vectorised :func:`shadbala._ayana_bala`."""
+    north = lons[:, _SUN : _SUN + 1] < 180.0
+    return np.where(_DIURNAL == north, 60.0, 30.0)
+
+
+def house_array(jds, lons, lat: float, lon: float) -> np.ndarray:
+    """Return the house of every planet, building each frame's chart once."""
+    houses = np.empty(lons.shape, dtype=int)
+    for t, jd in enumerate(jds):
+        chart = shadbala._chart(jd, lat, lon)
+        for p in _PLANET_IDS:
+            houses[t, p] = chart.house_of(lons[t, p])
+    return houses
+
+
+def frame_context(
+    timestamps: list[datetime], jds, lons, lat: float, lon: float
+) -> dict[str, np.ndarray]:
+    """Evaluate the chart and solar day once per frame for one location.
+
+    Returns the house of every planet and the per-frame hora lord, weekday,
+    day/night flag, tribhāga strength and yāmārdha index.
+    """
+    n = len(timestamps)
+    hora_lord = np.empty(n, dtype=int)
+    weekday = np.empty(n, dtype=int)
+    is_day = np.empty(n, dtype=bool)
+    tribhaga = np.empty(n)
+    yamardha = np.empty(n, dtype=int)
+    for t, (ts, jd) in enumerate(zip(timestamps, jds)):
+        day = shadbala._solar_day(ts, lat, lon)
+        weekday[t] = ts.weekday()
+        hora_lord[t] = _PLANET_INDEX[shadbala._hora_lord_at(day, jd, weekday[t])]
+        is_day[t] = day.is_day(jd)
+        tribhaga[t] = shadbala._tribhaga_strength(day, jd)
+        yamardha[t] = shadbala._yamardha_index(day, jd)
+    return {
+        "houses": house_array(jds, lons, lat, lon),
+        "hora_lord": hora_lord,
+        "weekday": weekday,
+        "is_day": is_day,
+        "tribhaga": tribhaga,
+        "yamardha": yamardha,
+    }
+
+
+def yamardha_kernel(index):
+    """Vectorised :func:`shadbala._yamardha_strength` for all planets."""
+    strength = np.full((len(index), len(PLANET_NAMES)), 15.0)
+    strength[:, _SATURN] = np.where(np.isin(index, (0, 7)), 30.0, 15.0)
+    strength[:, _SUN] = np.where(np.isin(index, (3, 4)), 30.0, 15.0)
+    return strength
+
+
+def location_independent(lons, speeds, rahu) -> dict[str, np.ndarray]:
+    """Return the components that depend only on planetary state."""
+    return {
+        "uccha": uccha_kernel(lons),
+        "cheshta": cheshta_kernel(speeds),
+        "naisargika": np.broadcast_to(_NAISARGIKA, lons.shape),
+        "drik": drik_kernel(lons, rahu),
+    }
+
+
+def location_dependent(
+    timestamps: list[datetime], jds, lons, lat: float, lon: float
+) -> dict[str, np.ndarray]:
+    """Return the house and hora based components for one location."""
+    context = frame_context(timestamps, jds, lons, lat, lon)
+    return {
+        "dig": dig_kernel(context["houses"]),
+        "kala": _HORA_STRENGTH[context["hora_lord"]],
+    }
+
+
+def shadbala_components(
+    timestamps: list[datetime], jds, lons, speeds, rahu, lat: float, lon: float
+) -> dict[str, np.ndarray]:
+    """Return the :func:`shadbala.compute_shadbala` components as arrays.
+
+    Terms are summed in the same order as the scalar code so the results
+    are identical.
+    """
+    context = frame_context(timestamps, jds, lons, lat, lon)
+    dignity = dignity_kernel(lons)
+    sthana = (
+        uccha_kernel(lons)
+        + dignity[..., 0]
+        + dignity[..., 1]
+        + _KENDRADI[context["houses"]]
+        + dignity[..., 2]
+    )
+    dig = dig_kernel(context["houses"])
+    kala = (
+        _HORA_STRENGTH[context["hora_lord"]]
+        + paksha_kernel(lons)
+        + _NATHONNATHA[context["is_day"].astype(int)]
+        + context["tribhaga"][:, None]
+        + ayana_kernel(lons)
+        + np.where(_WEEKDAY_LORD[context["weekday"]][:, None] == _PLANET_IDS, 15.0, 0.0)
+        + yamardha_kernel(context["yamardha"])
+    )
+    cheshta = cheshta_kernel(speeds)
+    naisargika = np.broadcast_to(_NAISARGIKA, lons.shape)
+    drik = drik_kernel(lons, rahu)
+    return {
+        "sthāna": sthana,
+        "dig": dig,
+        "kāla": kala,
+        "cheshta": cheshta,
+        "naisargika": naisargika,
+        "drik": drik,
+        "total": sthana + dig + kala + cheshta + naisargika + drik,
+    }
+
+
+def to_rows(
+    components: dict[str, np.ndarray], names: tuple[str, ...] = COMPONENTS
+) -> list[dict[str, dict[str, float]]]:
+    """Convert ``(time, planet)`` component arrays to ``row`` shaped dicts."""
+    columns = [components[c].tolist() for c in names]
+    frames = []
+    for t in range(len(columns[0])):
+        frames.append(
+            {
+                name: {c: col[t][p] for c, col in zip(names, columns)}
+                for p, name in enumerate(PLANET_NAMES)
+            }
+        )
+    return frames
+
+
+def row_batch(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> list[dict[str, dict[str, float]]]:
+    """Return ``[row(ts, lat, lon, use_true_node) for ts in timestamps]``.
+
+    With the default ``exact`` ephemeris the numbers are identical to calling
+    :func:`shadbala.row` per timestamp.  ``interpolated`` trades a documented
+    maximum error (see :mod:`ephemeris`) for far fewer ephemeris calls.
+    """
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    jds = [shadbala._julian_day(ts) for ts in timestamps]
+    lons, speeds, rahu = ephemeris_arrays(jds, use_true_node, ephemeris)
+    components = location_independent(lons, speeds, rahu)
+    components.update(location_dependent(timestamps, jds, lons, lat, lon))
+    return to_rows(components)
+
+
+def row_batch_multi(
+    timestamps: list[datetime],
+    locations: list[tuple[float, float]],
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> list[list[dict[str, dict[str, float]]]]:
+    """Return ``row_batch`` frames for each ``(lat, lon)`` in ``locations``.
+
+    Planetary state and the location-independent components are computed
+    once and shared; only houses and horas are evaluated per location.
+    """
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    jds = [shadbala._julian_day(ts) for ts in timestamps]
+    lons, speeds, rahu = ephemeris_arrays(jds, use_true_node, ephemeris)
+    shared = location_independent(lons, speeds, rahu)
+    results = []
+    for lat, lon in locations:
+        components = dict(shared)
+        components.update(location_dependent(timestamps, jds, lons, lat, lon))
+        results.append(to_rows(components))
+    return results
+
+
+def shadbala_series(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> ShadbalaSeries:
+    """Return the full model over ``timestamps`` as a :class:`ShadbalaSeries`.
+
+    Accepts the same ``ephemeris`` modes as :func:`row_batch`.
+    """
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    jds = [shadbala._julian_day(ts) for ts in timestamps]
+    lons, speeds, rahu = ephemeris_arrays(jds, use_true_node, ephemeris)
+    components = shadbala_components(timestamps, jds, lons, speeds, rahu, lat, lon)
+    return ShadbalaSeries.from_components(timestamps, components, SHADBALA_COMPONENTS)
+
+
+def shadbala_batch(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> list[dict[str, dict[str, float]]]:
+    """Return ``[compute_shadbala(ts, lat, lon, use_true_node) for ts in timestamps]``."""
+    return shadbala_series(timestamps, lat, lon, use_true_node, ephemeris).frames()
@@ -0,0 +1,214 @@
+"""In-process cache of computed ``/balas`` frames.
+
+Frames are keyed by their five-minute aligned UTC timestamp, the observer
+coordinates rounded to ``FRAME_CACHE_PRECISION`` decimals, the node flag and
+the ephemeris mode.  Entries expire after ``FRAME_CACHE_TTL`` seconds and
+the least recently used ones are evicted once the estimated size of the
+cached frames exceeds ``FRAME_CACHE_BYTES``.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+FRAME_CACHE_BYTES = int(os.getenv("FRAME_CACHE_BYTES", 64 * 1024 * 1024))
+FRAME_CACHE_TTL = float(os.getenv("FRAME_CACHE_TTL", 24 * 3600))
+FRAME_CACHE_PRECISION = int(os.getenv("FRAME_CACHE_PRECISION", 4))
+
+TICK = timedelta(minutes=5)
+
+FrameKey = tuple[int, float, float, bool, str]
+
+
+def _frame_bytes(frame: dict) -> int:
+    """Estimate the memory held by a ``{planet: {component: value}}`` frame."""
+    size = sys.getsizeof(frame)
+    for metrics in frame.values():
+        size += sys.getsizeof(metrics)
+        size += sum(sys.getsizeof(v) for v in metrics.values())
+    return size
+
+
+class FrameCache:
+    """Thread-safe LRU cache of frames with a TTL and a memory budget."""
+
+    def __init__(
+        self,
+        max_bytes: int = FRAME_CACHE_BYTES,
+        ttl: float = FRAME_CACHE_TTL,
+        precision: int = FRAME_CACHE_PRECISION,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.precision = precision
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[FrameKey, tuple[float, int, dict]] = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize(self, lat: float, lon: float) -> tuple[float, float]:
+        """Round coordinates to the precision used in cache keys."""
+        return round(lat, self.precision), round(lon, self.precision)
+
+    def key(
+        self, timestamp: datetime, lat: float, lon: float, use_true_node: bool, ephemeris: str
+    ) -> FrameKey | None:
+        """Return the cache key for a frame, or ``None`` if it is not cacheable.
+
+        Naive timestamps are taken to be UTC.  Only timestamps on the
+        five-minute grid are cached.
+        """
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        epoch = timestamp.timestamp()
+        if epoch % TICK.total_seconds():
+            return None
+        lat, lon = self.quantize(lat, lon)
+        return int(epoch), lat, lon, use_true_node, ephemeris
+
+    def get(self, key: FrameKey) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, size, frame = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                self.bytes -= size
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def contains(
+        self,
+        timestamps: list[datetime],
+        locations: list[tuple[float, float]],
+        use_true_node: bool,
+        ephemeris: str,
+    ) -> bool:
+        """Return whether every frame is cached, without counting lookups."""
+        now = self._clock()
+        with self._lock:
+            for lat, lon in locations:
+                for ts in timestamps:
+                    key = self.key(ts, lat, lon, use_true_node, ephemeris)
+                    entry = self._entries.get(key) if key is not None else None
+                    if entry is None or entry[0] <= now:
+                        return False
+        return True
+
+    def put(self, key: FrameKey, frame: dict) -> None:
+        if self.max_bytes <= 0:
+            return
+        size = _frame_bytes(frame)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (self._clock() + self.ttl, size, frame)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    async def aiter_frames(
+        self,
+        timestamps: list[datetime],
+        lat: float,
+        lon: float,
+        use_true_node: bool,
+        ephemeris: str,
+        compute: Callable[[list[datetime]], AsyncIterable[dict]],
+    ) -> AsyncIterator[dict]:
+        """Yield frames for ``timestamps``, computing only the cache misses.
+
+        ``compute`` receives the missing timestamps in order and must yield
+        their frames in the same order.  Computed frames are stored as they
+        are produced.
+        """
+        keys = [self.key(ts, lat, lon, use_true_node, ephemeris) for ts in timestamps]
+        cached = [self.get(k) if k is not None else None for k in keys]
+        missing = [ts for ts, frame in zip(timestamps, cached) if frame is None]
+        computed = aiter(compute(missing)) if missing else None
+        for key, frame in zip(keys, cached):
+            if frame is None:
+                frame = await anext(computed)
+                if key is not None:
+                    self.put(key, frame)
+            yield frame
+
+    async def aget_many(
+        self,
+        timestamps: list[datetime],
+        locations: list[tuple[float, float]],
+        use_true_node: bool,
+        ephemeris: str,
+        compute: Callable[
+            [list[datetime], list[tuple[float, float]]], Awaitable[list[list[dict]]]
+        ],
+    ) -> list[list[dict]]:
+        """Return frames for every location, computing cache misses together.
+
+        ``compute`` receives the timestamps missing for any location and the
+        locations that miss at least one of them, and returns one frame list
+        per location.
+        """
+        keys = [
+            [self.key(ts, lat, lon, use_true_node, ephemeris) for ts in timestamps]
+            for lat, lon in locations
+        ]
+        frames = [[self.get(k) if k is not None else None for k in row] for row in keys]
+        stale = [i for i, row in enumerate(frames) if None in row]
+        if not stale:
+            return frames
+        missing = sorted({t for i in stale for t, f in enumerate(frames[i]) if f is None})
+        computed = await compute([timestamps[t] for t in missing], [locations[i] for i in stale])
+        for i, new_frames in zip(stale, computed):
+            for t, frame in zip(missing, new_frames):
+                if frames[i][t] is None:
+                    frames[i][t] = frame
+                    if keys[i][t] is not None:
+                        self.put(keys[i][t], frame)
+        return frames
+
+
+def tick(moment: datetime) -> datetime:
+    """Return the five-minute tick at or before a UTC (or naive UTC) ``moment``."""
+    past_hour = timedelta(
+        minutes=moment.minute, seconds=moment.second, microseconds=moment.microsecond
+    )
+    return moment - past_hour % TICK
+
+
+frame_cache = FrameCache()
@@ -0,0 +1,268 @@
+"""Change-point output for the piecewise-constant shadbala components.
+
+Most kāla sub-balas and the sign based parts of sthāna only change at a few
+instants.  Instead of sampling them every five minutes they are reported as
+``[start, end, value]`` intervals:
+
+* hora, nathonnatha, tribhaga, yamardha and varshadi change at boundaries
+  derived from the cached :class:`shadbala.SolarDay` (hora and day/night
+  parts, UTC midnight);
+* saptavargaja, ojayugmadi and drekkana change when a planet crosses a varga
+  boundary, and ayana when the Sun crosses 0° or 180°.  Longitudes are
+  sampled at hourly knots and every boundary crossed between two knots is
+  located by safeguarded Newton iteration on ``swe.calc_ut``.
+
+Values are evaluated with the scalar functions of :mod:`shadbala` inside each
+interval, so they are exact; transition times are accurate to
+``TOLERANCE_SECONDS``.  Knots are close enough that no body crosses the same
+boundary twice between two of them.  The continuous components are still
+sampled on the requested grid.
+"""
+
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+
+try:
+    from . import batch, shadbala
+    from .ephemeris import ephemeris_arrays
+except ImportError:  # pragma: no cover - allow running file directly
+    import batch
+    import shadbala
+    from ephemeris import ephemeris_arrays
+
+STEP_COMPONENTS = (
+    "saptavargaja",
+    "ojayugmadi",
+    "drekkana",
+    "hora",
+    "nathonnatha",
+    "tribhaga",
+    "ayana",
+    "varshadi",
+    "yamardha",
+    "naisargika",
+)
+SAMPLED_COMPONENTS = ("uccha", "kendradi", "dig", "paksha", "cheshta", "drik")
+
+KNOT_STEP = timedelta(hours=1)
+TOLERANCE_SECONDS = 1.0
+MAX_ITERATIONS = 60
+
+# Varga boundaries fall on multiples of 30/varga degrees; these three steps
+# cover every varga used by ``_saptavargaja_bala`` and ``_drekkana_bala``.
+_BOUNDARY_STEPS = (1.0, 2.5, 30.0 / 9)
+
+_SIGN_PARTS = ("saptavargaja", "ojayugmadi", "drekkana")
+_SOLAR_PARTS = ("hora", "nathonnatha", "tribhaga", "yamardha")
+
+
+def _wrap(deg: float) -> float:
+    """Return ``deg`` wrapped into [-180, 180)."""
+    return (deg + 180.0) % 360.0 - 180.0
+
+
+def _boundaries(lon_a: float, delta: float) -> list[float]:
+    """Boundary longitudes crossed when moving ``delta`` degrees from ``lon_a``."""
+    lo, hi = sorted((lon_a, lon_a + delta))
+    found = set()
+    for step in _BOUNDARY_STEPS:
+        k = math.floor(lo / step) + 1
+        while k * step <= hi:
+            found.add(round((k * step) % 360.0, 9))
+            k += 1
+    return sorted(found)
+
+
+def _ingress(pid: int, target: float, jd_a: float, jd_b: float, f_a: float, f_b: float) -> float:
+    """Return the Julian day in ``[jd_a, jd_b]`` at which body ``pid`` is at ``target``.
+
+    ``f_a`` and ``f_b`` are the wrapped offsets from ``target`` at the ends of
+    the bracket.  Newton steps use the ephemeris speed and fall back to
+    bisection whenever they would leave the bracket.
+    """
+    tol = TOLERANCE_SECONDS / 86400.0
+    lo, hi = jd_a, jd_b
+    t = jd_a + (jd_b - jd_a) * f_a / (f_a - f_b) if f_a != f_b else (jd_a + jd_b) / 2
+    for _ in range(MAX_ITERATIONS):
+        lon, _, _, speed = shadbala._calc_ut(t, pid)
+        f = _wrap(lon - target)
+        if (f < 0) == (f_a < 0):
+            lo = t
+        else:
+            hi = t
+        nxt = t - f / speed if speed else lo - 1.0
+        if not lo < nxt < hi:
+            nxt = (lo + hi) / 2
+        if abs(nxt - t) < tol or hi - lo < tol:
+            return nxt
+        t = nxt
+    return t
+
+
+def _knots(start: datetime, end: datetime) -> list[datetime]:
+    knots = [start]
+    while knots[-1] < end:
+        knots.append(min(knots[-1] + KNOT_STEP, end))
+    return knots
+
+
+def _crossings(pid: int, knots: list[datetime], jds: list[float]) -> list[tuple[datetime, float]]:
+    """Return ``(time, boundary)`` for every varga boundary crossed by ``pid``."""
+    lons = [shadbala._calc_ut(jd, pid)[0] for jd in jds]
+    found = []
+    for i in range(len(knots) - 1):
+        delta = _wrap(lons[i + 1] - lons[i])
+        for target in _boundaries(lons[i], delta):
+            f_a = _wrap(lons[i] - target)
+            f_b = _wrap(lons[i + 1] - target)
+            jd = _ingress(pid, target, jds[i], jds[i + 1], f_a, f_b)
+            found.append((knots[i] + timedelta(days=jd - jds[i]), target))
+    return found
+
+
+def _solar_breaks(start: datetime, end: datetime, lat: float, lon: float) -> list[datetime]:
+    """Return every instant at which a solar-day based sub-bala may change."""
+    breaks = []
+    day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day_start <= end:
+        day = shadbala._solar_day(day_start, lat, lon)
+        sr, ss = day.sunrise, day.sunset
+        jds = [day.jd_date + 1]
+        jds += [sr + k * (ss - sr) / 12 for k in range(13)]
+        jds += [ss + k * (day.next_sunrise - ss) / 12 for k in range(13)]
+        jds += [day.prev_sunset + k * (sr - day.prev_sunset) / 12 for k in range(13)]
+        jds += [sr + k * (ss - sr) / 3 for k in range(4)]
+        jds += [ss + k * (sr - ss) / 3 for k in range(3)]
+        jds += [sr + k * (ss - sr) / 8 for k in range(9)]
+        jds += [ss + k * (sr + 1 - ss) / 8 for k in range(-8, 9)]
+        for jd in jds:
+            if day.jd_date < jd <= day.jd_date + 1:
+                breaks.append(day_start + timedelta(days=jd - day.jd_date))
+        day_start += timedelta(days=1)
+    return breaks
+
+
+def _intervals(start: datetime, end: datetime, breaks, value_at) -> list[tuple]:
+    """Evaluate ``value_at`` between consecutive breaks.
+
+    Returns ``(start, end, values)`` tuples.  ``value_at`` is called at the
+    midpoint of every piece and returns a tuple of component values.
+    """
+    points = [start] + sorted({b for b in breaks if start < b < end}) + [end]
+    if len(points) == 2 and start == end:
+        return [(start, end, value_at(start))]
+    return [(a, b, value_at(a + (b - a) / 2)) for a, b in zip(points, points[1:])]
+
+
+def _merge(pieces: list[tuple], index: int) -> list[list]:
+    """Merge consecutive pieces whose ``index``-th value is equal."""
+    merged: list[list] = []
+    for a, b, values in pieces:
+        value = values[index]
+        if merged and merged[-1][2] == value:
+            merged[-1][1] = b
+        else:
+            merged.append([a, b, value])
+    return [[a.isoformat(timespec="seconds"), b.isoformat(timespec="seconds"), v] for a, b, v in merged]
+
+
+def step_intervals(
+    start: datetime, end: datetime, lat: float, lon: float
+) -> dict[str, dict[str, list[list]]]:
+    """Return ``{planet: {component: [[start, end, value], ...]}}`` over a span."""
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    knots = _knots(start, end)
+    jds = [shadbala._julian_day(ts) for ts in knots]
+    crossings = {name: _crossings(pid, knots, jds) for name, pid in shadbala.PLANETS}
+    ayana_breaks = [ts for ts, target in crossings["Sun"] if target in (0.0, 180.0)]
+    solar_breaks = _solar_breaks(start, end, lat, lon)
+    day_breaks = [b for b in solar_breaks if b.time() == datetime.min.time()]
+
+    sun_pid = dict(shadbala.PLANETS)["Sun"]
+    sun_pieces = _intervals(
+        start,
+        end,
+        ayana_breaks,
+        lambda ts: (shadbala._calc_ut(shadbala._julian_day(ts), sun_pid)[0],),
+    )
+
+    result = {}
+    for name, pid in shadbala.PLANETS:
+
+        def sign_values(ts, pid=pid, name=name):
+            lon_deg = shadbala._calc_ut(shadbala._julian_day(ts), pid)[0]
+            return (
+                shadbala._saptavargaja_bala(lon_deg, name),
+                shadbala._ojayugmadi_bala(lon_deg, name),
+                shadbala._drekkana_bala(lon_deg, name),
+            )
+
+        def solar_values(ts, name=name):
+            return (
+                shadbala._hora_bala(ts, lat, lon, name),
+                shadbala._nathonnatha_bala(ts, lat, lon, name),
+                shadbala._tribhaga_bala(ts, lat, lon, name),
+                shadbala._yamardha_bala(ts, lat, lon, name),
+            )
+
+        sign_pieces = _intervals(start, end, [ts for ts, _ in crossings[name]], sign_values)
+        solar_pieces = _intervals(start, end, solar_breaks, solar_values)
+        ayana_pieces = [(a, b, (shadbala._ayana_bala(v[0], name),)) for a, b, v in sun_pieces]
+        varshadi_pieces = _intervals(
+            start, end, day_breaks, lambda ts, name=name: (shadbala._varshadi_bala(ts, name),)
+        )
+        planet = {c: _merge(sign_pieces, i) for i, c in enumerate(_SIGN_PARTS)}
+        planet.update({c: _merge(solar_pieces, i) for i, c in enumerate(_SOLAR_PARTS)})
+        planet["ayana"] = _merge(ayana_pieces, 0)
+        planet["varshadi"] = _merge(varshadi_pieces, 0)
+        planet["naisargika"] = _merge([(start, end, (shadbala.NAISARGIKA_BALA[name],))], 0)
+        result[name] = {c: planet[c] for c in STEP_COMPONENTS}
+    return result
+
+
+def sampled_components(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> dict[str, dict[str, list[float]]]:
+    """Return the continuous components as ``{planet: {component: values}}``."""
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    jds = [shadbala._julian_day(ts) for ts in timestamps]
+    lons, speeds, rahu = ephemeris_arrays(jds, use_true_node, ephemeris)
+    houses = batch.house_array(jds, lons, lat, lon)
+    arrays = {
+        "uccha": batch.uccha_kernel(lons),
+        "kendradi": batch._KENDRADI[houses],
+        "dig": batch.dig_kernel(houses),
+        "paksha": batch.paksha_kernel(lons),
+        "cheshta": batch.cheshta_kernel(speeds),
+        "drik": batch.drik_kernel(lons, rahu),
+    }
+    columns = {c: np.asarray(arrays[c]).T.tolist() for c in SAMPLED_COMPONENTS}
+    return {
+        name: {c: columns[c][p] for c in SAMPLED_COMPONENTS}
+        for p, name in enumerate(batch.PLANET_NAMES)
+    }
+
+
+def shadbala_changepoints(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> dict:
+    """Return the step and sampled components of the full model over ``timestamps``.
+
+    Step intervals cover ``timestamps[0]`` to ``timestamps[-1]``.
+    """
+    if not timestamps:
+        return {"steps": {}, "samples": {}}
+    return {
+        "steps": step_intervals(timestamps[0], timestamps[-1], lat, lon),
+        "samples": sampled_components(timestamps, lat, lon, use_true_node, ephemeris),
+    }
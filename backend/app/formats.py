@@ -0,0 +1,110 @@
+"""Alternative encodings of a ``/balas`` frame sequence.
+
+``columnar``
+    One array per (planet, component).  The time axis is implicit: sample
+    ``i`` is at ``start + i * interval``.
+``npy``
+    A NumPy ``.npy`` file holding a little-endian float32 array of shape
+    ``(time, planet, component)``.  Planet and component order are sent in
+    response headers.  float32 keeps about seven significant digits, which
+    is ample for bala values of a few hundred.
+``compact``
+    One encoded array per (planet, component).  Piecewise-constant
+    components (``RUN_LENGTH``) are run-length encoded as a flat
+    ``[value, count, value, count, ...]`` list.  Continuous ones (``DELTA``)
+    are rounded to multiples of ``quantum`` and sent as the integer
+    differences between consecutive samples, the first relative to zero.
+    :func:`decode_compact` (and ``decodeCompact`` in the frontend) restores
+    the ``columnar`` layout, exact for run-length components and within
+    ``quantum / 2`` for delta ones.
+"""
+
+from io import BytesIO
+
+import numpy as np
+
+try:
+    from .batch import COMPONENTS, PLANET_NAMES
+except ImportError:  # pragma: no cover - allow running file directly
+    from batch import COMPONENTS, PLANET_NAMES
+
+FORMATS = ("json", "columnar", "npy", "compact")
+
+COMPACT_QUANTUM = 1e-4
+RUN_LENGTH = ("dig", "kala", "naisargika", "drik")
+DELTA = ("uccha", "cheshta")
+
+
+def columnar(frames) -> dict[str, dict[str, list[float]]]:
+    """Return ``{planet: {component: [values...]}}`` built from ``frames``."""
+    columns = {p: {c: [] for c in COMPONENTS} for p in PLANET_NAMES}
+    for frame in frames:
+        for planet, metrics in frame.items():
+            planet_columns = columns[planet]
+            for c in COMPONENTS:
+                planet_columns[c].append(metrics[c])
+    return columns
+
+
+def to_array(frames, dtype=np.float64) -> np.ndarray:
+    """Return a ``(time, planet, component)`` array built from ``frames``."""
+    values = [
+        [[frame[p][c] for c in COMPONENTS] for p in PLANET_NAMES] for frame in frames
+    ]
+    return np.array(values, dtype=dtype).reshape(-1, len(PLANET_NAMES), len(COMPONENTS))
+
+
+def npy_bytes(frames) -> bytes:
+    """Encode ``frames`` as a little-endian float32 ``.npy`` payload."""
+    buffer = BytesIO()
+    np.save(buffer, to_array(frames, dtype="<f4"), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def run_lengths(values) -> list:
+    """Return ``[value, count, ...]`` for the runs of equal ``values``."""
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return []
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    counts = np.diff(np.r_[starts, len(values)])
+    runs = np.empty(2 * len(starts), dtype=object)
+    runs[0::2] = values[starts].tolist()
+    runs[1::2] = counts.tolist()
+    return runs.tolist()
+
+
+def deltas(values, quantum: float = COMPACT_QUANTUM) -> list[int]:
+    """Return the differences of ``values`` quantized to ``quantum``."""
+    steps = np.rint(np.asarray(values, dtype=float) / quantum).astype(np.int64)
+    return np.diff(steps, prepend=0).tolist()
+
+
+def compact(frames, quantum: float = COMPACT_QUANTUM) -> dict[str, dict[str, dict]]:
+    """Return ``{planet: {component: {"rle" | "delta": [...]}}}`` for ``frames``."""
+    encoded = {}
+    for planet, columns in columnar(frames).items():
+        encoded[planet] = {
+            c: {"rle": run_lengths(v)} if c in RUN_LENGTH else {"delta": deltas(v, quantum)}
+            for c, v in columns.items()
+        }
+    return encoded
+
+
+def decode_compact(payload: dict) -> dict[str, dict[str, list[float]]]:
+    """Decode a ``format=compact`` response into the ``columnar`` layout."""
+    quantum = payload["quantum"]
+    columns = {}
+    for planet, components in payload["data"].items():
+        columns[planet] = {}
+        for c, encoded in components.items():
+            if "rle" in encoded:
+                runs = encoded["rle"]
+                values = []
+                for value, count in zip(runs[0::2], runs[1::2]):
+                    values.extend([value] * count)
+            else:
+                steps = np.cumsum(np.asarray(encoded["delta"], dtype=np.int64))
+                values = (steps * quantum).tolist()
+            columns[planet][c] = values
+    return columns
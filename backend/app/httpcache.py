@@ -0,0 +1,72 @@
+"""HTTP validators for responses over historical ranges.
+
+A response for an explicit ``start``/``end`` range that has fully passed
+depends only on its normalized parameters and the engine: the source of this
+package, the Swiss Ephemeris version and the ephemeris files in use.  Such
+responses get a strong ``ETag`` hashed from both and a long-lived
+``Cache-Control``.  Requests whose ``If-None-Match`` matches are answered
+with ``304 Not Modified`` before any computation.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    from . import shadbala
+except ImportError:  # pragma: no cover - allow running file directly
+    import shadbala
+
+HISTORICAL_MAX_AGE = int(os.getenv("HISTORICAL_MAX_AGE", 365 * 24 * 3600))
+
+
+@lru_cache(maxsize=1)
+def engine_version() -> str:
+    """Return a digest of the package source and the ephemeris in use."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    digest.update(str(getattr(shadbala.swe, "version", "")).encode())
+    digest.update(os.getenv("SE_EPHE_PATH", "").encode())
+    return digest.hexdigest()[:16]
+
+
+def etag(params: dict) -> str:
+    """Return the strong entity tag of a response for ``params``."""
+    key = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.sha256(f"{engine_version()}\n{key}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def headers(end_utc: datetime, params: dict, now: datetime | None = None) -> dict[str, str]:
+    """Return validator and caching headers, or ``{}`` if the range is not past.
+
+    ``params`` must hold every normalized parameter that affects the body,
+    including the representation chosen from ``Accept``.
+    """
+    now = now or datetime.now(timezone.utc)
+    if end_utc >= now:
+        return {}
+    return {
+        "ETag": etag(params),
+        "Cache-Control": f"public, max-age={HISTORICAL_MAX_AGE}, immutable",
+        "Vary": "Accept",
+    }
+
+
+def not_modified(if_none_match: str | None, tag: str) -> bool:
+    """Return whether an ``If-None-Match`` header matches ``tag``.
+
+    Uses the weak comparison that RFC 9110 prescribes for ``If-None-Match``.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == tag:
+            return True
+    return False
@@ -0,0 +1,88 @@
+"""Non-blocking structured logging.
+
+Records logged to ``logger`` are put on an in-memory queue by a
+``QueueHandler``; a ``QueueListener`` thread formats them as one JSON object
+per line and writes them out, so request handlers never block on I/O.  Extra
+fields passed with ``extra={...}`` become keys of the JSON object.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Attributes every LogRecord has; anything else came from ``extra``
+_STANDARD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+logger = logging.getLogger("shadbala")
+logger.propagate = False
+
+_listener: logging.handlers.QueueListener | None = None
+_handler: logging.handlers.QueueHandler | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def start(stream=None) -> None:
+    """Start the listener thread writing JSON lines to ``stream`` (stderr)."""
+    global _listener, _handler
+    if _listener is not None:
+        return
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    _handler = logging.handlers.QueueHandler(records)
+    _listener = logging.handlers.QueueListener(records, output)
+    logger.addHandler(_handler)
+    logger.setLevel(LOG_LEVEL)
+    _listener.start()
+
+
+def start_worker(stream=None) -> None:
+    """Write records straight to ``stream`` (stderr) from a worker process.
+
+    A forked worker inherits the parent's queue handler but not the listener
+    thread draining it, so its records would never be written.  Workers do
+    not serve requests, so they can afford to write synchronously.
+    """
+    global _listener, _handler
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    _listener = _handler = None
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    logger.addHandler(output)
+    logger.setLevel(LOG_LEVEL)
+
+
+def stop() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logger.removeHandler(_handler)
+    _listener.stop()
+    _listener = _handler = None
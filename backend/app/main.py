@@ -1,29 +1,210 @@
-from fastapi import FastAPI, HTTPException, Response, Request
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
 from datetime import datetime, timedelta
+from time import perf_counter
 from zoneinfo import ZoneInfo
 import os
 import csv
+import json
 from io import StringIO
+from urllib.parse import quote
 from dotenv import load_dotenv
 
 load_dotenv()
 
 try:
     # When executed as part of the package
-    from .shadbala import row
+    from .adaptive import DEFAULT_TOLERANCE, adaptive_indices
+    from .batch import ASPECTING, SHADBALA_COMPONENTS, row_batch, shadbala_batch
+    from .changepoints import SAMPLED_COMPONENTS, STEP_COMPONENTS, shadbala_changepoints
+    from .ephemeris import EPHEMERIS_MODES
+    from .series import ShadbalaSeries
+    from . import formats, httpcache, metrics, parallel, shadbala, singleflight, stream, warmup
+    from .cache import TICK, frame_cache, tick
+    from .logs import logger
+    from . import logs
 except ImportError:  # pragma: no cover - allow running file directly
     # Fallback for running `python main.py` during development
-    from shadbala import row
+    from adaptive import DEFAULT_TOLERANCE, adaptive_indices
+    from batch import ASPECTING, SHADBALA_COMPONENTS, row_batch, shadbala_batch
+    from changepoints import SAMPLED_COMPONENTS, STEP_COMPONENTS, shadbala_changepoints
+    from ephemeris import EPHEMERIS_MODES
+    from series import ShadbalaSeries
+    import formats
+    import httpcache
+    import metrics
+    import parallel
+    import shadbala
+    import singleflight
+    import stream
+    import warmup
+    from cache import TICK, frame_cache, tick
+    from logs import logger
+    import logs
 
 app = FastAPI(root_path=os.getenv("ROOT_PATH", ""))
 
+
+@app.on_event("startup")
+async def _start_background():
+    logs.start()
+    warmup.start()
+
+
+@app.on_event("shutdown")
+def _shutdown_workers():
+    warmup.stop()
+    stream.close()
+    parallel.shutdown()
+    logs.stop()
+
+
+@app.exception_handler(parallel.PoolBusy)
+async def _pool_busy(request: Request, exc: parallel.PoolBusy):
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(parallel.JobTimeout)
+async def _job_timeout(request: Request, exc: parallel.JobTimeout):
+    return JSONResponse({"detail": str(exc)}, status_code=504)
+
+
 @app.middleware("http")
-async def log_requests(request: Request, call_next):
-    print(f"Incoming request: {request.method} {request.url.path}")
+async def observe_requests(request: Request, call_next):
+    """Time each request, add ``Server-Timing`` and log one structured line.
+
+    Stage times cover the work done before the response head is sent; the
+    body of streamed responses is computed afterwards.
+    """
+    stages = metrics.begin_request()
+    t0 = perf_counter()
     response = await call_next(request)
+    elapsed = perf_counter() - t0
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    metrics.REQUEST_SECONDS.observe(
+        elapsed, method=request.method, endpoint=endpoint, status=response.status_code
+    )
+    response.headers["Server-Timing"] = metrics.server_timing(stages, elapsed)
+    logger.info(
+        "request",
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            **{f"{stage}_ms": round(t * 1000, 3) for stage, t in stages.items()},
+        },
+    )
     return response
 
+
+def _cache_stats() -> dict[str, dict[str, float]]:
+    solar = shadbala._solar_day_cached.cache_info()
+    frames = frame_cache.stats()
+    return {
+        "frames": frames,
+        "solar_day": {"hits": solar.hits, "misses": solar.misses, "entries": solar.currsize},
+    }
+
+
+def _cache_metric(field: str):
+    return lambda: {(cache,): stats[field] for cache, stats in _cache_stats().items()}
+
+
+def _hit_ratios() -> dict[tuple[str], float]:
+    ratios = {}
+    for cache, stats in _cache_stats().items():
+        lookups = stats["hits"] + stats["misses"]
+        ratios[(cache,)] = stats["hits"] / lookups if lookups else 0.0
+    return ratios
+
+
+for _metric in (
+    metrics.Gauge(
+        "shadbala_cache_hits_total", "Cache hits.", _cache_metric("hits"), ("cache",), "counter"
+    ),
+    metrics.Gauge(
+        "shadbala_cache_misses_total", "Cache misses.", _cache_metric("misses"), ("cache",), "counter"
+    ),
+    metrics.Gauge("shadbala_cache_hit_ratio", "Cache hit ratio.", _hit_ratios, ("cache",)),
+    metrics.Gauge(
+        "shadbala_cache_entries", "Entries held in the cache.", _cache_metric("entries"), ("cache",)
+    ),
+    metrics.Gauge(
+        "shadbala_frame_cache_bytes",
+        "Estimated memory held by cached frames.",
+        lambda: {(): frame_cache.stats()["bytes"]},
+    ),
+    metrics.Gauge(
+        "shadbala_worker_jobs_pending",
+        "Jobs submitted to the worker pool that have not finished.",
+        lambda: {(): parallel.pending_jobs()},
+    ),
+):
+    metrics.register(_metric)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Return metrics in the Prometheus text exposition format.
+
+    Solar-day cache figures cover lookups made in the API process.
+    """
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/ready")
+def get_ready():
+    """Report whether startup warm-up has finished (503 until it has)."""
+    status = warmup.status()
+    if not status["ready"]:
+        return JSONResponse({"status": "warming"}, status_code=503)
+    return {"status": "ready", "locations": status["locations"], "frames": status["frames"]}
+
+
+def _json(payload) -> JSONResponse:
+    """Encode ``payload``, timing it as the ``serialize`` stage."""
+    with metrics.timed("serialize"):
+        return JSONResponse(payload)
+
+
+def _series_json(payload: dict, series: ShadbalaSeries) -> Response:
+    """Encode ``payload`` plus the frames of ``series`` as ``data``.
+
+    The frames are written straight from the series array, without building
+    frame dicts; timed as the ``serialize`` stage.
+    """
+    with metrics.timed("serialize"):
+        head = json.dumps(payload, ensure_ascii=False)[:-1]
+        body = f'{head}, "data": {series.json_frames()}}}'
+        return Response(body, media_type="application/json")
+
+
+def _npy_response(
+    body: bytes, filename: str, start_utc: datetime, interval: str, components, headers: dict
+) -> Response:
+    """Send a ``.npy`` payload with the headers describing its axes.
+
+    Header values are percent-encoded UTF-8, since component names such as
+    ``sthāna`` are not valid in HTTP headers as they are.
+    """
+    return Response(
+        body,
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "X-Start": start_utc.isoformat(),
+            "X-Interval": interval,
+            "X-Planets": ",".join(formats.PLANET_NAMES),
+            "X-Components": quote(",".join(components), safe=","),
+            **headers,
+        },
+    )
+
+
 origins_env = os.getenv("ALLOWED_ORIGINS")
 if origins_env:
     allowed_origins = [o.strip() for o in origins_env.split(",") if o.strip()]
@@ -39,111 +220,774 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Start", "X-Interval", "X-Planets", "X-Components"],
 )
 
-@app.get("/balas")
-def get_balas(
+CSV_COLUMNS = ["uccha", "dig", "kala", "cheshta", "naisargika", "drik"]
+SHADBALA_MODES = ("frames", "changepoints")
+SHADBALA_FORMATS = ("json", "npy")
+INCLUDES = ("aspects",)
 
+# Sampling intervals: "<n>m", "<n>h" or "<n>d" between these bounds, or
+# "adaptive", which samples a subset of the FRAME_STEP grid.
+FRAME_STEP = TICK
+MIN_INTERVAL = timedelta(minutes=1)
+MAX_INTERVAL = timedelta(days=1)
+_INTERVAL_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+# Reconnection delay that /balas/stream asks EventSource clients to use
+SSE_RETRY_MS = 5000
+
+
+@app.get("/balas")
+async def get_balas(
+    request: Request,
     hours_ahead: int | None = 24,
     start: str | None = None,
     end: str | None = None,
     lat: float = 40.7128,
     lon: float = -74.0060,
     use_true_node: bool = False,
+    ephemeris: str = "exact",
+    fmt: str = Query("json", alias="format"),
+    interval: str = "5m",
+    tolerance: float = DEFAULT_TOLERANCE,
+    include: str | None = None,
 ):
-    """Return shadbala rows every 5 minutes.
+    """Return shadbala rows every ``interval`` (5 minutes by default).
 
     Either ``hours_ahead`` or both ``start`` and ``end`` can be supplied. When
     ``start``/``end`` are provided they are parsed as ISO 8601 datetimes. If no
     timezone is included they are assumed to be in the ``America/New_York``
-    timezone. The range may not exceed 24 hours.
+    timezone. Long ranges are computed in parallel, one UTC day per worker;
+    the number of frames is limited by ``MAX_RANGE_FRAMES``.
+
+    ``ephemeris=interpolated`` computes planetary positions at hourly knots and
+    interpolates the samples in between (see ``ephemeris.py`` for the error
+    bounds).
+
+    Clients sending ``Accept: application/x-ndjson`` receive a stream with one
+    ``{"timestamp": ..., "data": frame}`` object per line, written as frames
+    are computed.
+
+    ``format=columnar`` returns one array per planet and component under
+    ``data[planet][component]``; ``format=npy`` returns a float32 ``.npy``
+    array of shape ``(time, planet, component)``; ``format=compact``
+    run-length encodes the step components and delta encodes ``uccha`` and
+    ``cheshta`` (see ``formats.py``).
+
+    ``interval`` is ``<n>m``, ``<n>h`` or ``<n>d`` between one minute and one
+    day. ``interval=adaptive`` samples the five-minute grid densely only where
+    the values change quickly, so that linear interpolation between frames
+    stays within ``tolerance`` (see ``adaptive.py``); the responses then list
+    the frame ``timestamps``. It is not available for ``format=npy``.
+
+    ``include=aspects`` adds the Drik aspect matrix of every frame (see
+    :func:`_aspects`); each planet's ``drik`` is the sum of its row.  It is
+    not available for ``format=npy``.
+
+    Ranges with an explicit ``end`` in the past are sent with an ``ETag``
+    and long-lived ``Cache-Control`` (see ``httpcache.py``).
+    """
+
+    if fmt not in formats.FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(formats.FORMATS)}",
+        )
+    if fmt == "npy" and interval == "adaptive":
+        raise HTTPException(status_code=400, detail="format=npy needs a fixed interval")
+    includes = _parse_include(include)
+    if fmt == "npy" and includes:
+        raise HTTPException(status_code=400, detail="format=npy cannot include extras")
+    ndjson = "application/x-ndjson" in request.headers.get("accept", "") and fmt == "json"
+    cache_headers = _cache_headers(
+        request,
+        start,
+        end,
+        location=frame_cache.quantize(lat, lon),
+        use_true_node=use_true_node,
+        ephemeris=ephemeris,
+        format="ndjson" if ndjson else fmt,
+        interval=interval,
+        tolerance=tolerance if interval == "adaptive" else None,
+        include=sorted(includes),
+    )
+    not_modified = _not_modified(request, cache_headers)
+    if not_modified:
+        return not_modified
+    start_utc, timestamps, frames = await _collect_data(
+        hours_ahead, start, end, lat, lon, use_true_node, ephemeris, interval, tolerance
+    )
+    extras = await _extras(includes, timestamps, use_true_node, ephemeris)
+    if ndjson:
+        response = StreamingResponse(
+            _ndjson_lines(timestamps, frames, extras.get("aspects")),
+            media_type="application/x-ndjson",
+        )
+        return _with_headers(response, cache_headers)
+
+    frames = [frame async for frame in frames]
+    payload = {"start": start_utc.isoformat(), "interval": interval, **extras}
+    if interval == "adaptive":
+        payload["timestamps"] = [ts.isoformat() for ts in timestamps]
+    if fmt == "columnar":
+        with metrics.timed("serialize"):
+            data = formats.columnar(frames)
+        response = _json(
+            {
+                **payload,
+                "planets": formats.PLANET_NAMES,
+                "components": list(formats.COMPONENTS),
+                "data": data,
+            }
+        )
+        return _with_headers(response, cache_headers)
+    if fmt == "compact":
+        with metrics.timed("serialize"):
+            data = formats.compact(frames)
+        response = _json(
+            {
+                **payload,
+                "count": len(frames),
+                "planets": formats.PLANET_NAMES,
+                "components": list(formats.COMPONENTS),
+                "quantum": formats.COMPACT_QUANTUM,
+                "data": data,
+            }
+        )
+        return _with_headers(response, cache_headers)
+    if fmt == "npy":
+        with metrics.timed("serialize"):
+            body = formats.npy_bytes(frames)
+        return _npy_response(
+            body, "balas.npy", start_utc, interval, formats.COMPONENTS, cache_headers
+        )
+    return _with_headers(_json({**payload, "data": frames}), cache_headers)
+
+
+async def _ndjson_lines(timestamps: list[datetime], frames, aspects=None):
+    i = 0
+    async for frame in frames:
+        ts = timestamps[i]
+        entry = {"timestamp": ts.isoformat(), "data": frame}
+        if aspects is not None:
+            entry["aspects"] = aspects[i]
+        with metrics.timed("serialize"):
+            line = json.dumps(entry) + "\n"
+        yield line
+        i += 1
+
+
+async def _csv_lines(timestamps: list[datetime], frames, columns: list[str] = CSV_COLUMNS):
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["timestamp", "planet"] + columns)
+    yield output.getvalue()
+
+    i = 0
+    async for frame in frames:
+        with metrics.timed("serialize"):
+            output.seek(0)
+            output.truncate()
+            ts = timestamps[i]
+            for planet, values in frame.items():
+                writer.writerow([ts.isoformat(), planet] + [values[c] for c in columns])
+            chunk = output.getvalue()
+        yield chunk
+        i += 1
+
+
+async def _series_csv_lines(chunks, columns: list[str]):
+    """Like :func:`_csv_lines` for :class:`ShadbalaSeries` chunks."""
+    output = StringIO()
+    csv.writer(output).writerow(["timestamp", "planet"] + columns)
+    yield output.getvalue()
+
+    async for series in chunks:
+        with metrics.timed("serialize"):
+            output.seek(0)
+            output.truncate()
+            series.write_csv(output)
+            chunk = output.getvalue()
+        yield chunk
+
+
+def _parse_include(include: str | None) -> set[str]:
+    """Return the set of extras requested with ``include=a,b``."""
+    if not include:
+        return set()
+    names = {name.strip() for name in include.split(",") if name.strip()}
+    unknown = names - set(INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"include must be a list of {', '.join(INCLUDES)}"
+        )
+    return names
+
+
+async def _extras(includes: set[str], timestamps, use_true_node: bool, ephemeris: str) -> dict:
+    """Compute the extras listed in ``includes`` for ``timestamps``."""
+    extras = {}
+    if "aspects" in includes:
+        # Aspects always take worker jobs, even when the frames were cached
+        parallel.admit()
+        extras.update(await _aspects(timestamps, use_true_node, ephemeris))
+    return extras
+
+
+async def _aspects(timestamps, use_true_node: bool, ephemeris: str) -> dict:
+    """Return the Drik aspect matrices of ``timestamps``.
+
+    ``aspects[t][i][j]`` is the signed strength with which
+    ``aspect_bodies[j]`` aspects ``aspect_bodies[i]`` at frame ``t``: rows
+    are the aspected bodies and columns the aspecting ones.  Aspects do not
+    depend on the observer, so one worker job per chunk serves any location.
+    """
+    return {
+        "aspect_bodies": list(ASPECTING),
+        "aspects": await parallel.acompute_aspects(timestamps, use_true_node, ephemeris),
+    }
+
+
+def _parse_interval(interval: str) -> timedelta | None:
+    """Return the sampling step for ``interval``, or ``None`` if adaptive."""
+    if interval == "adaptive":
+        return None
+    try:
+        step = timedelta(**{_INTERVAL_UNITS[interval[-1:]]: int(interval[:-1])})
+    except (KeyError, ValueError, OverflowError):
+        raise HTTPException(
+            status_code=400,
+            detail="interval must be a number followed by m, h or d, or adaptive",
+        )
+    if not MIN_INTERVAL <= step <= MAX_INTERVAL:
+        raise HTTPException(
+            status_code=400, detail="interval must be between 1m and 1d"
+        )
+    return step
+
+
+def _check_tolerance(tolerance: float) -> None:
+    """Reject adaptive tolerances that are not positive."""
+    if not tolerance > 0:
+        raise HTTPException(status_code=400, detail="tolerance must be positive")
+
+
+def _parse_bounds(start: str, end: str) -> tuple[datetime, datetime]:
+    """Return ``start`` and ``end`` in UTC; naive times are New York time."""
+    tz = ZoneInfo("America/New_York")
+
+    start_dt = datetime.fromisoformat(start)
+    if start_dt.tzinfo is None:
+        start_dt = start_dt.replace(tzinfo=tz)
+    else:
+        start_dt = start_dt.astimezone(tz)
+
+    end_dt = datetime.fromisoformat(end)
+    if end_dt.tzinfo is None:
+        end_dt = end_dt.replace(tzinfo=tz)
+    else:
+        end_dt = end_dt.astimezone(tz)
+    start_utc = start_dt.astimezone(ZoneInfo("UTC"))
+    end_utc = end_dt.astimezone(ZoneInfo("UTC"))
+
+    if end_utc <= start_utc:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    return start_utc, end_utc
+
+
+def _cache_headers(request: Request, start: str | None, end: str | None, **params) -> dict:
+    """Return :mod:`httpcache` headers for an explicit range in the past, else ``{}``.
+
+    ``params`` are the normalized parameters the body depends on and must
+    include ``ephemeris`` and ``interval``.  Invalid bounds yield ``{}`` and
+    are reported by the usual validation.  The other range parameters are
+    validated here, so that ``If-None-Match: *`` cannot answer an invalid
+    request with 304.
+    """
+    if not (start and end):
+        return {}
+    try:
+        start_utc, end_utc = _parse_bounds(start, end)
+    except (ValueError, HTTPException):
+        return {}
+    step = _parse_interval(params["interval"])
+    if step is None:
+        _check_tolerance(params["tolerance"])
+    _parse_range(None, start, end, params["ephemeris"], step=step or FRAME_STEP)
+    key = {"path": request.url.path, "start": start_utc, "end": end_utc, **params}
+    return httpcache.headers(end_utc, key)
+
+
+def _not_modified(request: Request, headers: dict) -> Response | None:
+    """Return a 304 response if ``If-None-Match`` matches the ``ETag`` in ``headers``."""
+    if headers and httpcache.not_modified(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _with_headers(response: Response, headers: dict) -> Response:
+    response.headers.update(headers)
+    return response
+
+
+def _parse_range(
+    hours_ahead: int | None,
+    start: str | None,
+    end: str | None,
+    ephemeris: str = "exact",
+    locations: int = 1,
+    step: timedelta = FRAME_STEP,
+) -> tuple[datetime, list[datetime]]:
+    """Validate the range parameters and return ``(start_utc, timestamps)``.
+
+    Timestamps are ``step`` apart. ``locations`` multiplies the frame count
+    checked against ``MAX_RANGE_FRAMES``.  ``hours_ahead`` windows start at
+    the current five-minute UTC tick, so repeated requests only compute the
+    frames newly exposed at the end and concurrent ones coalesce.
     """
+    if ephemeris not in EPHEMERIS_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"ephemeris must be one of {', '.join(EPHEMERIS_MODES)}",
+        )
+
+    if start and end:
+        start_utc, end_utc = _parse_bounds(start, end)
+        count = (end_utc - start_utc) // step + 1
+    else:
+        start_utc = tick(datetime.utcnow())
+        if hours_ahead is None:
+            hours_ahead = 24
+        count = int(timedelta(hours=hours_ahead) / step)
+
+    if count * locations > parallel.MAX_RANGE_FRAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"range cannot exceed {parallel.MAX_RANGE_FRAMES} frames",
+        )
+    return start_utc, [start_utc + step * i for i in range(count)]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
 
-    start_utc, frames = _collect_data(hours_ahead, start, end, lat, lon, use_true_node)
-    return {"start": start_utc.isoformat(), "interval": "5m", "data": frames}
+
+async def _adaptive(func, timestamps, lat, lon, use_true_node, ephemeris, tolerance):
+    """Compute adaptively chosen frames of ``timestamps`` in one worker job."""
+    args = (lat, lon, use_true_node, ephemeris)
+    indices, frames = await parallel.run_job(
+        adaptive_indices, func, timestamps, args, tolerance
+    )
+    model = "shadbala" if func is shadbala_batch else "balas"
+    metrics.FRAMES_COMPUTED.inc(len(frames), model=model)
+    return [timestamps[i] for i in indices], frames
 
 
-def _collect_data(
+async def _collect_data(
     hours_ahead: int | None,
     start: str | None,
     end: str | None,
     lat: float,
     lon: float,
     use_true_node: bool,
+    ephemeris: str = "exact",
+    interval: str = "5m",
+    tolerance: float = DEFAULT_TOLERANCE,
 ):
-    tz = ZoneInfo("America/New_York")
+    """Validate the query and return ``(start_utc, timestamps, frames)``.
+
+    ``frames`` is an async generator that has the worker pool compute frames
+    lazily in time order, so validation and admission errors are raised here
+    before any response is started.  Adaptive frames are computed up front.
+    Concurrent requests for the same normalized query share one computation,
+    whatever their output format.
+    """
+    step = _parse_interval(interval)
+    if step is None:
+        _check_tolerance(tolerance)
+    start_utc, timestamps = _parse_range(
+        hours_ahead, start, end, ephemeris, step=step or FRAME_STEP
+    )
+    # Compute at the cache's coordinate precision so cached and fresh frames
+    # agree regardless of which request filled the cache.
+    lat, lon = frame_cache.quantize(lat, lon)
+    key = ("balas", start_utc, len(timestamps), step, lat, lon, use_true_node, ephemeris)
+    if step is None:
+        key += (tolerance,)
+    # Requests that need no worker job are not subject to admission
+    cached = step is not None and frame_cache.contains(
+        timestamps, [(lat, lon)], use_true_node, ephemeris
+    )
+    if not (cached or singleflight.running(key)):
+        parallel.admit()
+    if step is None:
+        timestamps, frames = await singleflight.share(
+            key,
+            lambda: _adaptive(row_batch, timestamps, lat, lon, use_true_node, ephemeris, tolerance),
+        )
+        return start_utc, timestamps, _aiter(frames)
+    frames = singleflight.share_iter(
+        key,
+        lambda: frame_cache.aiter_frames(
+            timestamps,
+            lat,
+            lon,
+            use_true_node,
+            ephemeris,
+            lambda missing: parallel.aiter_range(
+                missing, lat, lon, use_true_node=use_true_node, ephemeris=ephemeris
+            ),
+        ),
+        # Buffer about one worker job of frames ahead of the slowest reader
+        window=parallel.BLOCK_FRAMES,
+    )
+    return start_utc, timestamps, frames
+
+
+class Location(BaseModel):
+    lat: float
+    lon: float
 
-    if start and end:
-        start_dt = datetime.fromisoformat(start)
-        if start_dt.tzinfo is None:
-            start_dt = start_dt.replace(tzinfo=tz)
-        else:
-            start_dt = start_dt.astimezone(tz)
-
-        end_dt = datetime.fromisoformat(end)
-        if end_dt.tzinfo is None:
-            end_dt = end_dt.replace(tzinfo=tz)
-        else:
-            end_dt = end_dt.astimezone(tz)
-        start_utc = start_dt.astimezone(ZoneInfo("UTC"))
-        end_utc = end_dt.astimezone(ZoneInfo("UTC"))
-
-        if end_utc <= start_utc:
-            raise HTTPException(status_code=400, detail="end must be after start")
-        if end_utc - start_utc > timedelta(hours=24):
-            raise HTTPException(status_code=400, detail="range cannot exceed 24 hours")
-
-        frames = []
-        current = start_utc
-        while current <= end_utc:
-            frames.append(row(current, lat, lon, use_true_node=use_true_node))
-            current += timedelta(minutes=5)
-        return start_utc, frames
-
-    now = datetime.utcnow()
-    if hours_ahead is None:
-        hours_ahead = 24
-    frames = [
-        row(now + timedelta(minutes=5 * i), lat, lon, use_true_node=use_true_node)
-        for i in range(int(hours_ahead * 12))
-    ]
-    return now, frames
+
+class BatchQuery(BaseModel):
+    locations: list[Location]
+    hours_ahead: int | None = 24
+    start: str | None = None
+    end: str | None = None
+    use_true_node: bool = False
+    ephemeris: str = "exact"
+
+
+@app.post("/balas/batch")
+async def post_balas_batch(query: BatchQuery):
+    """Return shadbala rows for several locations over one time range.
+
+    Planetary positions and the location-independent components are computed
+    once per timestamp and shared by all locations. The response maps each
+    ``"lat,lon"`` (rounded like the frame cache) to its list of frames. The
+    frame limit applies to the number of frames times locations.
+    """
+    if not query.locations:
+        raise HTTPException(status_code=400, detail="locations must not be empty")
+    locations = list(dict.fromkeys(frame_cache.quantize(l.lat, l.lon) for l in query.locations))
+    start_utc, timestamps = _parse_range(
+        query.hours_ahead, query.start, query.end, query.ephemeris, len(locations)
+    )
+    if not frame_cache.contains(timestamps, locations, query.use_true_node, query.ephemeris):
+        parallel.admit()
+    per_location = await frame_cache.aget_many(
+        timestamps,
+        locations,
+        query.use_true_node,
+        query.ephemeris,
+        lambda missing, stale: parallel.acompute_range_multi(
+            missing, stale, use_true_node=query.use_true_node, ephemeris=query.ephemeris
+        ),
+    )
+    return _json(
+        {
+            "start": start_utc.isoformat(),
+            "interval": "5m",
+            "data": {
+                f"{lat},{lon}": frames for (lat, lon), frames in zip(locations, per_location)
+            },
+        }
+    )
+
+
+@app.get("/balas/stream")
+async def get_balas_stream(
+    request: Request,
+    hours_ahead: int = 24,
+    lat: float = 40.7128,
+    lon: float = -74.0060,
+    use_true_node: bool = False,
+):
+    """Stream a live ``hours_ahead`` window of frames as Server-Sent Events.
+
+    The first ``window`` event holds ``{"start", "interval", "data"}`` for the
+    window starting at the current five-minute tick.  Every tick after that a
+    ``frame`` event holds ``{"timestamp", "data"}`` for the frame entering the
+    end of the window.  Event ids are the timestamp of the newest frame, so a
+    reconnect with ``Last-Event-ID`` resumes with the frames it missed.
+    Subscribers with the same rounded coordinates, node flag and
+    ``hours_ahead`` share one computation (see ``stream.py``).
+    """
+    if not 1 <= hours_ahead * 12 <= parallel.MAX_RANGE_FRAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"hours_ahead must be between 1 and {parallel.MAX_RANGE_FRAMES // 12}",
+        )
+    parallel.admit()
+    last_event = _parse_event_id(request.headers.get("last-event-id"))
+    events = stream.subscribe(lat, lon, use_true_node, hours_ahead, last_event)
+    return StreamingResponse(
+        _sse_lines(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _parse_event_id(value: str | None) -> datetime | None:
+    """Return the UTC timestamp in a ``Last-Event-ID`` header, if it holds one."""
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if timestamp.tzinfo is None:
+        return None
+    return timestamp.astimezone(ZoneInfo("UTC"))
+
+
+async def _sse_lines(events):
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    try:
+        async for event, timestamp, payload in events:
+            if event == "keepalive":
+                yield ": keepalive\n\n"
+                continue
+            with metrics.timed("serialize"):
+                message = (
+                    f"id: {timestamp.isoformat()}\nevent: {event}\n"
+                    f"data: {json.dumps(payload)}\n\n"
+                )
+            yield message
+    finally:
+        await events.aclose()
 
 
 @app.get("/balas.csv")
-def get_balas_csv(
+async def get_balas_csv(
+    request: Request,
+    hours_ahead: int | None = 24,
+    start: str | None = None,
+    end: str | None = None,
+    lat: float = 40.7128,
+    lon: float = -74.0060,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+    interval: str = "5m",
+    tolerance: float = DEFAULT_TOLERANCE,
+):
+    """Return shadbala rows as CSV, streamed one frame at a time."""
+
+    cache_headers = _cache_headers(
+        request,
+        start,
+        end,
+        location=frame_cache.quantize(lat, lon),
+        use_true_node=use_true_node,
+        ephemeris=ephemeris,
+        interval=interval,
+        tolerance=tolerance if interval == "adaptive" else None,
+    )
+    not_modified = _not_modified(request, cache_headers)
+    if not_modified:
+        return not_modified
+    _, timestamps, frames = await _collect_data(
+        hours_ahead, start, end, lat, lon, use_true_node, ephemeris, interval, tolerance
+    )
+    return StreamingResponse(
+        _csv_lines(timestamps, frames),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=balas.csv", **cache_headers},
+    )
+
+
+async def _collect_shadbala(
+    hours_ahead: int | None,
+    start: str | None,
+    end: str | None,
+    lat: float,
+    lon: float,
+    use_true_node: bool,
+    ephemeris: str,
+    interval: str = "5m",
+    tolerance: float = DEFAULT_TOLERANCE,
+):
+    """Like :func:`_collect_data` for the full model; frames are not cached.
+
+    Returns ``(start_utc, timestamps, chunks)`` where ``chunks`` yields
+    consecutive :class:`ShadbalaSeries`.
+    """
+    step = _parse_interval(interval)
+    if step is None:
+        _check_tolerance(tolerance)
+    start_utc, timestamps = _parse_range(
+        hours_ahead, start, end, ephemeris, step=step or FRAME_STEP
+    )
+    key = ("shadbala", start_utc, len(timestamps), step, lat, lon, use_true_node, ephemeris)
+    if step is None:
+        key += (tolerance,)
+    if not singleflight.running(key):
+        parallel.admit()
+    if step is None:
+        timestamps, frames = await singleflight.share(
+            key,
+            lambda: _adaptive(
+                shadbala_batch, timestamps, lat, lon, use_true_node, ephemeris, tolerance
+            ),
+        )
+        series = ShadbalaSeries.from_frames(timestamps, frames, SHADBALA_COMPONENTS)
+        return start_utc, timestamps, _aiter([series])
+    chunks = singleflight.share_iter(
+        key,
+        lambda: parallel.aiter_shadbala_series(
+            timestamps, lat, lon, use_true_node=use_true_node, ephemeris=ephemeris
+        ),
+        window=2,
+    )
+    return start_utc, timestamps, chunks
+
+
+@app.get("/shadbala")
+async def get_shadbala(
+    request: Request,
     hours_ahead: int | None = 24,
     start: str | None = None,
     end: str | None = None,
     lat: float = 40.7128,
     lon: float = -74.0060,
     use_true_node: bool = False,
+    ephemeris: str = "exact",
+    mode: str = "frames",
+    fmt: str = Query("json", alias="format"),
+    interval: str = "5m",
+    tolerance: float = DEFAULT_TOLERANCE,
+    include: str | None = None,
 ):
-    """Return shadbala rows as CSV."""
+    """Return the full six-fold shadbala every ``interval``.
 
-    start_utc, frames = _collect_data(hours_ahead, start, end, lat, lon, use_true_node)
+    Takes the same range and interval parameters as ``/balas``. Each frame
+    maps planets to their sthāna, dig, kāla, cheshta, naisargika and drik
+    balas and the total.
 
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["timestamp", "planet", "uccha", "dig", "kala", "cheshta", "naisargika", "drik"])
-
-    for i, frame in enumerate(frames):
-        ts = start_utc + timedelta(minutes=5 * i)
-        for planet, metrics in frame.items():
-            writer.writerow([
-                ts.isoformat(),
-                planet,
-                metrics["uccha"],
-                metrics["dig"],
-                metrics["kala"],
-                metrics["cheshta"],
-                metrics["naisargika"],
-                metrics["drik"],
-            ])
+    ``mode=changepoints`` returns the sub-balas instead. Piecewise-constant
+    ones are listed under ``steps[planet][component]`` as
+    ``[start, end, value]`` intervals with exact transition times; the
+    continuous ones are sampled every ``interval`` under
+    ``samples[planet][component]`` (see ``changepoints.py``).
 
-    return Response(
-        output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=balas.csv"},
+    ``format=npy`` returns a float32 ``.npy`` array of shape ``(time,
+    planet, component)`` as for ``/balas``, written straight from the
+    :class:`ShadbalaSeries`.  It needs ``mode=frames`` and a fixed interval.
+
+    ``include=aspects`` adds the Drik aspect matrices as for ``/balas``.  It
+    is not available for ``format=npy``.
+    """
+
+    if mode not in SHADBALA_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"mode must be one of {', '.join(SHADBALA_MODES)}",
+        )
+    if fmt not in SHADBALA_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of {', '.join(SHADBALA_FORMATS)}",
+        )
+    if fmt == "npy" and (mode != "frames" or interval == "adaptive"):
+        raise HTTPException(
+            status_code=400, detail="format=npy needs mode=frames and a fixed interval"
+        )
+    includes = _parse_include(include)
+    if fmt == "npy" and includes:
+        raise HTTPException(status_code=400, detail="format=npy cannot include extras")
+    cache_headers = _cache_headers(
+        request,
+        start,
+        end,
+        location=(lat, lon),
+        use_true_node=use_true_node,
+        ephemeris=ephemeris,
+        mode=mode,
+        format=fmt,
+        interval=interval,
+        tolerance=tolerance if interval == "adaptive" else None,
+        include=sorted(includes),
+    )
+    not_modified = _not_modified(request, cache_headers)
+    if not_modified:
+        return not_modified
+    if mode == "changepoints":
+        step = _parse_interval(interval)
+        if step is None:
+            raise HTTPException(
+                status_code=400, detail="mode=changepoints needs a fixed interval"
+            )
+        start_utc, timestamps = _parse_range(hours_ahead, start, end, ephemeris, step=step)
+        parallel.admit()
+        result = await parallel.run_job(
+            shadbala_changepoints, timestamps, lat, lon, use_true_node, ephemeris
+        )
+        metrics.FRAMES_COMPUTED.inc(len(timestamps), model="changepoints")
+        extras = await _extras(includes, timestamps, use_true_node, ephemeris)
+        response = _json(
+            {
+                "start": start_utc.isoformat(),
+                "interval": interval,
+                "mode": mode,
+                "step_components": list(STEP_COMPONENTS),
+                "sampled_components": list(SAMPLED_COMPONENTS),
+                **result,
+                **extras,
+            }
+        )
+        return _with_headers(response, cache_headers)
+
+    start_utc, timestamps, chunks = await _collect_shadbala(
+        hours_ahead, start, end, lat, lon, use_true_node, ephemeris, interval, tolerance
     )
+    extras = await _extras(includes, timestamps, use_true_node, ephemeris)
+    payload = {"start": start_utc.isoformat(), "interval": interval, **extras}
+    if interval == "adaptive":
+        payload["timestamps"] = [ts.isoformat() for ts in timestamps]
+    series = ShadbalaSeries.concat([s async for s in chunks], SHADBALA_COMPONENTS)
+    if fmt == "npy":
+        with metrics.timed("serialize"):
+            body = series.npy_bytes("<f4")
+        return _npy_response(
+            body, "shadbala.npy", start_utc, interval, SHADBALA_COMPONENTS, cache_headers
+        )
+    return _with_headers(_series_json(payload, series), cache_headers)
+
 
+@app.get("/shadbala.csv")
+async def get_shadbala_csv(
+    request: Request,
+    hours_ahead: int | None = 24,
+    start: str | None = None,
+    end: str | None = None,
+    lat: float = 40.7128,
+    lon: float = -74.0060,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+    interval: str = "5m",
+    tolerance: float = DEFAULT_TOLERANCE,
+):
+    """Return the full six-fold shadbala as CSV, streamed one frame at a time."""
+
+    cache_headers = _cache_headers(
+        request,
+        start,
+        end,
+        location=(lat, lon),
+        use_true_node=use_true_node,
+        ephemeris=ephemeris,
+        interval=interval,
+        tolerance=tolerance if interval == "adaptive" else None,
+    )
+    not_modified = _not_modified(request, cache_headers)
+    if not_modified:
+        return not_modified
+    _, _, chunks = await _collect_shadbala(
+        hours_ahead, start, end, lat, lon, use_true_node, ephemeris, interval, tolerance
+    )
+    return StreamingResponse(
+        _series_csv_lines(chunks, list(SHADBALA_COMPONENTS)),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=shadbala.csv", **cache_headers},
+    )
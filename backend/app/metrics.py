@@ -0,0 +1,226 @@
+"""Request, stage and cache metrics in the Prometheus text format.
+
+Time is attributed to stages:
+
+``calc_ut``, ``houses``, ``rise_trans``
+    Swiss Ephemeris calls, timed where :mod:`shadbala` makes them;
+``bala``
+    the rest of a worker job, i.e. the Python bala math;
+``serialize``
+    encoding responses in the API process.
+
+Ephemeris time is accumulated per thread.  Worker jobs collect it with
+:func:`take_stage_times` and return it alongside their result, and the API
+process adds it with :func:`record`, both to the process-wide totals and to
+the stages of the request being served (used for ``Server-Timing``).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+STAGES = ("calc_ut", "houses", "rise_trans", "bala", "serialize")
+EPHEMERIS_STAGES = ("calc_ut", "houses", "rise_trans")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local = threading.local()
+_request_stages: ContextVar[dict[str, float] | None] = ContextVar("request_stages", default=None)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[n]) for n in self.labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_labels(self.labels, key)} {value!r}"
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s)) for k, (c, s) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels(self.labels + ("le",), key + (le,))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, key)} {total!r}"
+            yield f"{self.name}_count{_labels(self.labels, key)} {cumulative}"
+
+
+class Gauge:
+    """Value read from ``collect`` each time the metrics are rendered.
+
+    ``collect`` returns ``{label values: value}``.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        labels: tuple[str, ...] = (),
+        kind: str = "gauge",
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.kind = kind
+        self._collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._collect().items()):
+            yield f"{self.name}{_labels(self.labels, key)} {float(value)!r}"
+
+
+REQUEST_SECONDS = Histogram(
+    "shadbala_request_duration_seconds",
+    "Time to produce the response head, by endpoint.",
+    ("method", "endpoint", "status"),
+)
+FRAMES_COMPUTED = Counter(
+    "shadbala_frames_computed_total", "Frames computed by worker jobs.", ("model",)
+)
+STAGE_SECONDS = Counter(
+    "shadbala_stage_seconds_total",
+    "Cumulative time by stage: ephemeris calls, bala math and serialization.",
+    ("stage",),
+)
+REGISTRY: list = [REQUEST_SECONDS, FRAMES_COMPUTED, STAGE_SECONDS]
+
+
+def register(metric) -> None:
+    REGISTRY.append(metric)
+
+
+def render() -> str:
+    """Return every registered metric in the Prometheus text format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def add_time(stage: str, seconds: float) -> None:
+    """Add ``seconds`` to ``stage`` in this thread's accumulator."""
+    stages = getattr(_local, "stages", None)
+    if stages is None:
+        stages = _local.stages = {}
+    stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def take_stage_times() -> dict[str, float]:
+    """Return and reset this thread's accumulated stage times."""
+    stages = getattr(_local, "stages", None) or {}
+    _local.stages = {}
+    return stages
+
+
+def timed_job(func, *args):
+    """Run ``func(*args)`` and return ``(result, stage_times)``.
+
+    Time not spent in ephemeris calls is attributed to ``bala``.  Used as the
+    worker-side wrapper of every pool job.
+    """
+    take_stage_times()
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    stages = take_stage_times()
+    ephemeris = sum(stages.get(s, 0.0) for s in EPHEMERIS_STAGES)
+    stages["bala"] = stages.get("bala", 0.0) + max(elapsed - ephemeris, 0.0)
+    return result, stages
+
+
+def begin_request() -> dict[str, float]:
+    """Start collecting stage times for the current request context."""
+    stages: dict[str, float] = {}
+    _request_stages.set(stages)
+    return stages
+
+
+def record(stages: dict[str, float]) -> None:
+    """Add ``stages`` to the totals and to the current request, if any."""
+    current = _request_stages.get()
+    for stage, seconds in stages.items():
+        STAGE_SECONDS.inc(seconds, stage=stage)
+        if current is not None:
+            current[stage] = current.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str):
+    """Record the time spent in the ``with`` block under ``stage``."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record({stage: time.perf_counter() - t0})
+
+
+def server_timing(stages: dict[str, float], total: float) -> str:
+    """Format request stage times (seconds) as a ``Server-Timing`` header."""
+    parts = [f"{s};dur={stages[s] * 1000:.1f}" for s in STAGES if stages.get(s)]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
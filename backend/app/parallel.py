@@ -0,0 +1,281 @@
+"""Ephemeris worker pool and parallel computation of time ranges.
+
+Ranges are split into UTC day-aligned chunks which are computed by a shared
+``ProcessPoolExecutor`` and merged back in order.  Each worker sets up its
+Swiss Ephemeris state (sidereal mode, ephemeris path) once when it starts, so
+requests never share the process-global ``swisseph`` state, and computes one
+frame to load the ephemeris files before it takes its first job.
+
+Jobs are at most ``BLOCK_FRAMES`` frames so streaming responses can start
+early.  At most ``QUEUE_DEPTH`` jobs may be outstanding across all requests;
+:func:`admit` rejects new requests with :class:`PoolBusy` beyond that.  Each
+job must finish within ``JOB_TIMEOUT`` seconds or :class:`JobTimeout` is
+raised.  ``PARALLEL_WORKERS=0`` runs jobs on threads of the current process
+instead, which is meant for development and tests.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import groupby
+
+try:
+    from . import logs, metrics, shadbala
+    from .batch import aspect_batch, row_batch, row_batch_multi, shadbala_series
+    from .series import ShadbalaSeries
+except ImportError:  # pragma: no cover - allow running file directly
+    import logs
+    import metrics
+    import shadbala
+    from batch import aspect_batch, row_batch, row_batch_multi, shadbala_series
+    from series import ShadbalaSeries
+
+WORKERS = int(os.getenv("PARALLEL_WORKERS", os.cpu_count() or 1))
+QUEUE_DEPTH = int(os.getenv("WORKER_QUEUE_DEPTH", 64))
+JOB_TIMEOUT = float(os.getenv("WORKER_JOB_TIMEOUT", 60))
+
+# Upper bound on the number of frames a single request may compute.  The
+# default allows 31 days of five-minute samples.
+MAX_RANGE_FRAMES = int(os.getenv("MAX_RANGE_FRAMES", 31 * 288 + 1))
+
+# Frames computed per job, and per row_batch call when computing in-process
+BLOCK_FRAMES = 72
+
+_executor: ProcessPoolExecutor | None = None
+_threads: ThreadPoolExecutor | None = None
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+
+class PoolBusy(RuntimeError):
+    """Raised when the worker queue is full."""
+
+
+class JobTimeout(TimeoutError):
+    """Raised when a worker job exceeds ``JOB_TIMEOUT``."""
+
+
+def warm_worker() -> None:
+    """Load the ephemeris files and make the first Swiss Ephemeris calls."""
+    shadbala.compute_shadbala(datetime.now(timezone.utc), 0.0, 0.0)
+
+
+def _init_worker() -> None:
+    swe = shadbala.swe
+    ephe_path = os.getenv("SE_EPHE_PATH")
+    if ephe_path:
+        swe.set_ephe_path(ephe_path)
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+    logs.start_worker()
+    try:
+        warm_worker()
+    except Exception:
+        # Raising here would break the pool; a cold worker is only slower
+        logs.logger.warning("worker warm-up failed", exc_info=True)
+
+
+def _compute_chunk(
+    timestamps: list[datetime], lat: float, lon: float, use_true_node: bool, ephemeris: str
+):
+    return row_batch(timestamps, lat, lon, use_true_node=use_true_node, ephemeris=ephemeris)
+
+
+def _compute_shadbala_chunk(
+    timestamps: list[datetime], lat: float, lon: float, use_true_node: bool, ephemeris: str
+):
+    return shadbala_series(
+        timestamps, lat, lon, use_true_node=use_true_node, ephemeris=ephemeris
+    )
+
+
+def _compute_aspects_chunk(timestamps: list[datetime], use_true_node: bool, ephemeris: str):
+    return aspect_batch(timestamps, use_true_node=use_true_node, ephemeris=ephemeris)
+
+
+def _compute_chunk_multi(
+    timestamps: list[datetime],
+    locations: list[tuple[float, float]],
+    use_true_node: bool,
+    ephemeris: str,
+):
+    return row_batch_multi(
+        timestamps, locations, use_true_node=use_true_node, ephemeris=ephemeris
+    )
+
+
+def day_chunks(timestamps: list[datetime]) -> list[list[datetime]]:
+    """Split ordered ``timestamps`` into runs sharing the same UTC date."""
+    return [list(chunk) for _, chunk in groupby(timestamps, key=lambda ts: ts.date())]
+
+
+def job_chunks(timestamps: list[datetime]) -> list[list[datetime]]:
+    """Split ``timestamps`` into day-aligned jobs of at most ``BLOCK_FRAMES``."""
+    return [
+        day[i : i + BLOCK_FRAMES]
+        for day in day_chunks(timestamps)
+        for i in range(0, len(day), BLOCK_FRAMES)
+    ]
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared worker pool, starting it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=WORKERS, initializer=_init_worker)
+    return _executor
+
+
+def _job_executor() -> Executor:
+    """Return the executor for async jobs: the pool, or threads if disabled."""
+    global _threads
+    if WORKERS > 0:
+        return get_executor()
+    if _threads is None:
+        _threads = ThreadPoolExecutor(thread_name_prefix="ephemeris")
+    return _threads
+
+
+def shutdown() -> None:
+    global _executor, _threads
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+    if _threads is not None:
+        _threads.shutdown(cancel_futures=True)
+        _threads = None
+
+
+def _job_done(_: Future) -> None:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight -= 1
+
+
+def pending_jobs() -> int:
+    """Return the number of submitted jobs that have not finished."""
+    return _in_flight
+
+
+def admit() -> None:
+    """Raise :class:`PoolBusy` if the worker queue is already full."""
+    if _in_flight >= QUEUE_DEPTH:
+        raise PoolBusy(f"worker queue is full ({QUEUE_DEPTH} jobs)")
+
+
+def _submit(func, *args) -> Future:
+    global _in_flight
+    with _in_flight_lock:
+        _in_flight += 1
+    try:
+        future = _job_executor().submit(metrics.timed_job, func, *args)
+    except BaseException:
+        with _in_flight_lock:
+            _in_flight -= 1
+        raise
+    future.add_done_callback(_job_done)
+    return future
+
+
+async def run_job(func, *args):
+    """Run ``func(*args)`` on the worker pool and await its result.
+
+    The job's stage times are added to :mod:`metrics`.  A job that times out
+    is cancelled if it has not started; a job already running in a worker
+    process finishes in the background.
+    """
+    future = _submit(func, *args)
+    try:
+        result, stages = await asyncio.wait_for(asyncio.wrap_future(future), JOB_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise JobTimeout(f"worker job exceeded {JOB_TIMEOUT:g} seconds") from None
+    metrics.record(stages)
+    return result
+
+
+async def _aiter_chunks(func, timestamps: list[datetime], args: tuple) -> AsyncIterator:
+    """Yield the results of ``func(chunk, *args)`` for the jobs of ``timestamps``.
+
+    Every chunk is a :func:`run_job` job.  At most two jobs per worker are in
+    flight at a time, which bounds the memory held for results the consumer
+    has not read yet.
+    """
+    chunks = job_chunks(timestamps)
+    window = 2 * max(WORKERS, 1)
+    pending: deque[asyncio.Task] = deque()
+    try:
+        for chunk in chunks:
+            pending.append(asyncio.ensure_future(run_job(func, chunk, *args)))
+            if len(pending) >= window:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def aiter_range(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> AsyncIterator[dict]:
+    """Yield ``row_batch`` frames for ``timestamps`` computed by the pool."""
+    args = (lat, lon, use_true_node, ephemeris)
+    async for frames in _aiter_chunks(_compute_chunk, timestamps, args):
+        metrics.FRAMES_COMPUTED.inc(len(frames), model="balas")
+        for frame in frames:
+            yield frame
+
+
+async def aiter_shadbala_series(
+    timestamps: list[datetime],
+    lat: float,
+    lon: float,
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> AsyncIterator[ShadbalaSeries]:
+    """Yield consecutive ``shadbala_series`` chunks of ``timestamps`` computed by the pool.
+
+    Workers return the chunks as arrays, which are much cheaper to pickle
+    than frame dicts.
+    """
+    args = (lat, lon, use_true_node, ephemeris)
+    async for series in _aiter_chunks(_compute_shadbala_chunk, timestamps, args):
+        metrics.FRAMES_COMPUTED.inc(len(series), model="shadbala")
+        yield series
+
+
+async def acompute_range_multi(
+    timestamps: list[datetime],
+    locations: list[tuple[float, float]],
+    use_true_node: bool = False,
+    ephemeris: str = "exact",
+) -> list[list[dict]]:
+    """Return one ``row_batch`` frame list per location, computed by the pool.
+
+    Each job computes the planetary state of its chunk once and derives the
+    frames of every location from it.
+    """
+    results = [[] for _ in locations]
+    args = (locations, use_true_node, ephemeris)
+    async for chunk in _aiter_chunks(_compute_chunk_multi, timestamps, args):
+        metrics.FRAMES_COMPUTED.inc(sum(map(len, chunk)), model="balas")
+        for frames, computed in zip(results, chunk):
+            frames.extend(computed)
+    return results
+
+
+async def acompute_aspects(
+    timestamps: list[datetime], use_true_node: bool = False, ephemeris: str = "exact"
+) -> list[list[list[float]]]:
+    """Return the aspect matrix of every timestamp, computed by the pool."""
+    matrices = []
+    async for chunk in _aiter_chunks(_compute_aspects_chunk, timestamps, (use_true_node, ephemeris)):
+        matrices.extend(chunk)
+    return matrices
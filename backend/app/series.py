@@ -0,0 +1,119 @@
+"""Struct-of-arrays container for a run of shadbala frames.
+
+:class:`ShadbalaSeries` keeps the timestamps of a range and one float64
+array of shape ``(time, planet, component)`` instead of a nested
+``{planet: {component: value}}`` dict per frame.  Per-planet and
+per-component views share that array.  The JSON, CSV and ``.npy`` writers
+read it directly, so no intermediate dicts are built.  :meth:`frames`
+still returns the dict shape of :func:`shadbala.row` and
+:func:`shadbala.compute_shadbala`.
+"""
+
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+
+try:
+    from . import shadbala
+except ImportError:  # pragma: no cover - allow running file directly
+    import shadbala
+
+PLANET_NAMES = tuple(name for name, _ in shadbala.PLANETS)
+
+
+def _key(name: str) -> str:
+    return json.dumps(name, ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class ShadbalaSeries:
+    """Frames at ``timestamps`` stored as ``values[time, planet, component]``."""
+
+    timestamps: list[datetime]
+    values: np.ndarray
+    components: tuple[str, ...]
+    planets: tuple[str, ...] = PLANET_NAMES
+
+    @classmethod
+    def from_components(
+        cls, timestamps: list[datetime], components: dict[str, np.ndarray], names: tuple[str, ...]
+    ) -> "ShadbalaSeries":
+        """Stack ``(time, planet)`` component arrays in ``names`` order."""
+        values = np.empty((len(timestamps), len(PLANET_NAMES), len(names)))
+        for c, name in enumerate(names):
+            values[:, :, c] = components[name]
+        return cls(list(timestamps), values, tuple(names))
+
+    @classmethod
+    def from_frames(
+        cls, timestamps: list[datetime], frames: list[dict], names: tuple[str, ...]
+    ) -> "ShadbalaSeries":
+        """Build a series from frames in the dict shape."""
+        values = np.array(
+            [[[frame[p][c] for c in names] for p in PLANET_NAMES] for frame in frames],
+            dtype=float,
+        ).reshape(len(frames), len(PLANET_NAMES), len(names))
+        return cls(list(timestamps), values, tuple(names))
+
+    @classmethod
+    def concat(cls, parts: list["ShadbalaSeries"], names: tuple[str, ...]) -> "ShadbalaSeries":
+        """Join consecutive series with the same components."""
+        if not parts:
+            return cls([], np.empty((0, len(PLANET_NAMES), len(names))), tuple(names))
+        timestamps = [ts for part in parts for ts in part.timestamps]
+        return cls(timestamps, np.concatenate([p.values for p in parts]), parts[0].components)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def planet(self, name: str) -> np.ndarray:
+        """Return a ``(time, component)`` view of one planet."""
+        return self.values[:, self.planets.index(name), :]
+
+    def component(self, name: str) -> np.ndarray:
+        """Return a ``(time, planet)`` view of one component."""
+        return self.values[:, :, self.components.index(name)]
+
+    def frames(self) -> list[dict[str, dict[str, float]]]:
+        """Return the frames as ``{planet: {component: value}}`` dicts."""
+        return [
+            {p: dict(zip(self.components, values)) for p, values in zip(self.planets, frame)}
+            for frame in self.values.tolist()
+        ]
+
+    def columnar(self) -> dict[str, dict[str, list[float]]]:
+        """Return ``{planet: {component: [values...]}}``."""
+        columns = self.values.transpose(1, 2, 0).tolist()
+        return {
+            p: dict(zip(self.components, planet)) for p, planet in zip(self.planets, columns)
+        }
+
+    def json_frames(self) -> str:
+        """Return the frames as a JSON array, formatted like ``json.dumps``.
+
+        Each frame is written by filling a template with the ``repr`` of its
+        values, which is how ``json`` formats finite floats.
+        """
+        template = "{%s}" % ",".join(
+            "%s:{%s}" % (_key(p), ",".join(f"{_key(c)}:%r" for c in self.components))
+            for p in self.planets
+        )
+        flat = self.values.reshape(len(self), len(self.planets) * len(self.components)).tolist()
+        return "[" + ",".join(template % tuple(frame) for frame in flat) + "]"
+
+    def write_csv(self, stream) -> None:
+        """Write one ``timestamp, planet, components...`` row per planet and frame."""
+        writer = csv.writer(stream)
+        for ts, frame in zip(self.timestamps, self.values.tolist()):
+            stamp = ts.isoformat()
+            writer.writerows([stamp, p] + values for p, values in zip(self.planets, frame))
+
+    def npy_bytes(self, dtype="<f8") -> bytes:
+        """Encode the values as a ``.npy`` payload of ``dtype``."""
+        buffer = BytesIO()
+        np.save(buffer, self.values.astype(dtype, copy=False), allow_pickle=False)
+        return buffer.getvalue()
@@ -1,7 +1,16 @@
+from bisect import bisect_right
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from time import perf_counter
 import math
 import swisseph as swe
 
+try:
+    from . import metrics
+except ImportError:  # pragma: no cover - allow running file directly
+    import metrics
+
 # Use sidereal calculations with the Lahiri ayanamsa
 swe.set_sid_mode(swe.SIDM_LAHIRI)
 
@@ -119,42 +128,91 @@ HORA_REL = {
 }
 
 
-def _get_hora_lord(timestamp: datetime, lat: float, lon: float) -> str:
-    """Determine the planetary lord of the current hora."""
-    jd_date = swe.julday(timestamp.year, timestamp.month, timestamp.day, 0.0)
+# Solar-day contexts are shared by every kāla sub-bala.  Coordinates are
+# rounded so that nearby requests reuse the same entry.
+SOLAR_DAY_CACHE_SIZE = 4096
+SOLAR_DAY_PRECISION = 4
+
+
+def _julian_day(timestamp: datetime) -> float:
+    """Return the Julian day for ``timestamp`` in universal time."""
+    return swe.julday(
+        timestamp.year,
+        timestamp.month,
+        timestamp.day,
+        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
+    )
 
+
+@dataclass(frozen=True)
+class SolarDay:
+    """Sunrise and sunset times (Julian days) around a civil date."""
+
+    jd_date: float
+    sunrise: float
+    sunset: float
+    next_sunrise: float
+    prev_sunset: float
+
+    def is_day(self, jd_now: float) -> bool:
+        return self.sunrise <= jd_now < self.sunset
+
+
+@lru_cache(maxsize=SOLAR_DAY_CACHE_SIZE)
+def _solar_day_cached(jd_date: float, lat: float, lon: float) -> SolarDay:
+    t0 = perf_counter()
     try:
         sr = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_RISE)[1][0]
         ss = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_SET)[1][0]
         sr_next = swe.rise_trans(jd_date + 1, swe.SUN, lon, lat, swe.CALC_RISE)[1][0]
         ss_prev = swe.rise_trans(jd_date - 1, swe.SUN, lon, lat, swe.CALC_SET)[1][0]
-    except (TypeError, Exception):
+    except Exception:
         # Fallback to naive 6am/6pm times if ephemeris is unavailable
         sr = jd_date + 0.25
         ss = jd_date + 0.75
         sr_next = sr + 1.0
         ss_prev = ss - 1.0
+    metrics.add_time("rise_trans", perf_counter() - t0)
+    return SolarDay(jd_date, sr, ss, sr_next, ss_prev)
 
-    jd_now = swe.julday(
-        timestamp.year,
-        timestamp.month,
-        timestamp.day,
-        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
+
+def _solar_day(timestamp: datetime, lat: float, lon: float) -> SolarDay:
+    """Return the cached :class:`SolarDay` for the date of ``timestamp``.
+
+    Entries are keyed by the Julian day of the date and the rounded
+    coordinates, and evicted least-recently-used once
+    ``SOLAR_DAY_CACHE_SIZE`` days are held.
+    """
+    jd_date = swe.julday(timestamp.year, timestamp.month, timestamp.day, 0.0)
+    return _solar_day_cached(
+        jd_date, round(lat, SOLAR_DAY_PRECISION), round(lon, SOLAR_DAY_PRECISION)
     )
 
+
+def _hora_index(day: SolarDay, jd_now: float) -> int:
+    """Index (0..23) of the unequal hora containing ``jd_now``."""
+    sr, ss = day.sunrise, day.sunset
     if sr <= jd_now < ss:
         hora_len = (ss - sr) / 12.0
-        hora_index = int((jd_now - sr) / hora_len)
-    elif jd_now >= ss:
-        hora_len = (sr_next - ss) / 12.0
-        hora_index = 12 + int((jd_now - ss) / hora_len)
-    else:  # before sunrise
-        hora_len = (sr - ss_prev) / 12.0
-        hora_index = 12 + int((jd_now - ss_prev) / hora_len)
+        return int((jd_now - sr) / hora_len)
+    if jd_now >= ss:
+        hora_len = (day.next_sunrise - ss) / 12.0
+        return 12 + int((jd_now - ss) / hora_len)
+    # before sunrise
+    hora_len = (sr - day.prev_sunset) / 12.0
+    return 12 + int((jd_now - day.prev_sunset) / hora_len)
 
-    weekday_lord = WEEKDAY_LORD[timestamp.weekday()]
-    start_idx = HORA_SEQUENCE.index(weekday_lord)
-    return HORA_SEQUENCE[(start_idx + hora_index) % 7]
+
+def _hora_lord_at(day: SolarDay, jd_now: float, weekday: int) -> str:
+    """Planetary lord of the hora containing ``jd_now``."""
+    start_idx = HORA_SEQUENCE.index(WEEKDAY_LORD[weekday])
+    return HORA_SEQUENCE[(start_idx + _hora_index(day, jd_now)) % 7]
+
+
+def _get_hora_lord(timestamp: datetime, lat: float, lon: float) -> str:
+    """Determine the planetary lord of the current hora."""
+    day = _solar_day(timestamp, lat, lon)
+    return _hora_lord_at(day, _julian_day(timestamp), timestamp.weekday())
 
 
 # Order of hora lords used for the repeating sequence
@@ -174,25 +232,73 @@ def _uccha_bala(longitude: float, planet: str) -> float:
     return 60.0 * (180.0 - diff) / 180.0
 
 
-def _dig_bala(jd: float, lat: float, lon: float, planet_long: float, planet: str) -> float:
-    """Directional strength using actual house position."""
+@dataclass(frozen=True)
+class Chart:
+    """House cusps for one moment and location.
+
+    ``cusps`` is ``None`` when Swiss Ephemeris could not compute houses, in
+    which case :meth:`house_of` falls back to whole-sign houses.
+    """
+
+    cusps: tuple[float, ...] | None
+    ascendant: float | None
+    starts: tuple[float, ...] = ()
+    ends: tuple[float, ...] = ()
+    houses: tuple[int, ...] = ()
+
+    def house_of(self, planet_long: float) -> int:
+        """Return the house (1..12) containing ``planet_long``."""
+        if self.cusps is None:
+            return int(planet_long % 360 // 30) + 1
+        lon_norm = planet_long % 360
+        idx = bisect_right(self.starts, lon_norm) - 1
+        # Longitudes before the first cusp or past the end of an interval
+        # fall through to the 12th house, as the cusp scan always did.
+        if idx < 0 or lon_norm >= self.ends[idx]:
+            return 12
+        return self.houses[idx]
+
+
+def _chart(jd: float, lat: float, lon: float) -> Chart:
+    """Compute house cusps once and index them for fast lookups."""
+    t0 = perf_counter()
     try:
-        cusps, _ = swe.houses(jd, lat, lon)
+        cusps, ascmc = swe.houses(jd, lat, lon)
     except Exception:
-        # Fallback to sign-based house if house computation fails
-        house = int(planet_long % 360 // 30) + 1
-    else:
-        # Determine which house the planet occupies
-        house = 12
-        lon_norm = planet_long % 360
-        for i in range(12):
-            start = cusps[i] % 360
-            end = cusps[(i + 1) % 12] % 360
-            if end < start:
-                end += 360
-            if start <= lon_norm < end:
-                house = i + 1
-                break
+        return Chart(None, None)
+    finally:
+        metrics.add_time("houses", perf_counter() - t0)
+
+    intervals = []
+    for i in range(12):
+        start = cusps[i] % 360
+        end = cusps[(i + 1) % 12] % 360
+        if end < start:
+            end += 360
+        if start < end:
+            intervals.append((start, end, i + 1))
+    intervals.sort()
+    return Chart(
+        tuple(cusps[:12]),
+        ascmc[0],
+        tuple(start for start, _, _ in intervals),
+        tuple(end for _, end, _ in intervals),
+        tuple(house for _, _, house in intervals),
+    )
+
+
+def _dig_bala(
+    jd: float,
+    lat: float,
+    lon: float,
+    planet_long: float,
+    planet: str,
+    chart: Chart | None = None,
+) -> float:
+    """Directional strength using actual house position."""
+    if chart is None:
+        chart = _chart(jd, lat, lon)
+    house = chart.house_of(planet_long)
 
     diff = abs(house - DIRECTIONAL_HOUSE[planet])
     if diff > 6:
@@ -202,10 +308,8 @@ def _dig_bala(jd: float, lat: float, lon: float, planet_long: float, planet: str
     return 60.0 * (6 - diff) / 6
 
 
-def _kala_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
-    """Time strength using unequal horas and a 5-tier friendship model."""
-    hora_lord = _get_hora_lord(timestamp, lat, lon)
-
+def _hora_strength(hora_lord: str, planet: str) -> float:
+    """5-tier friendship strength of ``planet`` in the hora of ``hora_lord``."""
     if planet == hora_lord:
         return 60.0  # Adhi Mitra (great friend) - self
 
@@ -213,10 +317,15 @@ def _kala_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> floa
         return 45.0  # Mitra (friend)
     if planet in HORA_REL[hora_lord]["neutral"]:
         return 30.0  # Sama (neutral)
-    
+
     return 15.0 # Satru (enemy)
 
 
+def _kala_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
+    """Time strength using unequal horas and a 5-tier friendship model."""
+    return _hora_strength(_get_hora_lord(timestamp, lat, lon), planet)
+
+
 def _cheshta_bala(speed: float, planet: str, overshoot: bool = False) -> float:
     """Motion strength, capped at 60 unless overshoot is allowed."""
     max_speed = MAX_SPEED.get(planet, 1.0)
@@ -227,6 +336,21 @@ def _cheshta_bala(speed: float, planet: str, overshoot: bool = False) -> float:
     return ratio * 60.0
 
 
+# Drik bala: strength of a full aspect and the angular tolerance in degrees
+DRIK_FULL = 60.0
+DRIK_TOL = 5.0
+
+# Aspect angles for Mars, Jupiter and Saturn.  Other planets only aspect the
+# 7th house (180°).  Weights implement the commonly used fractional values
+# for specific aspects.
+DRIK_ASPECTS: dict[str, dict[int, float]] = {
+    "Mars": {90: 1.0, 180: 1.0, 210: 1.0},       # 4th, 7th, 8th
+    "Jupiter": {120: 0.6, 180: 1.0, 240: 0.6},   # 5th, 7th, 9th
+    "Saturn": {60: 1.0, 180: 1.0, 270: 1.0},     # 3rd, 7th, 10th
+}
+DRIK_DEFAULT_ASPECT = {180: 1.0}
+
+
 def _drik_bala(plon: float, planet: str, positions: dict[str, float]) -> float:
     """Return Drik Bala based on classical Graha Drishti rules.
 
@@ -240,28 +364,14 @@ def _drik_bala(plon: float, planet: str, positions: dict[str, float]) -> float:
     if not others:
         return 0.0
 
-    FULL = 60.0  # strength of a full aspect
-    TOL = 5.0    # angular tolerance in degrees
-
-    # Aspect angles for Mars, Jupiter and Saturn.  Other planets only aspect the
-    # 7th house (180°).  Weights implement the commonly used fractional values
-    # for specific aspects.
-    ASPECTS: dict[str, dict[int, float]] = {
-        "Mars": {90: 1.0, 180: 1.0, 210: 1.0},       # 4th, 7th, 8th
-        "Jupiter": {120: 0.6, 180: 1.0, 240: 0.6},   # 5th, 7th, 9th
-        "Saturn": {60: 1.0, 180: 1.0, 270: 1.0},     # 3rd, 7th, 10th
-    }
-
-    DEFAULT_ASPECT = {180: 1.0}
-
     total = 0.0
     for name, other in others.items():
         # measure from the aspecting planet toward the target planet
         diff = (other - plon + 360.0) % 360.0
-        aspects = ASPECTS.get(name, DEFAULT_ASPECT)
+        aspects = DRIK_ASPECTS.get(name, DRIK_DEFAULT_ASPECT)
         for angle, weight in aspects.items():
-            if abs(diff - angle) <= TOL:
-                strength = FULL * weight
+            if abs(diff - angle) <= DRIK_TOL:
+                strength = DRIK_FULL * weight
                 if name in BENEFIC_PLANETS:
                     total += strength
                 elif name in MALEFIC_PLANETS:
@@ -272,6 +382,57 @@ def _drik_bala(plon: float, planet: str, positions: dict[str, float]) -> float:
     return total
 
 
+def aspect_matrix(positions: dict[str, float]) -> dict[str, dict[str, float]]:
+    """Return ``{aspected: {aspecting: strength}}`` for every pair of bodies.
+
+    Entries are the signed strengths :func:`_drik_bala` adds up: zero for a
+    body and itself, for the neutral Sun and where no aspect applies.  The
+    Drik Bala of a body is therefore the sum of its row (see
+    :func:`_drik_total`).  Computes all pairs in one pass.
+    """
+    matrix: dict[str, dict[str, float]] = {name: {} for name in positions}
+    for name, other in positions.items():
+        if name in BENEFIC_PLANETS:
+            sign = 1.0
+        elif name in MALEFIC_PLANETS:
+            sign = -1.0
+        else:
+            sign = 0.0
+        aspects = DRIK_ASPECTS.get(name, DRIK_DEFAULT_ASPECT)
+        for target, plon in positions.items():
+            strength = 0.0
+            if sign and target != name:
+                diff = (other - plon + 360.0) % 360.0
+                for angle, weight in aspects.items():
+                    if abs(diff - angle) <= DRIK_TOL:
+                        strength = sign * (DRIK_FULL * weight)
+                        break
+            matrix[target][name] = strength
+    return matrix
+
+
+def _drik_total(aspects: dict[str, float]) -> float:
+    """Sum a row of :func:`aspect_matrix` in aspecting-body order."""
+    total = 0.0
+    for strength in aspects.values():
+        total += strength
+    return total
+
+
+def _calc_ut(jd: float, pid: int) -> tuple[float, float, float, float]:
+    """Return (longitude, latitude, distance, speed) from ``swe.calc_ut``."""
+    t0 = perf_counter()
+    calc_result = swe.calc_ut(jd, pid)
+    metrics.add_time("calc_ut", perf_counter() - t0)
+    if (
+        isinstance(calc_result, tuple)
+        and len(calc_result) == 2
+        and isinstance(calc_result[0], (list, tuple))
+    ):
+        return tuple(calc_result[0][:4])
+    return tuple(calc_result[:4])
+
+
 def row(timestamp: datetime, lat: float, lon: float, use_true_node: bool = False):
     """Return dict of {planet: {uccha, dig, kala, cheshta, naisargika, drik}}.
 
@@ -289,29 +450,17 @@ def row(timestamp: datetime, lat: float, lon: float, use_true_node: bool = False
         be added to the internal positions dictionary for Drik bala purposes.
     """
     swe.set_sid_mode(swe.SIDM_LAHIRI)
-    jd = swe.julday(
-        timestamp.year,
-        timestamp.month,
-        timestamp.day,
-        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
-    )
+    jd = _julian_day(timestamp)
+    chart = _chart(jd, lat, lon)
     results = {}
     positions: dict[str, float] = {}
 
     for name, pid in PLANETS:
-        calc_result = swe.calc_ut(jd, pid)
-        if (
-            isinstance(calc_result, tuple)
-            and len(calc_result) == 2
-            and isinstance(calc_result[0], (list, tuple))
-        ):
-            lon_deg, lat_deg, dist, speed = calc_result[0][:4]
-        else:
-            lon_deg, lat_deg, dist, speed = calc_result[:4]
+        lon_deg, lat_deg, dist, speed = _calc_ut(jd, pid)
         positions[name] = lon_deg
         results[name] = {
             "uccha": _uccha_bala(lon_deg, name),
-            "dig": _dig_bala(jd, lat, lon, lon_deg, name),
+            "dig": _dig_bala(jd, lat, lon, lon_deg, name, chart),
             "kala": _kala_bala(timestamp, lat, lon, name),
             "cheshta": _cheshta_bala(speed, name),
             "naisargika": NAISARGIKA_BALA[name],
@@ -322,23 +471,15 @@ def row(timestamp: datetime, lat: float, lon: float, use_true_node: bool = False
     # returned results by default but can be injected into ``positions`` when
     # Drik bala calculations should consider the lunar nodes.
     node_pid = swe.TRUE_NODE if use_true_node else swe.MEAN_NODE
-    node_calc = swe.calc_ut(jd, node_pid)
-    if (
-        isinstance(node_calc, tuple)
-        and len(node_calc) == 2
-        and isinstance(node_calc[0], (list, tuple))
-    ):
-        rahu_lon = node_calc[0][0]
-    else:
-        rahu_lon = node_calc[0]
+    rahu_lon = _calc_ut(jd, node_pid)[0]
     ketu_lon = (rahu_lon + 180.0) % 360.0
     # Include the lunar nodes so they contribute to Drik bala calculations
     positions["Rahu"] = rahu_lon
     positions["Ketu"] = ketu_lon
 
-    for name, pos in positions.items():
-        if name in results:
-            results[name]["drik"] = _drik_bala(pos, name, positions)
+    aspects = aspect_matrix(positions)
+    for name in results:
+        results[name]["drik"] = _drik_total(aspects[name])
 
     return results
 
@@ -396,25 +537,19 @@ def _ojayugmadi_bala(longitude: float, planet: str) -> float:
     return 0.0
 
 
-def _house_position(jd: float, lat: float, lon: float, planet_long: float) -> int:
+def _house_position(
+    jd: float, lat: float, lon: float, planet_long: float, chart: Chart | None = None
+) -> int:
     """Return the house position using Swiss Ephemeris if available."""
-    try:
-        cusps, _ = swe.houses(jd, lat, lon)
-    except Exception:
-        return int(planet_long % 360 // 30) + 1
-    lon_norm = planet_long % 360
-    for i in range(12):
-        start = cusps[i] % 360
-        end = cusps[(i + 1) % 12] % 360
-        if end < start:
-            end += 360
-        if start <= lon_norm < end:
-            return i + 1
-    return 12
+    if chart is None:
+        chart = _chart(jd, lat, lon)
+    return chart.house_of(planet_long)
 
 
-def _kendradi_bala(jd: float, lat: float, lon: float, planet_long: float) -> float:
-    house = _house_position(jd, lat, lon, planet_long)
+def _kendradi_bala(
+    jd: float, lat: float, lon: float, planet_long: float, chart: Chart | None = None
+) -> float:
+    house = _house_position(jd, lat, lon, planet_long, chart)
     if house in {1, 4, 7, 10}:
         return 60.0
     if house in {2, 5, 8, 11}:
@@ -440,27 +575,7 @@ def _paksha_bala(moon_lon: float, sun_lon: float) -> float:
     return 60.0 * diff / 180.0
 
 
-def _nathonnatha_bala(
-    timestamp: datetime, lat: float, lon: float, planet: str
-) -> float:
-    """Calculate Nathonnatha Bala based on day/night birth."""
-    jd_date = swe.julday(timestamp.year, timestamp.month, timestamp.day, 0.0)
-    try:
-        sr = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_RISE)[1]
-        ss = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_SET)[1]
-    except Exception:
-        # Fallback to naive 6am/6pm if ephemeris fails
-        sr = jd_date + 0.25
-        ss = jd_date + 0.75
-
-    jd_now = swe.julday(
-        timestamp.year,
-        timestamp.month,
-        timestamp.day,
-        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
-    )
-
-    is_day = sr <= jd_now < ss
+def _nathonnatha_strength(is_day: bool, planet: str) -> float:
     is_diurnal = planet in {"Sun", "Jupiter", "Venus"}
     is_nocturnal = planet in {"Moon", "Mars", "Saturn"}
 
@@ -476,20 +591,16 @@ def _nathonnatha_bala(
     return 0.0
 
 
-def _tribhaga_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
-    jd_date = swe.julday(timestamp.year, timestamp.month, timestamp.day, 0.0)
-    try:
-        sr = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_RISE)[1]
-        ss = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_SET)[1]
-    except Exception:
-        sr = jd_date + 0.25
-        ss = jd_date + 0.75
-    jd_now = swe.julday(
-        timestamp.year,
-        timestamp.month,
-        timestamp.day,
-        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
-    )
+def _nathonnatha_bala(
+    timestamp: datetime, lat: float, lon: float, planet: str
+) -> float:
+    """Calculate Nathonnatha Bala based on day/night birth."""
+    is_day = _solar_day(timestamp, lat, lon).is_day(_julian_day(timestamp))
+    return _nathonnatha_strength(is_day, planet)
+
+
+def _tribhaga_strength(day: SolarDay, jd_now: float) -> float:
+    sr, ss = day.sunrise, day.sunset
     if sr <= jd_now < ss:
         part = (ss - sr) / 3.0
         if jd_now < sr + part:
@@ -498,7 +609,6 @@ def _tribhaga_bala(timestamp: datetime, lat: float, lon: float, planet: str) ->
             return 30.0
         return 15.0
     else:
-        sr_prev = sr - 1.0
         part = (sr - ss) / 3.0
         if jd_now < ss + part:
             return 60.0
@@ -507,6 +617,10 @@ def _tribhaga_bala(timestamp: datetime, lat: float, lon: float, planet: str) ->
         return 15.0
 
 
+def _tribhaga_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
+    return _tribhaga_strength(_solar_day(timestamp, lat, lon), _julian_day(timestamp))
+
+
 def _ayana_bala(sun_long: float, planet: str) -> float:
     north = sun_long < 180.0
     if planet in _DIURNAL_PLANETS and north:
@@ -521,39 +635,21 @@ def _varshadi_bala(timestamp: datetime, planet: str) -> float:
 
 
 def _hora_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
-    hora_lord = _get_hora_lord(timestamp, lat, lon)
-    if planet == hora_lord:
-        return 60.0
-    
-    if planet in HORA_REL[hora_lord]["friend"]:
-        return 45.0
-    if planet in HORA_REL[hora_lord]["neutral"]:
-        return 30.0
-    
-    return 15.0
+    return _hora_strength(_get_hora_lord(timestamp, lat, lon), planet)
 
 
-def _yamardha_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
-    jd_date = swe.julday(timestamp.year, timestamp.month, timestamp.day, 0.0)
-    try:
-        sr = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_RISE)[1]
-        ss = swe.rise_trans(jd_date, swe.SUN, lon, lat, swe.CALC_SET)[1]
-    except Exception:
-        sr = jd_date + 0.25
-        ss = jd_date + 0.75
-    jd_now = swe.julday(
-        timestamp.year,
-        timestamp.month,
-        timestamp.day,
-        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
-    )
+def _yamardha_index(day: SolarDay, jd_now: float) -> int:
+    """Index of the eighth of the day or night containing ``jd_now``."""
+    sr, ss = day.sunrise, day.sunset
     day_len = ss - sr
     if sr <= jd_now < ss:
         part = day_len / 8.0
-        index = int((jd_now - sr) / part)
-    else:
-        part = (sr + 1 - ss) / 8.0
-        index = int((jd_now - ss) / part)
+        return int((jd_now - sr) / part)
+    part = (sr + 1 - ss) / 8.0
+    return int((jd_now - ss) / part)
+
+
+def _yamardha_strength(index: int, planet: str) -> float:
     if index in {0, 7} and planet == "Saturn":
         return 30.0
     if index in {3, 4} and planet == "Sun":
@@ -561,50 +657,36 @@ def _yamardha_bala(timestamp: datetime, lat: float, lon: float, planet: str) ->
     return 15.0
 
 
+def _yamardha_bala(timestamp: datetime, lat: float, lon: float, planet: str) -> float:
+    index = _yamardha_index(_solar_day(timestamp, lat, lon), _julian_day(timestamp))
+    return _yamardha_strength(index, planet)
+
+
 def compute_shadbala(timestamp: datetime, lat: float, lon: float, use_true_node: bool = False):
     """Return full Shadbala values including all sub components."""
     swe.set_sid_mode(swe.SIDM_LAHIRI)
-    jd = swe.julday(
-        timestamp.year,
-        timestamp.month,
-        timestamp.day,
-        timestamp.hour + timestamp.minute / 60 + timestamp.second / 3600,
-    )
+    jd = _julian_day(timestamp)
     positions: dict[str, float] = {}
     latitudes: dict[str, float] = {}
     speeds: dict[str, float] = {}
     results: dict[str, dict[str, float]] = {}
 
     for name, pid in PLANETS:
-        calc_result = swe.calc_ut(jd, pid)
-        if (
-            isinstance(calc_result, tuple)
-            and len(calc_result) == 2
-            and isinstance(calc_result[0], (list, tuple))
-        ):
-            lon_deg, lat_deg, dist, speed = calc_result[0][:4]
-        else:
-            lon_deg, lat_deg, dist, speed = calc_result[:4]
+        lon_deg, lat_deg, dist, speed = _calc_ut(jd, pid)
         positions[name] = lon_deg
         latitudes[name] = lat_deg
         speeds[name] = speed
 
     node_pid = swe.TRUE_NODE if use_true_node else swe.MEAN_NODE
-    node_calc = swe.calc_ut(jd, node_pid)
-    if (
-        isinstance(node_calc, tuple)
-        and len(node_calc) == 2
-        and isinstance(node_calc[0], (list, tuple))
-    ):
-        rahu_lon = node_calc[0][0]
-    else:
-        rahu_lon = node_calc[0]
+    rahu_lon = _calc_ut(jd, node_pid)[0]
     ketu_lon = (rahu_lon + 180.0) % 360.0
     positions["Rahu"] = rahu_lon
     positions["Ketu"] = ketu_lon
 
     sun_long = positions["Sun"]
     moon_long = positions["Moon"]
+    chart = _chart(jd, lat, lon)
+    aspects = aspect_matrix(positions)
 
     for name in [p[0] for p in PLANETS]:
         lon_deg = positions[name]
@@ -613,10 +695,10 @@ def compute_shadbala(timestamp: datetime, lat: float, lon: float, use_true_node:
             _uccha_bala(lon_deg, name)
             + _saptavargaja_bala(lon_deg, name)
             + _ojayugmadi_bala(lon_deg, name)
-            + _kendradi_bala(jd, lat, lon, lon_deg)
+            + _kendradi_bala(jd, lat, lon, lon_deg, chart)
             + _drekkana_bala(lon_deg, name)
         )
-        dig = _dig_bala(jd, lat, lon, lon_deg, name)
+        dig = _dig_bala(jd, lat, lon, lon_deg, name, chart)
         kala_strength = _hora_bala(timestamp, lat, lon, name)
         if name == "Moon":
             paksha = _paksha_bala(moon_long, sun_long)
@@ -628,7 +710,7 @@ def compute_shadbala(timestamp: datetime, lat: float, lon: float, use_true_node:
         kala_strength += _yamardha_bala(timestamp, lat, lon, name)
         cheshta = _cheshta_bala(speeds[name], name)
         naisargika = NAISARGIKA_BALA[name]
-        drik = _drik_bala(lon_deg, name, positions)
+        drik = _drik_total(aspects[name])
         total = sthana + dig + kala_strength + cheshta + naisargika + drik
         results[name] = {
             "sthāna": sthana,
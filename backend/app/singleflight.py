@@ -0,0 +1,175 @@
+"""Coalescing of identical concurrent computations.
+
+Requests whose normalized query is identical share one computation:
+
+:func:`share_iter`
+    for streams.  The first reader to start iterating starts a task that
+    drains the source into a buffer, and every reader takes its items from
+    there.  The task runs at most ``window`` items ahead of the slowest
+    reader, so a slow client still holds back the computation and the
+    memory it uses.  Consumed items are dropped once the buffer holds more
+    than ``window``; from then on the stream is no longer shared with new
+    requests, which start their own.  The task is cancelled when its last
+    reader goes away.
+:func:`share`
+    for awaitables that produce one result.
+
+A key is in flight only while its computation runs.  Later requests are
+served by the frame cache as usual.
+"""
+
+import asyncio
+import weakref
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+
+try:
+    from . import metrics
+except ImportError:  # pragma: no cover - allow running file directly
+    import metrics
+
+COALESCED = metrics.Counter(
+    "shadbala_coalesced_requests_total",
+    "Requests served by an identical computation already in flight.",
+    ("kind",),
+)
+metrics.register(COALESCED)
+
+_streams: dict[Hashable, "_Stream"] = {}
+_results: dict[Hashable, asyncio.Future] = {}
+
+
+class _Stream:
+    """Buffer filled from ``factory()`` by a task, read by any number of readers."""
+
+    def __init__(self, key: Hashable, factory: Callable[[], AsyncIterator], window: int):
+        self.key = key
+        self.factory = factory
+        self.window = window
+        self.items: list = []
+        self.offset = 0  # index of items[0] in the stream
+        self.positions: dict[object, int] = {}
+        self.done = False
+        self.cancelled = False
+        self.error: BaseException | None = None
+        self.task: asyncio.Task | None = None
+        self.readers = 0  # readers handed out and not yet garbage collected
+        self._changed = asyncio.Event()
+
+    @property
+    def produced(self) -> int:
+        return self.offset + len(self.items)
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _trim(self) -> None:
+        """Drop consumed items beyond ``window``; the stream is then not shared."""
+        if len(self.items) <= self.window:
+            return
+        slowest = min(self.positions.values(), default=self.produced)
+        drop = min(slowest - self.offset, len(self.items) - self.window)
+        if drop > 0:
+            del self.items[:drop]
+            self.offset += drop
+            _forget(_streams, self.key, self)
+
+    async def _pump(self) -> None:
+        try:
+            async for item in self.factory():
+                self.items.append(item)
+                self._notify()
+                while self.produced - min(self.positions.values(), default=0) >= self.window:
+                    await self._changed.wait()
+        except BaseException as exc:
+            self.error = exc
+            if not isinstance(exc, Exception):
+                raise
+        finally:
+            self.done = True
+            _forget(_streams, self.key, self)
+            self._notify()
+
+    def _release(self) -> None:
+        """Forget the stream if every reader was dropped without starting it."""
+        self.readers -= 1
+        if not self.readers and self.task is None:
+            _forget(_streams, self.key, self)
+
+    async def read(self) -> AsyncIterator:
+        if self.offset or self.cancelled:
+            # Started too late to see the first items: compute separately
+            async for item in self.factory():
+                yield item
+            return
+        token = object()
+        self.positions[token] = 0
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._pump())
+        try:
+            while True:
+                i = self.positions[token]
+                if i < self.produced:
+                    self.positions[token] = i + 1
+                    item = self.items[i - self.offset]
+                    self._trim()
+                    self._notify()
+                    yield item
+                elif self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                else:
+                    await self._changed.wait()
+        finally:
+            del self.positions[token]
+            if not self.positions and not self.done:
+                self.cancelled = True
+                self.task.cancel()
+                _forget(_streams, self.key, self)
+            else:
+                self._trim()
+                self._notify()
+
+
+def share_iter(
+    key: Hashable, factory: Callable[[], AsyncIterator], window: int = 64
+) -> AsyncIterator:
+    """Iterate ``factory()`` once for all concurrent callers with ``key``.
+
+    Nothing is computed until the returned iterator is first advanced.
+    """
+    stream = _streams.get(key)
+    if stream is None:
+        stream = _streams[key] = _Stream(key, factory, window)
+    else:
+        COALESCED.inc(kind="stream")
+    reader = stream.read()
+    stream.readers += 1
+    weakref.finalize(reader, stream._release)
+    return reader
+
+
+async def share(key: Hashable, factory: Callable[[], Awaitable]):
+    """Await ``factory()`` once for all concurrent callers with ``key``."""
+    future = _results.get(key)
+    if future is None:
+        future = _results[key] = asyncio.ensure_future(factory())
+        future.add_done_callback(lambda done: _forget(_results, key, done))
+    else:
+        COALESCED.inc(kind="result")
+    return await asyncio.shield(future)
+
+
+def _forget(flights: dict, key: Hashable, flight) -> None:
+    if flights.get(key) is flight:
+        del flights[key]
+
+
+def running(key: Hashable) -> bool:
+    """Return whether a computation for ``key`` is in flight."""
+    return key in _streams or key in _results
+
+
+def in_flight() -> int:
+    return len(_streams) + len(_results)
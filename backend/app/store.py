@@ -0,0 +1,168 @@
+"""Precomputed planetary positions read through ``numpy.memmap``.
+
+Geocentric longitudes and speeds do not depend on the observer, so they can
+be computed once for a span of years and shared by every request.  A store
+file holds a 64 byte header followed by a little-endian float64 array of
+shape ``(count, len(BODIES), 2)`` with the longitude and speed of each body
+at ``start + i * step``.
+
+Rows are computed with exactly the Julian days that :mod:`shadbala` derives
+from the corresponding UTC timestamps, so values read from the store are
+identical to calling ``swe.calc_ut`` directly.  Moments that are not on the
+store's grid or outside its span are left to the caller.
+
+Build a store with::
+
+    python -m backend.app.store positions.bin --start 2000 --end 2030
+
+and point ``POSITION_STORE`` at the file to use it.
+"""
+
+import argparse
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+try:
+    from . import shadbala
+except ImportError:  # pragma: no cover - allow running file directly
+    import shadbala
+
+MAGIC = b"SHBPOS\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQqqd16s")
+HEADER_SIZE = 64
+
+# Column order of the bodies in a store: the seven PLANETS, then both nodes
+BODIES = [name for name, _ in shadbala.PLANETS] + ["MeanNode", "TrueNode"]
+MEAN_NODE_COLUMN = len(shadbala.PLANETS)
+TRUE_NODE_COLUMN = MEAN_NODE_COLUMN + 1
+
+# Tolerance, in grid steps, for matching a Julian day to a store row
+_GRID_TOL = 1e-6
+
+
+class PositionStore:
+    """Read-only view of a store file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as fh:
+            header = fh.read(HEADER_SIZE)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: truncated position store header")
+        magic, version, bodies, count, start, step, jd_start, swe_version = HEADER.unpack(
+            header[: HEADER.size]
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a position store")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported position store version {version}")
+        if bodies != len(BODIES):
+            raise ValueError(f"{path}: expected {len(BODIES)} bodies, found {bodies}")
+
+        self.path = path
+        self.count = count
+        self.start = datetime.fromtimestamp(start, timezone.utc)
+        self.step = timedelta(seconds=step)
+        self.jd_start = jd_start
+        self.jd_step = step / 86400.0
+        self.swe_version = swe_version.rstrip(b"\0").decode()
+        self.data = np.memmap(
+            path, dtype="<f8", mode="r", offset=HEADER_SIZE, shape=(count, len(BODIES), 2)
+        )
+
+    def rows(self, jds) -> np.ndarray:
+        """Return the row index for each Julian day, ``-1`` if not stored."""
+        pos = (np.asarray(jds, dtype=float) - self.jd_start) / self.jd_step
+        idx = np.rint(pos)
+        found = (np.abs(pos - idx) < _GRID_TOL) & (idx >= 0) & (idx < self.count)
+        return np.where(found, idx, -1).astype(np.int64)
+
+    def select(self, rows: np.ndarray):
+        """Return the stored rows, as a zero-copy view when evenly spaced."""
+        if len(rows) == 1:
+            return self.data[rows[0] : rows[0] + 1]
+        stride = rows[1] - rows[0]
+        if stride > 0 and (np.diff(rows) == stride).all():
+            return self.data[rows[0] : rows[-1] + 1 : stride]
+        return self.data[rows]
+
+    def state(self, rows: np.ndarray, use_true_node: bool = False):
+        """Return ``(lons, speeds, node_lons, node_speeds)`` for ``rows``."""
+        block = self.select(rows)
+        node = TRUE_NODE_COLUMN if use_true_node else MEAN_NODE_COLUMN
+        return (
+            block[:, :MEAN_NODE_COLUMN, 0],
+            block[:, :MEAN_NODE_COLUMN, 1],
+            block[:, node, 0],
+            block[:, node, 1],
+        )
+
+
+def build(path: str, start: datetime, end: datetime, step: timedelta) -> int:
+    """Write a store covering ``[start, end)`` and return the number of rows."""
+    swe = shadbala.swe
+    pids = [pid for _, pid in shadbala.PLANETS] + [swe.MEAN_NODE, swe.TRUE_NODE]
+    count = (end - start) // step
+    jd_start = shadbala._julian_day(start)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        len(BODIES),
+        count,
+        int(start.timestamp()),
+        int(step.total_seconds()),
+        jd_start,
+        swe.version.encode()[:16] if hasattr(swe, "version") else b"",
+    )
+    block = np.empty((min(count, 4096), len(BODIES), 2), dtype="<f8")
+    with open(path, "wb") as fh:
+        fh.write(header.ljust(HEADER_SIZE, b"\0"))
+        for first in range(0, count, len(block)):
+            n = min(len(block), count - first)
+            for i in range(n):
+                jd = shadbala._julian_day(start + (first + i) * step)
+                for b, pid in enumerate(pids):
+                    lon_deg, _, _, speed = shadbala._calc_ut(jd, pid)
+                    block[i, b] = lon_deg, speed
+            fh.write(block[:n].tobytes())
+    return count
+
+
+_store: PositionStore | None = None
+_store_path: str | None = None
+
+
+def get_store() -> PositionStore | None:
+    """Return the store configured by ``POSITION_STORE``, opened once."""
+    global _store, _store_path
+    path = os.getenv("POSITION_STORE")
+    if path != _store_path:
+        _store = PositionStore(path) if path else None
+        _store_path = path
+    return _store
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a planetary position store.")
+    parser.add_argument("output", help="path of the store file to write")
+    parser.add_argument("--start", type=int, required=True, help="first year covered")
+    parser.add_argument("--end", type=int, required=True, help="last year covered")
+    parser.add_argument(
+        "--step-minutes", type=int, default=5, help="sampling resolution (default 5)"
+    )
+    args = parser.parse_args(argv)
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+
+    shadbala.swe.set_sid_mode(shadbala.swe.SIDM_LAHIRI)
+    start = datetime(args.start, 1, 1, tzinfo=timezone.utc)
+    end = datetime(args.end + 1, 1, 1, tzinfo=timezone.utc)
+    count = build(args.output, start, end, timedelta(minutes=args.step_minutes))
+    print(f"wrote {count} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
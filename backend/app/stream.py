@@ -0,0 +1,187 @@
+"""Live ``/balas`` frames pushed to subscribers.
+
+Subscribers with the same rounded coordinates, node flag and window length
+form a group.  A new subscriber first receives the window of
+``hours_ahead`` hours starting at the current five-minute tick, served
+through the frame cache.  After that, each group has one background task
+that wakes at every tick, computes the single frame entering the far end of
+the window and pushes it to all of the group's subscribers.  Server work is
+therefore one frame per group per tick, however many dashboards are open.
+A group's task stops when its last subscriber leaves.
+
+Every event carries the timestamp of the newest frame it holds, which the
+SSE layer sends as the event ``id``.  A subscriber that reconnects with
+that timestamp receives only the frames it missed instead of a new window.
+While no frame is due, subscribers get a keep-alive event every
+``STREAM_KEEPALIVE`` seconds so idle connections are not cut by proxies.
+A tick whose frame cannot be computed, for example because the worker job
+timed out, is logged and retried every ``STREAM_RETRY`` seconds.
+"""
+
+import asyncio
+import os
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+
+try:
+    from . import parallel
+    from .cache import TICK, frame_cache, tick
+    from .logs import logger
+except ImportError:  # pragma: no cover - allow running file directly
+    import parallel
+    from cache import TICK, frame_cache, tick
+    from logs import logger
+
+STREAM_KEEPALIVE = float(os.getenv("STREAM_KEEPALIVE", 15))
+STREAM_RETRY = float(os.getenv("STREAM_RETRY", 10))
+
+GroupKey = tuple[float, float, bool, int]
+Event = tuple[str, datetime | None, dict | None]
+
+_groups: dict[GroupKey, "_Group"] = {}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def _sleep(seconds: float) -> None:
+    await asyncio.sleep(seconds)
+
+
+async def _frames(timestamps: list[datetime], lat: float, lon: float, use_true_node: bool):
+    frames = frame_cache.aiter_frames(
+        timestamps,
+        lat,
+        lon,
+        use_true_node,
+        "exact",
+        lambda missing: parallel.aiter_range(missing, lat, lon, use_true_node=use_true_node),
+    )
+    return [frame async for frame in frames]
+
+
+class _Group:
+    """Subscribers of one group and the task pushing their frames."""
+
+    def __init__(self, key: GroupKey):
+        self.key = key
+        self.queues: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+
+    @property
+    def window(self) -> timedelta:
+        return timedelta(hours=self.key[3])
+
+    def add(self, queue: asyncio.Queue) -> None:
+        self.queues.add(queue)
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def remove(self, queue: asyncio.Queue) -> None:
+        self.queues.discard(queue)
+        if not self.queues:
+            if self.task is not None:
+                self.task.cancel()
+            if _groups.get(self.key) is self:
+                del _groups[self.key]
+
+    def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+        for queue in self.queues:
+            queue.put_nowait(None)
+
+    async def _frame(self, timestamp: datetime) -> dict:
+        """Compute the frame at ``timestamp``, retrying until it succeeds."""
+        lat, lon, use_true_node, _ = self.key
+        while True:
+            try:
+                (frame,) = await _frames([timestamp], lat, lon, use_true_node)
+                return frame
+            except Exception:
+                logger.exception(
+                    "stream frame failed, retrying",
+                    extra={"group": list(self.key), "timestamp": timestamp.isoformat()},
+                )
+            await _sleep(STREAM_RETRY)
+
+    async def _run(self) -> None:
+        current = tick(_now())
+        while True:
+            # Advance one tick at a time so a late wake-up catches up
+            # instead of skipping frames
+            current += TICK
+            delay = (current - _now()).total_seconds()
+            if delay > 0:
+                await _sleep(delay)
+            timestamp = current + self.window - TICK
+            frame = await self._frame(timestamp)
+            for queue in self.queues:
+                queue.put_nowait((timestamp, frame))
+
+
+async def subscribe(
+    lat: float,
+    lon: float,
+    use_true_node: bool,
+    hours: int,
+    last_event: datetime | None = None,
+) -> AsyncIterator[Event]:
+    """Yield ``(event, timestamp, payload)`` for one subscriber.
+
+    The first event is ``"window"`` with ``{"start", "interval", "data"}``.
+    Then one ``"frame"`` event with ``{"timestamp", "data"}`` follows per
+    tick.  ``timestamp`` is that of the newest frame sent so far.  If
+    ``last_event`` is such a timestamp from a previous connection and still
+    within the window, the window event is replaced by frame events for the
+    frames after it.  ``("keepalive", None, None)`` is yielded whenever no
+    frame arrived for ``STREAM_KEEPALIVE`` seconds.
+    """
+    lat, lon = frame_cache.quantize(lat, lon)
+    key = (lat, lon, use_true_node, hours)
+    queue: asyncio.Queue = asyncio.Queue()
+    group = _groups.get(key)
+    if group is None:
+        group = _groups[key] = _Group(key)
+    group.add(queue)
+    try:
+        start = tick(_now())
+        timestamps = [start + TICK * i for i in range(int(group.window / TICK))]
+        last = timestamps[-1] if timestamps else start - TICK
+        if last_event is not None and start - TICK <= last_event <= last:
+            missed = [ts for ts in timestamps if ts > last_event]
+            frames = await _frames(missed, lat, lon, use_true_node)
+            for timestamp, frame in zip(missed, frames):
+                yield "frame", timestamp, {"timestamp": timestamp.isoformat(), "data": frame}
+        else:
+            frames = await _frames(timestamps, lat, lon, use_true_node)
+            window = {"start": start.isoformat(), "interval": "5m", "data": frames}
+            yield "window", last, window
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield "keepalive", None, None
+                continue
+            if item is None:
+                return
+            timestamp, frame = item
+            # A tick that passed while the window was computed is already in it
+            if timestamp <= last:
+                continue
+            last = timestamp
+            yield "frame", timestamp, {"timestamp": timestamp.isoformat(), "data": frame}
+    finally:
+        group.remove(queue)
+
+
+def group_count() -> int:
+    return len(_groups)
+
+
+def close() -> None:
+    """End every subscription and stop all group tasks."""
+    for group in list(_groups.values()):
+        group.close()
+    _groups.clear()
@@ -0,0 +1,116 @@
+"""Startup warm-up for configured hot locations.
+
+``WARM_LOCATIONS`` lists ``lat,lon`` pairs separated by ``;``.  When the
+application starts, it runs one warm-up job, which starts the worker pool.
+A worker process loads the ephemeris files and makes its first
+``calc_ut``, ``houses`` and ``rise_trans`` calls in the pool initializer
+(see :mod:`parallel`), before it takes its first job.  Under the ``fork``
+start method the pool starts all of its workers for that first job, so
+they are all warm when it finishes.  Under ``spawn`` and ``forkserver``
+workers are only started as the load requires and each warms up then.
+With ``PARALLEL_WORKERS=0`` the API process warms up instead.  After that, the
+``/balas`` frames for the configured locations are computed on the
+five-minute grid over the next ``WARM_HOURS`` hours.  They are stored in the
+frame cache, and the workers that compute them fill their solar-day caches
+along the way.  ``/ready`` reports 503 until warm-up has finished.
+
+A failed warm-up, including an invalid ``WARM_LOCATIONS`` or a window larger
+than ``MAX_RANGE_FRAMES``, is logged and the instance still becomes ready:
+it then serves its first requests cold, which is better than never serving
+them.
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+try:
+    from . import parallel
+    from .cache import TICK, frame_cache, tick
+    from .logs import logger
+except ImportError:  # pragma: no cover - allow running file directly
+    import parallel
+    from cache import TICK, frame_cache, tick
+    from logs import logger
+
+WARM_LOCATIONS = os.getenv("WARM_LOCATIONS", "")
+WARM_HOURS = int(os.getenv("WARM_HOURS", 24))
+
+_task: asyncio.Task | None = None
+_status = {"ready": False, "locations": 0, "frames": 0}
+
+
+def parse_locations(value: str) -> list[tuple[float, float]]:
+    """Parse ``"lat,lon;lat,lon"`` into quantized, de-duplicated pairs."""
+    locations = []
+    for pair in value.split(";"):
+        if not pair.strip():
+            continue
+        try:
+            lat, lon = (float(part) for part in pair.split(","))
+        except ValueError:
+            raise ValueError(f"invalid WARM_LOCATIONS entry: {pair.strip()!r}") from None
+        locations.append(frame_cache.quantize(lat, lon))
+    return list(dict.fromkeys(locations))
+
+
+def window(hours: int, now: datetime | None = None) -> list[datetime]:
+    """Return five-minute grid timestamps covering the next ``hours`` hours."""
+    start = tick(now or datetime.now(timezone.utc))
+    return [start + TICK * i for i in range(int(timedelta(hours=hours) / TICK) + 1)]
+
+
+async def warm(
+    locations: list[tuple[float, float]], hours: int = WARM_HOURS, now: datetime | None = None
+) -> int:
+    """Warm the workers and cache frames for ``locations``; return the frame count."""
+    timestamps = window(hours, now)
+    # Starting the pool warms its worker processes through the initializer
+    await parallel.run_job(parallel.warm_worker)
+    if not locations:
+        return 0
+    if len(timestamps) * len(locations) > parallel.MAX_RANGE_FRAMES:
+        raise ValueError(
+            f"WARM_HOURS x WARM_LOCATIONS exceeds {parallel.MAX_RANGE_FRAMES} frames"
+        )
+    frames = await frame_cache.aget_many(
+        timestamps,
+        locations,
+        False,
+        "exact",
+        lambda missing, stale: parallel.acompute_range_multi(missing, stale),
+    )
+    return sum(map(len, frames))
+
+
+async def _run(value: str, hours: int) -> None:
+    try:
+        locations = parse_locations(value)
+        _status["frames"] = await warm(locations, hours)
+        _status["locations"] = len(locations)
+        logger.info("warm-up finished", extra={k: v for k, v in _status.items() if k != "ready"})
+    except Exception:
+        logger.exception("warm-up failed")
+    finally:
+        _status["ready"] = True
+
+
+def start(value: str | None = None, hours: int | None = None) -> None:
+    """Start warming up in the background of the running event loop."""
+    global _task
+    _status.update(ready=False, locations=0, frames=0)
+    _task = asyncio.get_running_loop().create_task(
+        _run(WARM_LOCATIONS if value is None else value, WARM_HOURS if hours is None else hours)
+    )
+
+
+def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+
+
+def status() -> dict:
+    """Return ``{"ready", "locations", "frames"}`` of the last warm-up."""
+    return dict(_status)
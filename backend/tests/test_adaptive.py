@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+np = pytest.importorskip("numpy")
+
+
+MOTION = {
+    "speeds": (13.0, 1.0, 0.5, 1.5, 0.1, 1.2, 0.05, -0.05, -0.06),
+    "bases": (10, 190, 100, 15, 70, 250, 130, 220, 221),
+    "scale": 24,
+}
+
+
+def load_modules(install_swe):
+    import importlib
+    install_swe(**MOTION)
+    shadbala = importlib.import_module("backend.app.shadbala")
+    adaptive = importlib.import_module("backend.app.adaptive")
+    return shadbala, adaptive
+
+
+def curve(timestamps, step_at):
+    """Frames with a ramp, a slow sine and a step at ``step_at``."""
+    frames = []
+    for ts in timestamps:
+        hours = (ts - timestamps[0]).total_seconds() / 3600
+        frames.append(
+            {
+                "A": {"ramp": 2.0 * hours, "sine": 10 * np.sin(hours / 12)},
+                "B": {"ramp": 0.0, "sine": 30.0 if ts >= step_at else 0.0},
+            }
+        )
+    return frames
+
+
+def test_adaptive_indices_refine_edges_only(install_swe):
+    _, adaptive = load_modules(install_swe)
+    start = datetime(2020, 1, 1)
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(7 * 288)]
+    step_at = start + timedelta(days=3, minutes=37)
+    calls = []
+
+    def func(ts, step_at):
+        calls.append(len(ts))
+        frames = curve(timestamps, step_at)
+        return [frames[timestamps.index(t)] for t in ts]
+
+    indices, frames = adaptive.adaptive_indices(func, timestamps, (step_at,), tolerance=0.5)
+    assert sum(calls) < len(timestamps) // 10
+    assert len(indices) < 60
+    # The step is bracketed by adjacent grid points
+    edge = timestamps.index(step_at + timedelta(minutes=3))
+    assert {edge - 1, edge} <= set(indices)
+
+    full = adaptive._values(curve(timestamps, step_at))
+    values = adaptive._values(frames)
+    for p in range(2):
+        for c in range(2):
+            rebuilt = np.interp(np.arange(len(timestamps)), indices, values[:, p, c])
+            assert np.max(np.abs(rebuilt - full[:, p, c])) <= 0.5
+
+
+def test_balas_interval_parameter(install_swe):
+    pytest.importorskip("fastapi")
+    load_modules(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-02T00:00"}
+    resp = client.get("/balas", params={**params, "interval": "15m"})
+    assert resp.status_code == 200
+    assert resp.json()["interval"] == "15m"
+    assert len(resp.json()["data"]) == 24 * 4 + 1
+
+    lines = client.get("/balas.csv", params={**params, "interval": "6h"}).text.splitlines()
+    assert [line.split(",")[0] for line in lines[1::7]] == [
+        f"2020-01-01T{h:02d}:00:00+00:00" for h in (5, 11, 17, 23)
+    ] + ["2020-01-02T05:00:00+00:00"]
+
+    for bad in ("30s", "2d", "0m", "m", "fast", "999999999999d"):
+        assert client.get("/balas", params={**params, "interval": bad}).status_code == 400
+
+
+def test_adaptive_interval_endpoints(install_swe):
+    pytest.importorskip("fastapi")
+    load_modules(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-02T00:00", "interval": "adaptive"}
+    fixed = client.get("/balas", params={**params, "interval": "5m"}).json()["data"]
+    payload = client.get("/balas", params={**params, "tolerance": 100}).json()
+    assert payload["interval"] == "adaptive"
+    assert len(payload["timestamps"]) == len(payload["data"]) < len(fixed)
+    assert payload["data"][0] == fixed[0] and payload["data"][-1] == fixed[-1]
+
+    resp = client.get("/balas", params={**params, "format": "npy"})
+    assert resp.status_code == 400
+    shadbala = client.get("/shadbala", params=params).json()
+    assert len(shadbala["timestamps"]) == len(shadbala["data"])
+    assert client.get("/shadbala", params={**params, "mode": "changepoints"}).status_code == 400
+    for path in ("/balas", "/balas.csv", "/shadbala", "/shadbala.csv"):
+        for bad in (0, -1, "nan"):
+            resp = client.get(path, params={**params, "tolerance": bad})
+            assert resp.status_code == 400
+        resp = client.get(path, params={"hours_ahead": 1, "interval": "adaptive", "tolerance": -1})
+        assert resp.status_code == 400
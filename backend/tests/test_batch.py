@@ -0,0 +1,256 @@
+import sys
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import unquote
+from datetime import datetime, timedelta
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+np = pytest.importorskip("numpy")
+
+
+# Bodies move at different rates so aspects form and dissolve
+MOTION = {
+    "speeds": (13.0, 1.0, 0.5, 1.5, 0.1, 1.2, 0.05, -0.05, -0.06),
+    "bases": (10, 190, 100, 15, 70, 250, 130, 220, 221),
+    "scale": 24,
+}
+
+
+def load_modules(install_swe):
+    import importlib
+    install_swe(**MOTION)
+    shadbala = importlib.import_module("backend.app.shadbala")
+    batch = importlib.import_module("backend.app.batch")
+    return shadbala, batch
+
+
+@pytest.mark.parametrize("use_true_node", [False, True])
+def test_row_batch_matches_row(install_swe, use_true_node):
+    shadbala, batch = load_modules(install_swe)
+    start = datetime(2020, 1, 1, 0, 0, 0)
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(12 * 48)]
+    expected = [shadbala.row(ts, 10, 20, use_true_node) for ts in timestamps]
+    assert batch.row_batch(timestamps, 10, 20, use_true_node) == expected
+
+
+def test_drik_kernel_matches_scalar(install_swe):
+    shadbala, batch = load_modules(install_swe)
+    rng = np.random.default_rng(0)
+    lons = rng.choice(np.arange(0.0, 360.0, 30.0), size=(200, 7)) + rng.uniform(-6, 6, (200, 7))
+    rahu = rng.uniform(0, 360, 200)
+    drik = batch.drik_kernel(lons % 360, rahu)
+    for t in range(len(lons)):
+        positions = dict(zip(batch.PLANET_NAMES, (lons[t] % 360).tolist()))
+        positions["Rahu"] = rahu[t]
+        positions["Ketu"] = (rahu[t] + 180.0) % 360.0
+        for p, name in enumerate(batch.PLANET_NAMES):
+            assert drik[t, p] == shadbala._drik_bala(positions[name], name, positions)
+
+
+def test_dignity_kernel_matches_scalar(install_swe):
+    shadbala, batch = load_modules(install_swe)
+    # every varga, drekkana and sign boundary, in arc minutes
+    steps = (60, 150, 200, 600, 1800)
+    boundaries = np.unique(np.concatenate([np.arange(0, 21600, s) for s in steps])) / 60.0
+    lons = np.concatenate(
+        [
+            boundaries,
+            np.nextafter(boundaries, -1.0)[1:],
+            np.nextafter(boundaries, 360.0),
+            boundaries + 1 / 120,
+            np.random.default_rng(2).uniform(0, 360, 5000),
+        ]
+    )
+    lons = np.repeat(lons[:, None], 7, axis=1)
+    dignity = batch.dignity_kernel(lons)
+    scalar = (shadbala._saptavargaja_bala, shadbala._ojayugmadi_bala, shadbala._drekkana_bala)
+    for p, name in enumerate(batch.PLANET_NAMES):
+        for d, func in enumerate(scalar):
+            expected = [func(lon, name) for lon in lons[:, p].tolist()]
+            assert dignity[:, p, d].tolist() == expected, (name, batch.DIGNITIES[d])
+
+
+def test_aspect_kernel_matches_scalar_matrix(install_swe):
+    shadbala, batch = load_modules(install_swe)
+    rng = np.random.default_rng(1)
+    lons = rng.choice(np.arange(0.0, 360.0, 30.0), size=(100, 7)) + rng.uniform(-6, 6, (100, 7))
+    rahu = rng.uniform(0, 360, 100)
+    aspects = batch.aspect_kernel(lons % 360, rahu)
+    assert aspects.shape == (100, 9, 9)
+    for t in range(len(lons)):
+        positions = dict(zip(batch.PLANET_NAMES, (lons[t] % 360).tolist()))
+        positions["Rahu"] = rahu[t]
+        positions["Ketu"] = (rahu[t] + 180.0) % 360.0
+        matrix = shadbala.aspect_matrix(positions)
+        assert aspects[t].tolist() == [
+            [matrix[target][name] for name in batch.ASPECTING] for target in batch.ASPECTING
+        ]
+        for name in batch.PLANET_NAMES:
+            assert shadbala._drik_total(matrix[name]) == shadbala._drik_bala(
+                positions[name], name, positions
+            )
+
+
+def test_row_batch_multi_matches_single_locations(install_swe):
+    shadbala, batch = load_modules(install_swe)
+    start = datetime(2020, 1, 1, 0, 0, 0)
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(12 * 30)]
+    locations = [(10, 20), (-33.9, 151.2), (64.1, -21.9)]
+    result = batch.row_batch_multi(timestamps, locations)
+    assert result == [batch.row_batch(timestamps, lat, lon) for lat, lon in locations]
+
+
+def test_balas_batch_endpoint_shares_positions(install_swe):
+    pytest.importorskip("fastapi")
+    shadbala, batch = load_modules(install_swe)
+    calls = []
+    calc_ut = shadbala.swe.calc_ut
+
+    def counting_calc_ut(jd, pid):
+        calls.append(pid)
+        return calc_ut(jd, pid)
+
+    shadbala.swe.calc_ut = counting_calc_ut
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    body = {
+        "start": "2020-01-01T00:00",
+        "end": "2020-01-01T01:00",
+        "locations": [{"lat": 40.7128, "lon": -74.006}, {"lat": 51.5, "lon": -0.1}],
+    }
+    resp = client.post("/balas/batch", json=body)
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert set(payload["data"]) == {"40.7128,-74.006", "51.5,-0.1"}
+    assert len(calls) == 13 * 8  # positions computed once for both locations
+
+    single = client.get(
+        "/balas", params={"start": body["start"], "end": body["end"], "lat": 51.5, "lon": -0.1}
+    ).json()
+    assert payload["data"]["51.5,-0.1"] == single["data"]
+    assert len(calls) == 13 * 8  # served from the frame cache
+
+    assert client.post("/balas/batch", json={**body, "locations": []}).status_code == 400
+
+
+@pytest.mark.parametrize("use_true_node", [False, True])
+def test_shadbala_batch_matches_compute_shadbala(install_swe, use_true_node):
+    shadbala, batch = load_modules(install_swe)
+    start = datetime(2020, 1, 1, 0, 0, 0)
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(12 * 48)]
+    expected = [shadbala.compute_shadbala(ts, 10, 20, use_true_node) for ts in timestamps]
+    assert batch.shadbala_batch(timestamps, 10, 20, use_true_node) == expected
+
+
+def test_shadbala_endpoint(install_swe):
+    pytest.importorskip("fastapi")
+    shadbala, batch = load_modules(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T01:00", "lat": 10, "lon": 20}
+    resp = client.get("/shadbala", params=params)
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert len(payload["data"]) == 13
+    ts = datetime(2020, 1, 1, 5, 0)  # 00:00 in New York
+    assert payload["data"][0] == shadbala.compute_shadbala(ts, 10, 20)
+
+    resp = client.get("/shadbala.csv", params=params)
+    assert resp.status_code == 200
+    lines = resp.text.splitlines()
+    assert lines[0] == "timestamp,planet," + ",".join(batch.SHADBALA_COMPONENTS)
+    assert len(lines) == 1 + 13 * 7
+    assert client.get("/shadbala", params={"ephemeris": "fast"}).status_code == 400
+
+    resp = client.get("/shadbala", params={**params, "format": "npy"})
+    assert resp.status_code == 200
+    assert unquote(resp.headers["x-components"]) == ",".join(batch.SHADBALA_COMPONENTS)
+    values = np.load(BytesIO(resp.content))
+    assert values.dtype == np.float32 and values.shape == (13, 7, 7)
+    expected = [[list(f.values()) for f in frame.values()] for frame in payload["data"]]
+    assert np.allclose(values, expected, rtol=1e-6)
+    invalid = [
+        {"format": "xml"},
+        {"format": "npy", "interval": "adaptive"},
+        {"format": "npy", "mode": "changepoints"},
+        {"format": "npy", "include": "aspects"},
+    ]
+    for bad in invalid:
+        assert client.get("/shadbala", params={**params, **bad}).status_code == 400
+
+
+def test_shadbala_changepoints_endpoint(install_swe):
+    pytest.importorskip("fastapi")
+    shadbala, batch = load_modules(install_swe)
+    from backend.app import changepoints
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T12:00", "lat": 10, "lon": 20}
+    resp = client.get("/shadbala", params={**params, "mode": "changepoints"})
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["step_components"] == list(changepoints.STEP_COMPONENTS)
+    assert len(payload["samples"]["Moon"]["uccha"]) == 12 * 12 + 1
+
+    frames = client.get("/shadbala", params=params).json()["data"]
+    for planet, components in payload["steps"].items():
+        for intervals in components.values():
+            assert intervals[0][0] == "2020-01-01T05:00:00+00:00"
+            assert intervals[-1][1] == "2020-01-01T17:00:00+00:00"
+            assert all(a[1] == b[0] and a[2] != b[2] for a, b in zip(intervals, intervals[1:]))
+        assert payload["samples"][planet]["cheshta"] == [f[planet]["cheshta"] for f in frames]
+    assert client.get("/shadbala", params={"mode": "steps"}).status_code == 400
+
+
+def test_step_intervals_match_scalar_functions(install_swe):
+    shadbala, batch = load_modules(install_swe)
+    from backend.app import changepoints
+
+    start = datetime(2020, 1, 1, 0, 0)
+    end = start + timedelta(hours=18)
+    steps = changepoints.step_intervals(start, end, 10, 20)
+    for name, pid in shadbala.PLANETS:
+        for component in ("drekkana", "saptavargaja", "hora", "tribhaga", "yamardha"):
+            intervals = [
+                (datetime.fromisoformat(a), datetime.fromisoformat(b), v)
+                for a, b, v in steps[name][component]
+            ]
+            for i in range(18 * 12):
+                ts = start + timedelta(minutes=5 * i, seconds=150)
+                value = next(v for a, b, v in intervals if a <= ts < b)
+                lon = shadbala._calc_ut(shadbala._julian_day(ts), pid)[0]
+                expected = {
+                    "drekkana": lambda: shadbala._drekkana_bala(lon, name),
+                    "saptavargaja": lambda: shadbala._saptavargaja_bala(lon, name),
+                    "hora": lambda: shadbala._hora_bala(ts, 10, 20, name),
+                    "tribhaga": lambda: shadbala._tribhaga_bala(ts, 10, 20, name),
+                    "yamardha": lambda: shadbala._yamardha_bala(ts, 10, 20, name),
+                }[component]()
+                assert value == expected
+
+
+def test_include_aspects(install_swe):
+    pytest.importorskip("fastapi")
+    load_modules(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T01:00", "include": "aspects"}
+    for path in ("/balas", "/shadbala"):
+        payload = client.get(path, params=params).json()
+        assert payload["aspect_bodies"][-2:] == ["Rahu", "Ketu"]
+        assert len(payload["aspects"]) == len(payload["data"]) == 13
+        for frame, matrix in zip(payload["data"], payload["aspects"]):
+            for i, planet in enumerate(payload["aspect_bodies"][:7]):
+                assert frame[planet]["drik"] == pytest.approx(sum(matrix[i]))
+
+    assert client.get("/balas", params={**params, "include": "houses"}).status_code == 400
+    assert client.get("/balas", params={**params, "format": "npy"}).status_code == 400
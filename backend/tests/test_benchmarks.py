@@ -0,0 +1,34 @@
+import importlib
+import json
+import sys
+from pathlib import Path
+import pytest
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+
+def load_suite(monkeypatch):
+    sys.path.insert(0, str(ROOT / "benchmarks"))
+    suite = importlib.import_module("suite")
+    shadbala = importlib.import_module("backend.app.shadbala")
+    # the suite swaps the ephemeris module; restore it after the test
+    monkeypatch.setattr(shadbala, "swe", shadbala.swe)
+    return suite
+
+
+def test_suite_writes_results_and_flags_regressions(monkeypatch, tmp_path):
+    suite = load_suite(monkeypatch)
+    output = tmp_path / "bench.json"
+    argv = ["--backend", "stub", "--ranges", "1h", "--repeat", "1", "--output", str(output)]
+    assert suite.main(argv) == 0
+    report = json.loads(output.read_text())
+    assert set(report["results"]) == {f"stub/{case}/1h" for case in suite.CASES}
+    assert report["results"]["stub/row/1h"]["frames"] == 12
+
+    fast = {key: {**r, "seconds": r["seconds"] / 10} for key, r in report["results"].items()}
+    regressions = suite.compare(report["results"], fast, threshold=0.5)
+    assert len(regressions) == len(suite.CASES)
+    assert suite.compare(report["results"], report["results"], threshold=0.0) == []
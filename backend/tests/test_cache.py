@@ -0,0 +1,172 @@
+import asyncio
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from backend.app.cache import FrameCache, _frame_bytes, tick
+
+FRAME = {"Sun": {"uccha": 1.0, "dig": 2.0}}
+T0 = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+class Clock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_requires_five_minute_grid():
+    cache = FrameCache()
+    assert cache.key(T0 + timedelta(minutes=5), 40.71284, -74.00601, False, "exact") == (
+        int(T0.timestamp()) + 300,
+        40.7128,
+        -74.006,
+        False,
+        "exact",
+    )
+    assert cache.key(T0 + timedelta(seconds=30), 0, 0, False, "exact") is None
+    # Naive timestamps are UTC
+    assert cache.key(T0.replace(tzinfo=None), 0, 0, False, "exact")[0] == int(T0.timestamp())
+
+
+def test_lru_eviction_respects_memory_budget():
+    cache = FrameCache(max_bytes=3 * _frame_bytes(FRAME))
+    keys = [cache.key(T0 + timedelta(minutes=5 * i), 0, 0, False, "exact") for i in range(4)]
+    for key in keys[:3]:
+        cache.put(key, FRAME)
+    assert cache.get(keys[0]) is FRAME  # keys[1] is now least recently used
+    cache.put(keys[3], FRAME)
+    assert len(cache) == 3
+    assert cache.get(keys[1]) is None
+    assert cache.evictions == 1
+    assert cache.bytes == 3 * _frame_bytes(FRAME)
+
+
+def test_ttl_expiry():
+    clock = Clock()
+    cache = FrameCache(ttl=60, clock=clock)
+    key = cache.key(T0, 0, 0, False, "exact")
+    cache.put(key, FRAME)
+    clock.now = 59
+    assert cache.get(key) is FRAME
+    clock.now = 60
+    assert cache.get(key) is None
+    assert cache.bytes == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_contains_does_not_count_lookups():
+    clock = Clock()
+    cache = FrameCache(ttl=60, clock=clock)
+    timestamps = [T0, T0 + timedelta(minutes=5)]
+    cache.put(cache.key(T0, 0, 0, False, "exact"), FRAME)
+    assert not cache.contains(timestamps, [(0, 0)], False, "exact")
+    cache.put(cache.key(timestamps[1], 0, 0, False, "exact"), FRAME)
+    assert cache.contains(timestamps, [(0, 0)], False, "exact")
+    assert not cache.contains(timestamps, [(0, 0), (1, 1)], False, "exact")
+    assert not cache.contains([T0 + timedelta(seconds=1)], [(0, 0)], False, "exact")
+    clock.now = 60
+    assert not cache.contains(timestamps, [(0, 0)], False, "exact")
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_aiter_frames_computes_only_misses():
+    cache = FrameCache()
+    timestamps = [T0 + timedelta(minutes=5 * i) for i in range(6)]
+    requested = []
+
+    async def compute(missing):
+        requested.append(list(missing))
+        for ts in missing:
+            yield {"Sun": {"ts": ts.timestamp()}}
+
+    async def frames(timestamps):
+        return [f async for f in cache.aiter_frames(timestamps, 0, 0, False, "exact", compute)]
+
+    first = asyncio.run(frames(timestamps[:4]))
+    second = asyncio.run(frames(timestamps))
+    assert requested == [timestamps[:4], timestamps[4:]]
+    assert second[:4] == first
+    assert [f["Sun"]["ts"] for f in second] == [ts.timestamp() for ts in timestamps]
+    assert cache.stats()["hits"] == 4
+    assert cache.stats()["misses"] == 4 + 2
+
+
+def test_aget_many_computes_misses_together():
+    cache = FrameCache()
+    timestamps = [T0 + timedelta(minutes=5 * i) for i in range(3)]
+    requested = []
+
+    async def compute(missing, stale):
+        requested.append((list(missing), list(stale)))
+        return [
+            [{"Sun": {"lat": lat, "ts": ts.timestamp()}} for ts in missing] for lat, _ in stale
+        ]
+
+    cache.put(cache.key(T0, 0, 0, False, "exact"), {"Sun": {"lat": 0, "ts": T0.timestamp()}})
+    frames = asyncio.run(cache.aget_many(timestamps, [(0, 0), (1, 1)], False, "exact", compute))
+    assert requested == [(timestamps, [(0, 0), (1, 1)])]
+    assert [[f["Sun"]["lat"] for f in row] for row in frames] == [[0] * 3, [1] * 3]
+    assert [f["Sun"]["ts"] for f in frames[1]] == [ts.timestamp() for ts in timestamps]
+
+    again = asyncio.run(cache.aget_many(timestamps, [(0, 0), (1, 1)], False, "exact", compute))
+    assert again == frames and len(requested) == 1
+
+
+def test_tick():
+    assert tick(T0 + timedelta(minutes=14, seconds=59, microseconds=1)) == T0 + timedelta(
+        minutes=10
+    )
+    assert tick(T0) == T0
+    # Naive timestamps are UTC
+    assert tick(datetime(2020, 1, 1, 23, 59, 59)) == datetime(2020, 1, 1, 23, 55)
+
+
+def test_balas_reuses_cached_frames(monkeypatch, install_swe):
+    pytest.importorskip("fastapi")
+    calls = install_swe(speeds=(1.0,) * 9).calls
+    from backend.app.main import app
+    from backend.app.cache import frame_cache
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T01:00"}
+    first = client.get("/balas", params=params).json()
+    assert len(calls) == 13 * 8
+    hits = frame_cache.hits
+    assert client.get("/balas.csv", params=params).status_code == 200
+    assert client.get("/balas", params=params).json() == first
+    assert len(calls) == 13 * 8
+    assert frame_cache.hits == hits + 2 * 13
+
+
+def test_hours_ahead_windows_reuse_cached_frames(monkeypatch, install_swe):
+    pytest.importorskip("fastapi")
+    calls = install_swe(speeds=(1.0,) * 9).calls
+    from backend.app import main
+    from backend.app.cache import frame_cache
+    from fastapi.testclient import TestClient
+
+    now = [datetime(2020, 1, 1, 0, 7, 31, 250)]
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return now[0]
+
+    monkeypatch.setattr(main, "datetime", Clock)
+    client = TestClient(main.app)
+    first = client.get("/balas", params={"hours_ahead": 1}).json()
+    assert first["start"] == "2020-01-01T00:05:00"
+    assert len(first["data"]) == 12
+    assert len(calls) == 12 * 8
+    now[0] += timedelta(minutes=6)
+    hits = frame_cache.hits
+    second = client.get("/balas", params={"hours_ahead": 1}).json()
+    assert second["start"] == "2020-01-01T00:10:00"
+    assert second["data"][:11] == first["data"][1:]
+    assert len(calls) == 13 * 8
+    assert frame_cache.hits == hits + 11
@@ -0,0 +1,82 @@
+import sys
+import types
+import importlib
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+np = pytest.importorskip("numpy")
+
+
+def load_module(install_swe, swe=None):
+    if swe is None:
+        # Every body starts just short of 360 degrees and soon wraps to 0
+        install_swe(bases=(355.0,) * 9)
+    else:
+        install_swe(swe)
+    return importlib.import_module("backend.app.ephemeris")
+
+
+def real_swe(monkeypatch):
+    # Other test modules may leave a stub registered as ``swisseph``
+    if not isinstance(sys.modules.get("swisseph"), types.ModuleType):
+        monkeypatch.delitem(sys.modules, "swisseph", raising=False)
+    return pytest.importorskip("swisseph")
+
+
+def test_interpolation_wraps_at_360(install_swe):
+    ephemeris = load_module(install_swe)
+    jds = np.arange(0.0, 2.0, 5 / 1440)
+    exact = ephemeris.exact_arrays(jds)
+    interp = ephemeris.interpolated_arrays(jds)
+    for a, b in zip(exact, interp):
+        err = (a - b + 180.0) % 360.0 - 180.0
+        assert np.abs(err).max() < 1e-9
+    assert interp[0].min() >= 0.0 and interp[0].max() < 360.0
+    # The Moon crosses 0/360 several times in the window
+    assert (np.diff(exact[0][:, 1]) < 0).any()
+
+
+def test_knot_grid_reduces_calls(install_swe):
+    ephemeris = load_module(install_swe)
+    jds = np.arange(0.0, 1.0 + 1e-9, 5 / 1440)
+    knots = ephemeris.knot_grid(jds)
+    assert len(knots) == 25
+    assert len(jds) / len(knots) > 10
+    assert len(ephemeris.knot_grid([0.5])) == 2
+
+
+@pytest.mark.parametrize("use_true_node", [False, True])
+def test_interpolation_error_within_documented_bounds(monkeypatch, install_swe, use_true_node):
+    ephemeris = load_module(install_swe, real_swe(monkeypatch))
+    rng = np.random.default_rng(1)
+    names = [name for name, _ in ephemeris.shadbala.PLANETS] + ["Rahu"]
+    for start in rng.uniform(2415020.5, 2488069.5, 8):
+        jds = start + np.arange(0, 24 * 12) * 5 / 1440
+        lons, speeds, rahu = ephemeris.exact_arrays(jds, use_true_node)
+        ilons, ispeeds, irahu = ephemeris.interpolated_arrays(jds, use_true_node)
+        lon_err = np.abs((np.column_stack([lons, rahu]) - np.column_stack([ilons, irahu]) + 180) % 360 - 180)
+        speed_err = np.abs(speeds - ispeeds)
+        for b, name in enumerate(names):
+            assert lon_err[:, b].max() <= ephemeris.MAX_LONGITUDE_ERROR[name], name
+            if b < len(speeds[0]):
+                assert speed_err[:, b].max() <= ephemeris.MAX_SPEED_ERROR[name], name
+
+
+def test_balas_ephemeris_parameter(install_swe):
+    pytest.importorskip("fastapi")
+    load_module(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T01:00"}
+    exact = client.get("/balas", params=params).json()
+    resp = client.get("/balas", params={**params, "ephemeris": "interpolated"})
+    assert resp.status_code == 200
+    interp = resp.json()
+    assert len(interp["data"]) == 13
+    assert interp["data"][5]["Moon"]["uccha"] == pytest.approx(exact["data"][5]["Moon"]["uccha"])
+
+    resp = client.get("/balas.csv", params={**params, "ephemeris": "splines"})
+    assert resp.status_code == 400
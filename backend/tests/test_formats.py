@@ -0,0 +1,75 @@
+import sys
+from io import BytesIO
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("fastapi")
+
+
+@pytest.fixture
+def client(modules):
+    from fastapi.testclient import TestClient
+
+    return TestClient(modules.main.app)
+
+
+PARAMS = {"start": "2020-01-01T00:00", "end": "2020-01-01T02:00"}
+
+
+def test_columnar_matches_frames(client):
+    frames = client.get("/balas", params=PARAMS).json()["data"]
+    resp = client.get("/balas", params={**PARAMS, "format": "columnar"})
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["interval"] == "5m"
+    assert payload["components"] == ["uccha", "dig", "kala", "cheshta", "naisargika", "drik"]
+    for planet in payload["planets"]:
+        for comp in payload["components"]:
+            assert payload["data"][planet][comp] == [f[planet][comp] for f in frames]
+
+
+def test_npy_payload(client):
+    frames = client.get("/balas", params=PARAMS).json()["data"]
+    resp = client.get("/balas", params={**PARAMS, "format": "npy"})
+    assert resp.status_code == 200
+    array = np.load(BytesIO(resp.content), allow_pickle=False)
+    assert array.dtype == np.dtype("<f4")
+    planets = resp.headers["x-planets"].split(",")
+    components = resp.headers["x-components"].split(",")
+    assert array.shape == (25, len(planets), len(components))
+    expected = [[[f[p][c] for c in components] for p in planets] for f in frames]
+    assert np.allclose(array, expected, rtol=1e-6)
+
+
+def test_compact_round_trip(client):
+    from backend.app import formats
+
+    columns = client.get("/balas", params={**PARAMS, "format": "columnar"}).json()["data"]
+    resp = client.get("/balas", params={**PARAMS, "format": "compact"})
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["count"] == 25
+    assert payload["data"]["Sun"]["naisargika"] == {"rle": [60.0, 25]}
+    decoded = formats.decode_compact(payload)
+    for planet in payload["planets"]:
+        for comp in formats.RUN_LENGTH:
+            assert decoded[planet][comp] == columns[planet][comp]
+        for comp in formats.DELTA:
+            assert np.allclose(
+                decoded[planet][comp], columns[planet][comp], rtol=0, atol=payload["quantum"] / 2 + 1e-9
+            )
+
+
+def test_run_lengths_and_deltas():
+    from backend.app import formats
+
+    assert formats.run_lengths([]) == []
+    assert formats.run_lengths([1.0, 1.0, 2.0, 1.0]) == [1.0, 2, 2.0, 1, 1.0, 1]
+    assert formats.deltas([1.0, 1.00015, 0.9999], quantum=1e-4) == [10000, 2, -3]
+
+
+def test_unknown_format(client):
+    resp = client.get("/balas", params={**PARAMS, "format": "xml"})
+    assert resp.status_code == 400
@@ -0,0 +1,72 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+@pytest.fixture
+def setup(modules):
+    from fastapi.testclient import TestClient
+
+    return TestClient(modules.main.app), modules.shadbala.swe
+
+
+PAST = {"start": "2020-01-01T00:00", "end": "2020-01-01T01:00"}
+
+
+def test_not_modified_matching():
+    from backend.app import httpcache
+
+    assert httpcache.not_modified('"a", W/"b"', '"b"')
+    assert httpcache.not_modified("*", '"b"')
+    assert not httpcache.not_modified('"a"', '"b"')
+    assert not httpcache.not_modified(None, '"b"')
+
+
+@pytest.mark.parametrize("path", ["/balas", "/balas.csv", "/shadbala", "/shadbala.csv"])
+def test_past_range_revalidates_without_computing(setup, path):
+    client, dummy = setup
+    resp = client.get(path, params=PAST)
+    tag = resp.headers["etag"]
+    assert "immutable" in resp.headers["cache-control"]
+    assert client.get(path, params={**PAST, "lat": 40.0}).headers["etag"] != tag
+
+    calls = len(dummy.calls)
+    resp = client.get(path, params=PAST, headers={"If-None-Match": tag})
+    assert resp.status_code == 304 and resp.content == b""
+    assert resp.headers["etag"] == tag
+    assert len(dummy.calls) == calls
+
+
+def test_representations_and_open_ranges_differ(setup):
+    client, _ = setup
+    json_tag = client.get("/balas", params=PAST).headers["etag"]
+    ndjson = client.get("/balas", params=PAST, headers={"Accept": "application/x-ndjson"})
+    assert ndjson.headers["etag"] != json_tag
+    assert client.get("/balas", params={**PAST, "format": "columnar"}).headers["etag"] != json_tag
+
+    now = datetime.now(timezone.utc)
+    current = {
+        "start": (now - timedelta(hours=1)).isoformat(),
+        "end": (now + timedelta(hours=1)).isoformat(),
+    }
+    resp = client.get("/balas", params=current)
+    assert resp.status_code == 200
+    assert "etag" not in resp.headers and "cache-control" not in resp.headers
+    assert "etag" not in client.get("/balas", params={"hours_ahead": 1}).headers
+
+
+@pytest.mark.parametrize("path", ["/balas", "/balas.csv", "/shadbala", "/shadbala.csv"])
+@pytest.mark.parametrize(
+    "params",
+    [
+        {**PAST, "ephemeris": "bogus"},
+        {**PAST, "interval": "0m"},
+        {"start": "2020-01-01T00:00", "end": "2021-01-01T00:00"},
+    ],
+)
+def test_invalid_requests_are_not_answered_with_304(setup, path, params):
+    client, _ = setup
+    resp = client.get(path, params=params, headers={"If-None-Match": "*"})
+    assert resp.status_code == 400
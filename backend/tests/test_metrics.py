@@ -0,0 +1,75 @@
+import io
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+def request_count(client):
+    key = 'shadbala_request_duration_seconds_count{method="GET",endpoint="/balas",status="200"}'
+    for line in client.get("/metrics").text.splitlines():
+        if line.startswith(key + " "):
+            return int(line.rsplit(" ", 1)[1])
+    return 0
+
+
+def test_histogram_and_counter_render(modules):
+    metrics = modules.metrics
+    hist = metrics.Histogram("t_seconds", "help", ("endpoint",), buckets=(0.1, 1.0))
+    hist.observe(0.05, endpoint="/a")
+    hist.observe(0.5, endpoint="/a")
+    hist.observe(5.0, endpoint="/a")
+    assert list(hist.samples()) == [
+        't_seconds_bucket{endpoint="/a",le="0.1"} 1',
+        't_seconds_bucket{endpoint="/a",le="1.0"} 2',
+        't_seconds_bucket{endpoint="/a",le="+Inf"} 3',
+        't_seconds_sum{endpoint="/a"} 5.55',
+        't_seconds_count{endpoint="/a"} 3',
+    ]
+    result, stages = metrics.timed_job(lambda: metrics.add_time("calc_ut", 0.25) or 7)
+    assert result == 7
+    assert stages["calc_ut"] == 0.25 and stages["bala"] >= 0.0
+
+
+def test_metrics_endpoint_and_server_timing(modules):
+    main, metrics = modules.main, modules.metrics
+    from fastapi.testclient import TestClient
+
+    client = TestClient(main.app)
+    requests = request_count(client)
+    before = metrics.FRAMES_COMPUTED.value(model="balas")
+    calc_before = metrics.STAGE_SECONDS.value(stage="calc_ut")
+    resp = client.get("/balas", params={"start": "2020-01-01T00:00", "end": "2020-01-01T01:00"})
+    assert resp.status_code == 200
+    timing = dict(part.split(";dur=") for part in resp.headers["server-timing"].split(", "))
+    assert {"calc_ut", "bala", "serialize", "total"} <= set(timing)
+    assert float(timing["total"]) >= float(timing["serialize"])
+
+    text = client.get("/metrics").text
+    assert "# TYPE shadbala_request_duration_seconds histogram" in text
+    assert request_count(client) == requests + 1
+    assert metrics.FRAMES_COMPUTED.value(model="balas") == before + 13
+    assert metrics.STAGE_SECONDS.value(stage="calc_ut") > calc_before
+    assert 'shadbala_cache_misses_total{cache="frames"}' in text
+    assert 'shadbala_cache_hit_ratio{cache="solar_day"}' in text
+
+    hits = main.frame_cache.hits
+    client.get("/balas", params={"start": "2020-01-01T00:00", "end": "2020-01-01T01:00"})
+    text = client.get("/metrics").text
+    assert f'shadbala_cache_hits_total{{cache="frames"}} {float(hits + 13)!r}' in text
+    assert metrics.FRAMES_COMPUTED.value(model="balas") == before + 13
+
+
+def test_structured_logger_is_json(modules):
+    from backend.app import logs
+
+    stream = io.StringIO()
+    logs.start(stream)
+    try:
+        logs.logger.info("request", extra={"path": "/balas", "duration_ms": 1.5})
+    finally:
+        logs.stop()
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "request"
+    assert entry["path"] == "/balas" and entry["duration_ms"] == 1.5
+    assert entry["level"] == "INFO"
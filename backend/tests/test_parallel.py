@@ -0,0 +1,130 @@
+import asyncio
+import sys
+import time
+import types
+import importlib
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+pytest.importorskip("numpy")
+
+
+def load_module(install_swe, swe=None):
+    install_swe(swe)
+    return importlib.import_module("backend.app.parallel")
+
+
+def real_swe(monkeypatch):
+    if not isinstance(sys.modules.get("swisseph"), types.ModuleType):
+        monkeypatch.delitem(sys.modules, "swisseph", raising=False)
+    return pytest.importorskip("swisseph")
+
+
+def timestamps(days):
+    start = datetime(2020, 1, 1, 20, 0, tzinfo=timezone.utc)
+    return [start + timedelta(minutes=5 * i) for i in range(int(days * 288))]
+
+
+def test_day_chunks_align_to_utc_midnight(install_swe):
+    parallel = load_module(install_swe)
+    chunks = parallel.day_chunks(timestamps(2))
+    assert [len(c) for c in chunks] == [48, 288, 240]
+    assert chunks[1][0] == datetime(2020, 1, 2, tzinfo=timezone.utc)
+
+
+def test_aiter_range_merges_jobs_in_order(monkeypatch, install_swe):
+    parallel = load_module(install_swe)
+    monkeypatch.setattr(parallel, "BLOCK_FRAMES", 50)
+    ts = timestamps(2)
+
+    async def frames():
+        return [frame async for frame in parallel.aiter_range(ts, 10, 20)]
+
+    assert asyncio.run(frames()) == parallel.row_batch(ts, 10, 20)
+
+
+def test_acompute_range_multi_process_pool(monkeypatch, install_swe):
+    parallel = load_module(install_swe, real_swe(monkeypatch))
+    monkeypatch.setattr(parallel, "WORKERS", 2)
+    ts = timestamps(1.5)
+    locations = [(40.7, -74.0), (51.5, 0.0)]
+    try:
+        frames = asyncio.run(
+            parallel.acompute_range_multi(ts, locations, ephemeris="interpolated")
+        )
+    finally:
+        parallel.shutdown()
+    assert frames == [
+        parallel.row_batch(ts, lat, lon, ephemeris="interpolated") for lat, lon in locations
+    ]
+
+
+def test_balas_range_limit(monkeypatch, install_swe):
+    pytest.importorskip("fastapi")
+    parallel = load_module(install_swe)
+    monkeypatch.setattr(parallel, "WORKERS", 0)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    resp = client.get("/balas", params={"start": "2020-01-01T00:00", "end": "2020-01-03T00:00"})
+    assert resp.status_code == 200
+    assert len(resp.json()["data"]) == 2 * 288 + 1
+
+    monkeypatch.setattr(parallel, "MAX_RANGE_FRAMES", 100)
+    resp = client.get("/balas", params={"start": "2020-01-01T00:00", "end": "2020-01-03T00:00"})
+    assert resp.status_code == 400
+    resp = client.get("/balas.csv", params={"hours_ahead": 12})
+    assert resp.status_code == 400
+
+
+def test_run_job_timeout(monkeypatch, install_swe):
+    parallel = load_module(install_swe)
+    monkeypatch.setattr(parallel, "JOB_TIMEOUT", 0.05)
+    assert asyncio.run(parallel.run_job(sum, [1, 2])) == 3
+    with pytest.raises(parallel.JobTimeout):
+        asyncio.run(parallel.run_job(time.sleep, 0.5))
+
+
+def test_balas_rejects_when_queue_full(monkeypatch, install_swe):
+    pytest.importorskip("fastapi")
+    parallel = load_module(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    monkeypatch.setattr(parallel, "QUEUE_DEPTH", 0)
+    resp = client.get("/balas", params={"hours_ahead": 1})
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "1"
+    resp = client.post("/balas/batch", json={"hours_ahead": 1, "locations": [{"lat": 0, "lon": 0}]})
+    assert resp.status_code == 503
+
+    monkeypatch.setattr(parallel, "QUEUE_DEPTH", 64)
+    monkeypatch.setattr(parallel, "JOB_TIMEOUT", 0.0)
+    resp = client.get("/balas", params={"hours_ahead": 1})
+    assert resp.status_code == 504
+
+
+def test_cached_requests_bypass_admission(monkeypatch, install_swe):
+    pytest.importorskip("fastapi")
+    parallel = load_module(install_swe)
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T01:00", "lat": 0, "lon": 0}
+    first = client.get("/balas", params=params)
+    assert first.status_code == 200
+
+    monkeypatch.setattr(parallel, "QUEUE_DEPTH", 0)
+    assert client.get("/balas", params=params).json() == first.json()
+    assert client.get("/balas.csv", params=params).status_code == 200
+    batch = {"start": params["start"], "end": params["end"], "locations": [{"lat": 0, "lon": 0}]}
+    assert client.post("/balas/batch", json=batch).status_code == 200
+    # Anything that needs a worker job is still rejected
+    assert client.get("/balas", params={**params, "include": "aspects"}).status_code == 503
+    assert client.get("/balas", params={**params, "end": "2020-01-01T02:00"}).status_code == 503
+    assert client.get("/balas", params={**params, "interval": "adaptive"}).status_code == 503
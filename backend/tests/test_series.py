@@ -0,0 +1,70 @@
+import csv
+import json
+import sys
+import importlib
+from datetime import datetime, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def kernels(install_swe):
+    install_swe()
+    shadbala = importlib.import_module("backend.app.shadbala")
+    batch = importlib.import_module("backend.app.batch")
+    series = importlib.import_module("backend.app.series")
+    return shadbala, batch, series
+
+
+def timestamps(n):
+    start = datetime(2020, 1, 1)
+    return [start + timedelta(minutes=5 * i) for i in range(n)]
+
+
+def test_series_matches_compute_shadbala(kernels):
+    shadbala, batch, _ = kernels
+    stamps = timestamps(40)
+    result = batch.shadbala_series(stamps, 10, 20)
+    assert result.values.shape == (40, 7, len(batch.SHADBALA_COMPONENTS))
+    assert result.frames() == [shadbala.compute_shadbala(ts, 10, 20) for ts in stamps]
+
+
+def test_views_share_memory(kernels):
+    _, batch, _ = kernels
+    result = batch.shadbala_series(timestamps(10), 10, 20)
+    moon = result.planet("Moon")
+    drik = result.component("drik")
+    assert np.shares_memory(moon, result.values) and np.shares_memory(drik, result.values)
+    assert moon[:, result.components.index("total")].tolist() == [
+        frame["Moon"]["total"] for frame in result.frames()
+    ]
+    assert result.columnar()["Sun"]["drik"] == drik[:, 0].tolist()
+
+
+def test_writers_and_round_trips(kernels):
+    _, batch, series = kernels
+    stamps = timestamps(30)
+    result = batch.shadbala_series(stamps, 10, 20)
+    frames = result.frames()
+    assert json.loads(result.json_frames()) == frames
+
+    output = StringIO()
+    result.write_csv(output)
+    rows = list(csv.reader(StringIO(output.getvalue())))
+    assert len(rows) == 30 * 7
+    assert rows[8][:2] == [stamps[1].isoformat(), "Moon"]
+    assert [float(v) for v in rows[8][2:]] == list(frames[1]["Moon"].values())
+
+    assert np.array_equal(np.load(BytesIO(result.npy_bytes())), result.values)
+
+    rebuilt = series.ShadbalaSeries.from_frames(stamps, frames, batch.SHADBALA_COMPONENTS)
+    assert np.array_equal(rebuilt.values, result.values)
+    parts = [batch.shadbala_series(stamps[:12], 10, 20), batch.shadbala_series(stamps[12:], 10, 20)]
+    joined = series.ShadbalaSeries.concat(parts, batch.SHADBALA_COMPONENTS)
+    assert joined.timestamps == stamps and np.array_equal(joined.values, result.values)
+    empty = series.ShadbalaSeries.concat([], batch.SHADBALA_COMPONENTS)
+    assert len(empty) == 0 and empty.json_frames() == "[]"
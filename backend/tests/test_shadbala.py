@@ -46,8 +46,7 @@ def patch_swe(monkeypatch):
     monkeypatch.setattr(shadbala, "swe", dummy)
     try:
         pytest.importorskip("fastapi")
-        main = importlib.import_module('backend.app.main')
-        monkeypatch.setattr(main, "row", shadbala.row)
+        importlib.import_module('backend.app.main')
     except ModuleNotFoundError:
         pass
     return shadbala
@@ -200,3 +199,91 @@ def test_balas_csv(monkeypatch):
     # 3 time points * 7 planets + header
     assert len(lines) == 1 + 3 * 7
     assert lines[0].startswith("timestamp,planet,uccha")
+
+
+def test_solar_day_shared_across_kala_components(monkeypatch):
+    """Sunrise/sunset searches run once per day and location."""
+    shadbala = patch_swe_basic(monkeypatch)
+    shadbala._solar_day_cached.cache_clear()
+    calls = []
+
+    def rise_trans(jd, body, lon, lat, flag):
+        calls.append((jd, flag))
+        offset = 0.25 if flag == dummy.CALC_RISE else 0.75
+        return 0, (jd + offset,) + (0.0,) * 9
+
+    dummy = shadbala.swe
+    dummy.CALC_RISE = 1
+    dummy.CALC_SET = 2
+    dummy.rise_trans = rise_trans
+
+    for hour in (1, 7, 12, 20):
+        ts = datetime(2020, 1, 1, hour, 0, 0)
+        shadbala.row(ts, 0, 0)
+        shadbala.compute_shadbala(ts, 0, 0)
+    assert len(calls) == 4
+
+    shadbala.row(datetime(2020, 1, 1, 12, 0, 0), 10, 0)
+    assert len(calls) == 8
+    shadbala._solar_day_cached.cache_clear()
+
+
+def test_house_cusps_computed_once_per_chart(monkeypatch):
+    shadbala = patch_swe_basic(monkeypatch)
+    cusps = tuple((15.0 + 30.0 * i) % 360 for i in range(12))
+    calls = []
+
+    def houses(jd, lat, lon):
+        calls.append(jd)
+        return cusps, (cusps[0],) + (0.0,) * 7
+
+    shadbala.swe.houses = houses
+    ts = datetime(2020, 1, 1, 12, 0, 0)
+    res = shadbala.row(ts, 0, 0)
+    assert len(calls) == 1
+    shadbala.compute_shadbala(ts, 0, 0)
+    assert len(calls) == 2
+
+    chart = shadbala._chart(0.0, 0, 0)
+    assert chart.ascendant == 15.0
+    assert chart.house_of(15.0) == 1
+    assert chart.house_of(44.9) == 1
+    assert chart.house_of(45.0) == 2
+    assert chart.house_of(10.0) == 12
+    # Moon at 40 deg is in the 1st house, three houses from its 4th.
+    assert res["Moon"]["dig"] == 30.0
+
+
+def test_balas_ndjson_stream(monkeypatch):
+    """NDJSON clients receive one frame per line."""
+    pytest.importorskip("fastapi")
+    patch_swe(monkeypatch)
+    import json
+    from backend.app.main import app
+    from fastapi.testclient import TestClient
+
+    client = TestClient(app)
+    params = {"start": "2020-01-01T00:00", "end": "2020-01-01T00:10"}
+    resp = client.get("/balas", params=params, headers={"Accept": "application/x-ndjson"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["timestamp"] for line in lines] == [
+        "2020-01-01T05:00:00+00:00",
+        "2020-01-01T05:05:00+00:00",
+        "2020-01-01T05:10:00+00:00",
+    ]
+    assert lines == [
+        {"timestamp": ts, "data": frame}
+        for ts, frame in zip(
+            [line["timestamp"] for line in lines],
+            client.get("/balas", params=params).json()["data"],
+        )
+    ]
+
+    resp = client.get(
+        "/balas",
+        params={"start": "2020-01-01T01:00", "end": "2020-01-01T00:00"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+    assert resp.status_code == 400
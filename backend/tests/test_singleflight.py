@@ -0,0 +1,138 @@
+import asyncio
+import sys
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+@pytest.fixture
+def computed(modules, monkeypatch):
+    """Record the timestamps of every ``parallel.aiter_range`` call."""
+    calls = []
+    aiter_range = modules.parallel.aiter_range
+
+    def counting(missing, *args, **kwargs):
+        calls.append(list(missing))
+        return aiter_range(missing, *args, **kwargs)
+
+    monkeypatch.setattr(modules.parallel, "aiter_range", counting)
+    return calls
+
+
+def test_concurrent_identical_queries_compute_once(modules, computed):
+    main, singleflight = modules.main, modules.singleflight
+    start, end = "2020-01-01T00:00", "2020-01-01T02:00"
+
+    async def collect(lat, lon, **kwargs):
+        _, timestamps, frames = await main._collect_data(
+            None, start, end, lat, lon, False, **kwargs
+        )
+        return timestamps, [frame async for frame in frames]
+
+    async def scenario():
+        return await asyncio.gather(
+            collect(40.7128, -74.006),
+            collect(40.71281, -74.006),
+            collect(40.7128, -74.006),
+            collect(40.7128, -74.006, interval="adaptive"),
+            collect(40.7128, -74.006, interval="adaptive"),
+        )
+
+    a, b, c, d, e = asyncio.run(scenario())
+    assert len(computed) == 1 and len(computed[0]) == 25
+    assert a == b == c
+    assert d == e
+    assert singleflight.in_flight() == 0
+
+
+def test_shared_stream_propagates_errors(modules):
+    singleflight = modules.singleflight
+
+    async def failing():
+        yield 1
+        raise RuntimeError("boom")
+
+    async def drain():
+        return [item async for item in singleflight.share_iter("key", failing)]
+
+    async def scenario():
+        return await asyncio.gather(drain(), drain(), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert singleflight.in_flight() == 0
+
+
+def test_stream_is_cancelled_when_every_reader_leaves(modules):
+    singleflight = modules.singleflight
+    finished = []
+
+    async def endless():
+        try:
+            while True:
+                yield 1
+                await asyncio.sleep(0)
+        finally:
+            finished.append(True)
+
+    async def scenario():
+        frames = singleflight.share_iter("key", endless)
+        assert await anext(frames) == 1
+        await frames.aclose()
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert finished == [True]
+    assert singleflight.in_flight() == 0
+
+
+def test_stream_stays_within_window_of_slowest_reader(modules):
+    singleflight = modules.singleflight
+    produced = []
+
+    async def counting():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    async def scenario():
+        fast = singleflight.share_iter("key", counting, window=4)
+        slow = singleflight.share_iter("key", counting, window=4)
+        assert produced == []  # nothing runs before the first read
+        assert await anext(slow) == 0
+        for _ in range(10):
+            await asyncio.sleep(0)
+        ahead = [await anext(fast) for _ in range(4)]
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert ahead == [0, 1, 2, 3] and len(produced) <= 1 + 4
+
+        async def drain(reader):
+            return [item async for item in reader]
+
+        assert await asyncio.gather(drain(slow), drain(fast)) == [
+            list(range(1, 100)),
+            list(range(4, 100)),
+        ]
+        # The buffer was trimmed, so a new request does not join it
+        late = singleflight.share_iter("key", counting, window=4)
+        assert [item async for item in late] == list(range(100))
+
+    asyncio.run(scenario())
+    assert singleflight.in_flight() == 0
+
+
+def test_unstarted_readers_are_forgotten(modules):
+    singleflight = modules.singleflight
+
+    async def source():
+        yield 1
+
+    async def scenario():
+        reader = singleflight.share_iter("key", source)
+        assert singleflight.running("key")
+        del reader
+        assert not singleflight.running("key")
+
+    asyncio.run(scenario())
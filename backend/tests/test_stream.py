@@ -0,0 +1,160 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+START = datetime(2020, 1, 1, 0, 2, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def live(modules, monkeypatch):
+    main, parallel, stream = modules.main, modules.parallel, modules.stream
+    clock = [START]
+    monkeypatch.setattr(stream, "_now", lambda: clock[0])
+    computed = []
+    aiter_range = parallel.aiter_range
+
+    def counting(missing, *args, **kwargs):
+        computed.extend(missing)
+        return aiter_range(missing, *args, **kwargs)
+
+    monkeypatch.setattr(parallel, "aiter_range", counting)
+    yield main, stream, clock, computed
+    stream.close()
+
+
+def test_subscribers_share_one_frame_per_tick(live, monkeypatch):
+    _, stream, clock, computed = live
+
+    async def scenario():
+        gate = asyncio.Queue()
+
+        async def fake_sleep(seconds):
+            await gate.get()
+            clock[0] += timedelta(seconds=seconds)
+
+        monkeypatch.setattr(stream, "_sleep", fake_sleep)
+        a = stream.subscribe(40.7128, -74.006, False, 1)
+        b = stream.subscribe(40.71281, -74.006, False, 1)
+        event, last, window = await anext(a)
+        assert event == "window" and len(window["data"]) == 12
+        assert window["start"] == "2020-01-01T00:00:00+00:00"
+        assert last == datetime(2020, 1, 1, 0, 55, tzinfo=timezone.utc)
+        assert (await anext(b))[2] == window
+        assert stream.group_count() == 1
+        assert len(computed) == 12
+
+        for minute in (0, 5):
+            gate.put_nowait(None)
+            for sub in (a, b):
+                event, last, frame = await anext(sub)
+                assert event == "frame"
+                stamp = datetime(2020, 1, 1, 1, minute, tzinfo=timezone.utc)
+                assert last == stamp and frame["timestamp"] == stamp.isoformat()
+        assert len(computed) == 14
+
+        other = stream.subscribe(40.7128, -74.006, True, 1)
+        await anext(other)
+        assert stream.group_count() == 2
+        for sub in (a, b, other):
+            await sub.aclose()
+        assert stream.group_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_endpoint_sends_sse(live, monkeypatch):
+    main, stream, clock, _ = live
+    from fastapi.testclient import TestClient
+
+    calls = []
+
+    async def fake_sleep(seconds):
+        calls.append(seconds)
+        if len(calls) == 1:
+            await asyncio.sleep(0.2)  # let the window go out first
+            clock[0] += timedelta(seconds=seconds)
+            return
+        stream.close()
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(stream, "_sleep", fake_sleep)
+    client = TestClient(main.app)
+    resp = client.get("/balas/stream", params={"hours_ahead": 1})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    blocks = resp.text.strip().split("\n\n")
+    assert blocks[0] == f"retry: {main.SSE_RETRY_MS}"
+    events = [block.split("\n") for block in blocks[1:]]
+    assert [e[:2] for e in events] == [
+        ["id: 2020-01-01T00:55:00+00:00", "event: window"],
+        ["id: 2020-01-01T01:00:00+00:00", "event: frame"],
+    ]
+    window = json.loads(events[0][2].removeprefix("data: "))
+    frame = json.loads(events[1][2].removeprefix("data: "))
+    assert len(window["data"]) == 12
+    assert frame["timestamp"] == "2020-01-01T01:00:00+00:00"
+
+    assert client.get("/balas/stream", params={"hours_ahead": 0}).status_code == 400
+    assert main._parse_event_id("2020-01-01T01:00:00+00:00") == datetime(
+        2020, 1, 1, 1, tzinfo=timezone.utc
+    )
+    assert main._parse_event_id("bogus") is None
+    assert main._parse_event_id(None) is None
+
+
+def test_reconnect_resumes_after_last_event_id(live, monkeypatch):
+    _, stream, clock, computed = live
+
+    async def scenario():
+        clock[0] += timedelta(minutes=10)
+        last = datetime(2020, 1, 1, 0, 55, tzinfo=timezone.utc)
+        sub = stream.subscribe(40.7128, -74.006, False, 1, last_event=last)
+        events = [await anext(sub) for _ in range(2)]
+        assert [(e, ts.minute) for e, ts, _ in events] == [("frame", 0), ("frame", 5)]
+        assert events[1][2]["timestamp"] == "2020-01-01T01:05:00+00:00"
+        await sub.aclose()
+        # Ids older than the window get a new window
+        stale = stream.subscribe(40.7128, -74.006, False, 1, last_event=last - timedelta(hours=1))
+        assert (await anext(stale))[0] == "window"
+        await stale.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_idle_subscribers_get_keepalives_and_failed_ticks_retry(live, monkeypatch):
+    _, stream, clock, _ = live
+    monkeypatch.setattr(stream, "STREAM_KEEPALIVE", 0.01)
+    frames = stream._frames
+    failures = []
+
+    async def flaky(timestamps, *args):
+        if len(timestamps) == 1 and not failures:
+            failures.append(timestamps[0])
+            raise stream.parallel.JobTimeout("slow")
+        return await frames(timestamps, *args)
+
+    async def scenario():
+        gate = asyncio.Queue()
+
+        async def fake_sleep(seconds):
+            await gate.get()
+            clock[0] += timedelta(seconds=seconds)
+
+        monkeypatch.setattr(stream, "_sleep", fake_sleep)
+        monkeypatch.setattr(stream, "_frames", flaky)
+        sub = stream.subscribe(40.7128, -74.006, False, 1)
+        assert (await anext(sub))[0] == "window"
+        assert await anext(sub) == ("keepalive", None, None)
+        gate.put_nowait(None)  # tick: the job times out
+        gate.put_nowait(None)  # retry delay
+        while (event := await anext(sub))[0] == "keepalive":
+            pass
+        assert failures and event[1] == failures[0]
+        await sub.aclose()
+
+    asyncio.run(scenario())
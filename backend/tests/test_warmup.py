@@ -0,0 +1,113 @@
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import pytest
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+def test_parse_locations(modules):
+    warmup = modules.warmup
+    assert warmup.parse_locations("") == []
+    assert warmup.parse_locations(" 40.71281,-74.006 ; 51.5,0;40.71282,-74.006") == [
+        (40.7128, -74.006),
+        (51.5, 0.0),
+    ]
+    with pytest.raises(ValueError):
+        warmup.parse_locations("40.7")
+
+
+def test_window_is_grid_aligned(modules):
+    warmup = modules.warmup
+    now = datetime(2020, 1, 1, 10, 7, 31, tzinfo=timezone.utc)
+    stamps = warmup.window(1, now)
+    assert stamps[0] == datetime(2020, 1, 1, 10, 5, tzinfo=timezone.utc)
+    assert len(stamps) == 13
+
+
+def test_ready_after_warm_up_fills_cache(monkeypatch, modules):
+    main, warmup = modules.main, modules.warmup
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(warmup, "WARM_LOCATIONS", "40.7128,-74.006;51.5,0")
+    monkeypatch.setattr(warmup, "WARM_HOURS", 1)
+    now = datetime(2020, 1, 1, 10, 7, tzinfo=timezone.utc)
+    window = warmup.window
+    monkeypatch.setattr(warmup, "window", lambda hours, _=None: window(hours, now))
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 10
+        resp = client.get("/ready")
+        while resp.status_code == 503 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            resp = client.get("/ready")
+        assert resp.status_code == 200
+        assert resp.json() == {"status": "ready", "locations": 2, "frames": 26}
+        assert len(main.frame_cache) == 26
+
+        misses = main.frame_cache.misses
+        resp = client.get(
+            "/balas",
+            params={
+                "start": "2020-01-01T10:05+00:00",
+                "end": "2020-01-01T11:05+00:00",
+                "lat": 51.5,
+                "lon": 0,
+            },
+        )
+        assert resp.status_code == 200
+        assert main.frame_cache.misses == misses
+
+
+def test_ready_without_locations(monkeypatch, modules):
+    main, warmup = modules.main, modules.warmup
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(warmup, "WARM_LOCATIONS", "")
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/ready").status_code == 503 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get("/ready").json()["frames"] == 0
+
+
+@pytest.mark.parametrize(
+    "locations, hours",
+    [("40.7128,-74.006;oops", 1), ("40.7128,-74.006;51.5,0", 24 * 31)],
+)
+def test_failed_warm_up_still_becomes_ready(monkeypatch, modules, locations, hours):
+    main, warmup = modules.main, modules.warmup
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(warmup, "WARM_LOCATIONS", locations)
+    monkeypatch.setattr(warmup, "WARM_HOURS", hours)
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/ready").status_code == 503 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.get("/ready").json() == {"status": "ready", "locations": 0, "frames": 0}
+        assert len(main.frame_cache) == 0
+
+
+def test_worker_initializer_warms_the_process(monkeypatch, capsys, modules):
+    from backend.app import logs, parallel, shadbala
+
+    # The initializer replaces the logger's handlers; keep the test process's
+    monkeypatch.setattr(logs.logger, "handlers", [])
+    monkeypatch.setattr(logs.logger, "level", logs.logger.level)
+    monkeypatch.setattr(logs, "_listener", logs._listener)
+    monkeypatch.setattr(logs, "_handler", logs._handler)
+
+    calls = []
+    monkeypatch.setattr(shadbala, "compute_shadbala", lambda *args: calls.append(args))
+    parallel._init_worker()
+    assert len(calls) == 1
+
+    def failing(*args):
+        raise RuntimeError("no ephemeris")
+
+    monkeypatch.setattr(shadbala, "compute_shadbala", failing)
+    parallel._init_worker()  # must not break the pool
+    entry = json.loads(capsys.readouterr().err.splitlines()[-1])
+    assert entry["level"] == "WARNING" and entry["message"] == "worker warm-up failed"
+    assert "no ephemeris" in entry["exception"]
@@ -0,0 +1,70 @@
+"""Per-frame latency of the /shadbala computation path.
+
+Times :func:`batch.shadbala_batch` over a multi-day range on a single core
+and compares it with calling :func:`shadbala.compute_shadbala` per frame.
+Exits with status 1 when a mode misses its per-frame target::
+
+    python benchmarks/bench_shadbala.py --days 3
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.app import batch, shadbala  # noqa: E402
+
+# Per-frame latency targets in microseconds, single core, Moshier ephemeris
+TARGET_US = {"exact": 450.0, "interpolated": 150.0}
+
+
+def _per_frame(func, frames: int, repeat: int) -> float:
+    func()  # warm the solar-day cache and imports
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best / frames * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=float, default=3.0)
+    parser.add_argument("--lat", type=float, default=40.7128)
+    parser.add_argument("--lon", type=float, default=-74.0060)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    start = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    timestamps = [start + timedelta(minutes=5 * i) for i in range(int(args.days * 288))]
+    n = len(timestamps)
+
+    scalar = _per_frame(
+        lambda: [shadbala.compute_shadbala(ts, args.lat, args.lon) for ts in timestamps],
+        n,
+        1,
+    )
+    print(f"compute_shadbala            {scalar:8.1f} us/frame")
+
+    failed = False
+    for mode, target in TARGET_US.items():
+        us = _per_frame(
+            lambda: batch.shadbala_batch(timestamps, args.lat, args.lon, ephemeris=mode),
+            n,
+            args.repeat,
+        )
+        ok = us <= target
+        failed |= not ok
+        print(
+            f"shadbala_batch {mode:<12} {us:8.1f} us/frame "
+            f"(target {target:g}, {scalar / us:.1f}x) {'ok' if ok else 'FAIL'}"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""Benchmark suite for the shadbala hot paths.
+
+Times ``row``, ``compute_shadbala``, ``_get_hora_lord``, ``_dig_bala``,
+``_drik_bala`` and the ``/balas`` ``_collect_data`` pipeline over 1-hour,
+24-hour and 7-day ranges of five-minute frames, with two backends:
+
+``moshier``
+    the real pyswisseph using its built-in Moshier ephemeris (the ephemeris
+    path points at an empty directory, so no data files are needed);
+``stub``
+    a pure-Python stand-in that returns linear motion and has no house or
+    rise/set support, which isolates the Python overhead of this package.
+
+``_collect_data`` runs its jobs on threads of this process
+(``PARALLEL_WORKERS=0``) with an empty frame cache, so every case measures a
+single process.  Each case reports the best of ``--repeat`` runs.  Results are written as JSON
+and can be compared with an earlier run; any case that is slower than the
+baseline by more than ``--threshold`` fails the run::
+
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+RANGES = {"1h": 12, "24h": 288, "7d": 7 * 288}
+BACKENDS = ("moshier", "stub")
+CASES = ("row", "compute_shadbala", "_get_hora_lord", "_dig_bala", "_drik_bala", "_collect_data")
+START = datetime(2021, 1, 1, 5, 0, tzinfo=timezone.utc)  # midnight in New York
+LAT, LON = 40.7128, -74.0060
+
+
+class StubUnsupported(RuntimeError):
+    """Raised by the ``StubSwe`` calls that it deliberately leaves unmodelled."""
+
+
+class StubSwe:
+    """Deterministic stand-in for ``swisseph`` with linear planetary motion."""
+
+    SUN = 0
+    MOON = 1
+    MARS = 2
+    MERCURY = 3
+    JUPITER = 4
+    VENUS = 5
+    SATURN = 6
+    MEAN_NODE = 10
+    TRUE_NODE = 11
+    SIDM_LAHIRI = 1
+    CALC_RISE = 1
+    CALC_SET = 2
+
+    _SPEED = {0: 0.9856, 1: 13.176, 2: 0.524, 3: 1.383, 4: 0.083, 5: 1.2, 6: 0.033, 10: -0.053, 11: -0.053}
+
+    def set_sid_mode(self, mode, t0=0, ayan_t0=0):
+        pass
+
+    def set_ephe_path(self, path):
+        pass
+
+    def julday(self, y, m, d, h):
+        return 367 * y - 7 * (y + (m + 9) // 12) // 4 + 275 * m // 9 + d + 1721013.5 + h / 24
+
+    def calc_ut(self, jd, pid):
+        speed = self._SPEED[pid]
+        return ((37.0 * pid + speed * (jd - 2451545.0)) % 360, 0.0, 1.0, speed)
+
+    def houses(self, jd, lat, lon):
+        # Makes shadbala use its equal-house fallback
+        raise StubUnsupported("houses")
+
+    def rise_trans(self, *args):
+        # Makes shadbala use its 6am/6pm sunrise and sunset fallback
+        raise StubUnsupported("rise_trans")
+
+
+def _use_backend(name: str):
+    from backend.app import shadbala
+
+    if name == "stub":
+        shadbala.swe = StubSwe()
+    else:
+        import swisseph
+
+        swisseph.set_ephe_path(tempfile.mkdtemp(prefix="moshier-"))
+        shadbala.swe = swisseph
+    shadbala._solar_day_cached.cache_clear()
+    return shadbala
+
+
+def _cases(shadbala, frames: int) -> dict:
+    """Return ``{case: callable}`` timing ``frames`` five-minute frames."""
+    from backend.app import main, parallel
+    from backend.app.cache import frame_cache
+
+    timestamps = [START + timedelta(minutes=5 * i) for i in range(frames)]
+    jds = [shadbala._julian_day(ts) for ts in timestamps]
+    positions = []
+    for jd in jds:
+        pos = {name: shadbala._calc_ut(jd, pid)[0] for name, pid in shadbala.PLANETS}
+        pos["Rahu"] = shadbala._calc_ut(jd, shadbala.swe.MEAN_NODE)[0]
+        pos["Ketu"] = (pos["Rahu"] + 180.0) % 360.0
+        positions.append(pos)
+    planets = [name for name, _ in shadbala.PLANETS]
+    end = (START + timedelta(minutes=5 * (frames - 1))).astimezone(main.ZoneInfo("America/New_York"))
+
+    async def collect():
+        parallel.WORKERS = 0
+        frame_cache.clear()
+        _, _, frames_iter = await main._collect_data(
+            None, START.isoformat(), end.isoformat(), LAT, LON, False
+        )
+        return [frame async for frame in frames_iter]
+
+    return {
+        "row": lambda: [shadbala.row(ts, LAT, LON) for ts in timestamps],
+        "compute_shadbala": lambda: [shadbala.compute_shadbala(ts, LAT, LON) for ts in timestamps],
+        "_get_hora_lord": lambda: [shadbala._get_hora_lord(ts, LAT, LON) for ts in timestamps],
+        "_dig_bala": lambda: [
+            shadbala._dig_bala(jd, LAT, LON, pos[p], p)
+            for jd, pos in zip(jds, positions)
+            for p in planets
+        ],
+        "_drik_bala": lambda: [
+            shadbala._drik_bala(pos[p], p, pos) for pos in positions for p in planets
+        ],
+        "_collect_data": lambda: asyncio.run(collect()),
+    }
+
+
+def _best(func, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(backends, ranges, cases, repeat: int) -> dict:
+    results = {}
+    for backend in backends:
+        shadbala = _use_backend(backend)
+        for range_name in ranges:
+            frames = RANGES[range_name]
+            funcs = _cases(shadbala, frames)
+            for case in cases:
+                funcs[case]()  # warm up imports, pools and the solar-day cache
+                seconds = _best(funcs[case], repeat)
+                key = f"{backend}/{case}/{range_name}"
+                results[key] = {
+                    "seconds": seconds,
+                    "frames": frames,
+                    "us_per_frame": seconds / frames * 1e6,
+                }
+                print(f"{key:<40} {seconds * 1e3:10.2f} ms {seconds / frames * 1e6:10.1f} us/frame")
+    return results
+
+
+def metadata() -> dict:
+    import numpy
+
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numpy": numpy.__version__,
+    }
+    try:
+        import swisseph
+
+        meta["swisseph"] = getattr(swisseph, "version", None)
+    except ImportError:
+        pass
+    return meta
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a message for every case slower than ``baseline`` by ``threshold``."""
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{key}: {ratio:.2f}x the baseline time")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backend", default=",".join(BACKENDS))
+    parser.add_argument("--ranges", default=",".join(RANGES))
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    backends = args.backend.split(",")
+    ranges = args.ranges.split(",")
+    cases = args.cases.split(",")
+    for value, known, name in ((backends, BACKENDS, "backend"), (ranges, RANGES, "range"), (cases, CASES, "case")):
+        unknown = set(value) - set(known)
+        if unknown:
+            parser.error(f"unknown {name}: {', '.join(sorted(unknown))}")
+
+    results = run(backends, ranges, cases, args.repeat)
+    if args.output:
+        report = {"meta": metadata(), "repeat": args.repeat, "results": results}
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+import importlib
+import sys
+
+import pytest
+
+
+class DummySwe:
+    """Deterministic ``swisseph`` stand-in with linear planetary motion.
+
+    Body ``pid`` is at ``bases[pid] + speeds[pid] * jd * scale`` degrees.
+    There is no ``houses`` or ``rise_trans``, so ``shadbala`` uses its
+    fallbacks.  ``calls`` records the body of every ``calc_ut`` call.
+    """
+
+    SUN = 0
+    MOON = 1
+    MARS = 2
+    MERCURY = 3
+    JUPITER = 4
+    VENUS = 5
+    SATURN = 6
+    MEAN_NODE = 7
+    TRUE_NODE = 8
+    SIDM_LAHIRI = 1
+
+    SPEEDS = (1.0, 13.2, 0.5, 1.5, 0.1, 1.2, 0.05, -0.05, -0.06)
+    BASES = tuple(10.0 + 40 * pid for pid in range(9))
+
+    def __init__(self, speeds=SPEEDS, bases=BASES, scale=1.0):
+        self.speeds = speeds
+        self.bases = bases
+        self.scale = scale
+        self.calls = []
+
+    def set_sid_mode(self, mode, t0=0, ayan_t0=0):
+        pass
+
+    def julday(self, y, m, d, h):
+        return d + h / 24.0
+
+    def calc_ut(self, jd, pid):
+        self.calls.append(pid)
+        speed = self.speeds[pid]
+        return ((self.bases[pid] + speed * jd * self.scale) % 360, 0.0, 1.0, speed)
+
+
+@pytest.fixture
+def install_swe(monkeypatch):
+    """Return ``install(swe=None, **kwargs)``, which sets ``shadbala.swe``.
+
+    Without ``swe`` a ``DummySwe(**kwargs)`` is installed.  Returns the stub.
+    """
+    pytest.importorskip("numpy")
+
+    def install(swe=None, **kwargs):
+        swe = swe if swe is not None else DummySwe(**kwargs)
+        sys.modules.setdefault("swisseph", swe)
+        shadbala = importlib.import_module("backend.app.shadbala")
+        monkeypatch.setattr(shadbala, "swe", swe)
+        return swe
+
+    return install
+
+
+@pytest.fixture
+def modules(install_swe):
+    """Install the default ``DummySwe`` and return the ``backend.app`` package.
+
+    Every application module is imported, so tests use ``modules.main``,
+    ``modules.parallel`` and so on; the stub is ``modules.shadbala.swe``.
+    """
+    pytest.importorskip("fastapi")
+    install_swe()
+    importlib.import_module("backend.app.main")
+    return sys.modules["backend.app"]
+
+
+@pytest.fixture(autouse=True)
+def _clear_frame_cache():
+    """Keep frames computed with one test's ephemeris stub out of the next."""
+    yield
+    cache = sys.modules.get("backend.app.cache")
+    if cache is not None:
+        cache.frame_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _in_process_workers(monkeypatch):
+    """Run worker jobs on threads so they see each test's ephemeris stub."""
+    try:
+        from backend.app import parallel
+    except ImportError:
+        yield
+        return
+    monkeypatch.setattr(parallel, "WORKERS", 0)
+    yield
+    parallel.shutdown()
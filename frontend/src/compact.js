@@ -0,0 +1,38 @@
+// Decoder for `/balas?format=compact` responses (see backend/app/formats.py).
+//
+// Run-length components arrive as a flat [value, count, value, count, ...]
+// list; delta components as integer differences of the values divided by
+// `quantum`, the first one relative to zero.
+
+function decodeRuns(runs) {
+  const values = [];
+  for (let i = 0; i < runs.length; i += 2) {
+    for (let n = 0; n < runs[i + 1]; n += 1) values.push(runs[i]);
+  }
+  return values;
+}
+
+function decodeDeltas(deltas, quantum) {
+  const values = new Array(deltas.length);
+  let step = 0;
+  for (let i = 0; i < deltas.length; i += 1) {
+    step += deltas[i];
+    values[i] = step * quantum;
+  }
+  return values;
+}
+
+// Return the payload with `data` decoded into the columnar layout,
+// data[planet][component] = [values...].
+export function decodeCompact(payload) {
+  const data = {};
+  for (const [planet, components] of Object.entries(payload.data)) {
+    data[planet] = {};
+    for (const [component, encoded] of Object.entries(components)) {
+      data[planet][component] = encoded.rle
+        ? decodeRuns(encoded.rle)
+        : decodeDeltas(encoded.delta, payload.quantum);
+    }
+  }
+  return { ...payload, data };
+}
@@ -1,6 +1,7 @@
 import React from 'react';
 import ReactDOM from 'react-dom/client';
 import * as d3 from 'd3';
+import { decodeCompact } from './compact';
 import './styles.css';
 
 const PLANETS = ['Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn'];
@@ -17,20 +18,19 @@ function PlanetChart({ planet, data }) {
     const height = 300;
     const margin = { top: 20, right: 30, bottom: 30, left: 40 };
 
+    // Columnar layout (decoded from format=compact): data.data[planet][component]
+    // is an array of samples every five minutes from data.start.
+    const series = data.data[planet];
+    const components = data.components;
     const startTime = new Date(data.start);
-    const times = data.data.map((_, i) => new Date(startTime.getTime() + i * 5 * 60 * 1000));
-    const components = ['uccha', 'dig', 'kala', 'cheshta', 'naisargika', 'drik'];
+    const times = series[components[0]].map((_, i) => new Date(startTime.getTime() + i * 5 * 60 * 1000));
 
     const x = d3.scaleTime()
       .domain(d3.extent(times))
       .range([margin.left, width - margin.right]);
 
-      const yMin = d3.min(data.data, row =>
-        d3.min(components, c => row[planet][c])
-      );
-      const yMax = d3.max(data.data, row =>
-        d3.max(components, c => row[planet][c])
-      );
+      const yMin = d3.min(components, c => d3.min(series[c]));
+      const yMax = d3.max(components, c => d3.max(series[c]));
       const y = d3.scaleLinear()
         .domain([Math.min(0, yMin), yMax])
         .nice()
@@ -43,9 +43,8 @@ function PlanetChart({ planet, data }) {
     const colors = d3.schemeCategory10;
 
     components.forEach((comp, idx) => {
-      const values = data.data.map(row => row[planet][comp]);
       svg.append('path')
-        .datum(values)
+        .datum(series[comp])
         .attr('fill', 'none')
         .attr('stroke', colors[idx % colors.length])
         .attr('stroke-width', 1.5)
@@ -104,7 +103,9 @@ function App() {
 
   const submit = async (e) => {
     e.preventDefault();
-    const params = new URLSearchParams({ start, end, lat, lon, use_true_node: useTrueNode });
+    const params = new URLSearchParams({
+      start, end, lat, lon, use_true_node: useTrueNode, format: 'compact',
+    });
     setError(null);
     try {
       const res = await fetch(`${BASE_URL}/balas?${params}`);
@@ -112,7 +113,7 @@ function App() {
         const text = await res.text();
         throw new Error(text || 'Request failed');
       }
-      setData(await res.json());
+      setData(decodeCompact(await res.json()));
     } catch (err) {
       setData(null);
       setError(err.message);